@@ -0,0 +1,7 @@
+"""
+Performance harnesses of the service.
+
+They are not collected by pytest: every harness is a script run with ``python -m`` from
+``src`` and writes its results as JSON, which is compared with a stored baseline, so a
+regression shows up run over run. See the ``benchmark-*`` targets of the Makefile.
+"""
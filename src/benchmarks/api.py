@@ -0,0 +1,213 @@
+"""
+API benchmark.
+
+Seeds a dedicated test database with users and tasks built by ``tests.factories`` and drives
+register, token, create, list and detail through the whole middleware stack in process,
+measuring throughput, latency percentiles and database queries per endpoint::
+
+    python -m benchmarks.api --users 2 --tasks-per-user 1000 --requests 200
+
+Redis features fall back to the database and the broker to an in-memory transport unless
+``BENCHMARK_REDIS`` is set, so only Postgres has to run. ``benchmarks/locustfile.py`` drives
+the same endpoints over HTTP against a running stack.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from benchmarks.environment import get_settings_overrides
+from benchmarks.environment import setup_django
+from benchmarks.environment import use_redis
+
+setup_django()
+# Request and factory logs would drown the report, their cost is not what is measured here
+logging.disable(logging.INFO)
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from benchmarks.seed import SEED_PASSWORD  # noqa: E402
+from benchmarks.seed import seed  # noqa: E402
+from benchmarks.stats import BASELINES_DIR  # noqa: E402
+from benchmarks.stats import DEFAULT_TOLERANCE  # noqa: E402
+from benchmarks.stats import compare_results  # noqa: E402
+from benchmarks.stats import format_results  # noqa: E402
+from benchmarks.stats import get_environment  # noqa: E402
+from benchmarks.stats import load_report  # noqa: E402
+from benchmarks.stats import save_report  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+from tasks.models import Task  # noqa: E402
+from users.models import User  # noqa: E402
+
+Request = Callable[[int], HttpResponse]
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def get_client(user: User) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    return client
+
+
+def get_scenarios(users: List[User]) -> Dict[str, Request]:
+    """
+    Requests of every endpoint, the argument is the sequence number of the request.
+    """
+    anonymous = APIClient()
+    clients = [get_client(user) for user in users]
+    task_ids = [list(Task.objects.filter(user=user).values_list("id", flat=True)[:1000]) for user in users]
+    run = uuid.uuid4().hex[:8]
+
+    def register(i: int) -> HttpResponse:
+        data = {"username": f"bench_{run}_{i}", "email": f"bench_{run}_{i}@example.com", "password": SEED_PASSWORD}
+        return anonymous.post(reverse("register"), data, format="json")
+
+    def token(i: int) -> HttpResponse:
+        data = {"email": users[i % len(users)].email, "password": SEED_PASSWORD}
+        return anonymous.post(reverse("token_obtain_pair"), data, format="json")
+
+    def create_sum(i: int) -> HttpResponse:
+        data = {"task_type": "sum", "input_data": json.dumps({"num1": i, "num2": 1})}
+        return clients[i % len(clients)].post(reverse("task-list-create"), data, format="json")
+
+    def create_countdown(i: int) -> HttpResponse:
+        data = {"task_type": "countdown", "input_data": json.dumps({"seconds": 1})}
+        return clients[i % len(clients)].post(reverse("task-list-create"), data, format="json")
+
+    def list_tasks(i: int) -> HttpResponse:
+        return clients[i % len(clients)].get(reverse("task-list-create"))
+
+    def detail(i: int) -> HttpResponse:
+        ids = task_ids[i % len(clients)]
+        return clients[i % len(clients)].get(reverse("task-detail", kwargs={"pk": ids[i % len(ids)]}))
+
+    return {
+        "register": register,
+        "token": token,
+        "create_sum": create_sum,
+        "create_countdown": create_countdown,
+        "list": list_tasks,
+        "detail": detail,
+    }
+
+
+def run_scenario(name: str, request: Request, count: int, warmup: int) -> Dict[str, float]:
+    for i in range(warmup):
+        request(i)
+
+    durations: List[float] = []
+    queries: List[int] = []
+    started = time.perf_counter()
+    for i in range(warmup, warmup + count):
+        with CaptureQueriesContext(connection) as captured:
+            begin = time.perf_counter()
+            response = request(i)
+            durations.append(time.perf_counter() - begin)
+        if response.status_code >= 400:
+            raise BenchmarkError(f"{name} answered {response.status_code}: {response.content[:200]!r}")
+        queries.append(len(captured))
+
+    return summarize(durations, time.perf_counter() - started, queries)
+
+
+def prepare_users(args: argparse.Namespace) -> List[User]:
+    # A kept database is only seeded again when the requested volume has changed
+    users = list(User.objects.filter(username__startswith="user_").order_by("id")[: args.users])
+    if args.keepdb and len(users) == args.users and Task.objects.count() >= args.users * args.tasks_per_user:
+        return users
+
+    call_command("flush", interactive=False, verbosity=0)
+    return seed(args.users, args.tasks_per_user, args.seed)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    users = prepare_users(args)
+    scenarios = get_scenarios(users)
+    names = args.scenarios or list(scenarios)
+
+    results = {}
+    for name in names:
+        results[name] = run_scenario(name, scenarios[name], args.requests, args.warmup)
+
+    return {
+        "environment": get_environment(),
+        "parameters": {
+            "users": args.users,
+            "tasks_per_user": args.tasks_per_user,
+            "requests": args.requests,
+            "redis": use_redis(),
+        },
+        "results": results,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2, help="seeded users")
+    parser.add_argument("--tasks-per-user", type=int, default=1000, help="seeded tasks of every user")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="requests per endpoint before measuring")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the factories")
+    parser.add_argument("--scenarios", nargs="*", help="endpoints to benchmark, all by default")
+    parser.add_argument("--keepdb", action="store_true", help="keep the seeded test database between runs")
+    parser.add_argument("--output", type=Path, help="file to write the report to")
+    parser.add_argument("--baseline", type=Path, default=BASELINES_DIR / "api.json")
+    parser.add_argument("--save-baseline", action="store_true", help="replace the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=args.keepdb)
+
+    try:
+        # Benchmark users keep far more active tasks than the quota allows
+        with override_settings(TASKS_ACTIVE_LIMIT=sys.maxsize, **get_settings_overrides()):
+            report = run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=args.keepdb)
+
+    print(format_results(report["results"]))  # noqa: T201
+    if args.output:
+        save_report(args.output, report)
+    if args.save_baseline:
+        save_report(args.baseline, report)
+        return 0
+
+    baseline = load_report(args.baseline)
+    if baseline is None:
+        return 0
+    if baseline["parameters"] != report["parameters"]:
+        print(f"Parameters differ from the baseline {baseline['parameters']}, not compared")  # noqa: T201
+        return 0
+
+    regressions = compare_results(report["results"], baseline["results"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")  # noqa: T201
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
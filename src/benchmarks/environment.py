@@ -0,0 +1,62 @@
+"""
+Django setup of the benchmarks.
+
+Without ``BENCHMARK_REDIS`` the broker is replaced with a local transport and Redis features
+with their database fallbacks, so a benchmark only needs Postgres. The in-memory transport
+serves a single process, the filesystem one lets a worker process share it. The broker is
+read by the settings from the environment, so it has to be replaced before Django is set up.
+"""
+
+import os
+from typing import Any
+from typing import Dict
+
+import django
+
+# Settings the test suite uses to run without Redis (see tests/conftest.py)
+WITHOUT_REDIS: Dict[str, Any] = {
+    "TASKS_QUOTA_BACKEND": "db",
+    "TASKS_EVENTS_ENABLED": False,
+    "TASKS_LIST_VERSION_ENABLED": False,
+    "TASKS_RESULT_CACHE_ENABLED": False,
+    "TASKS_ADMISSION_ENABLED": False,
+    "USERS_AUTH_CACHE_ENABLED": False,
+}
+
+
+def use_redis() -> bool:
+    return os.environ.get("BENCHMARK_REDIS", "").lower() in ("1", "true", "yes")
+
+
+def get_broker_environment(broker_url: str = "memory://") -> Dict[str, str]:
+    if use_redis():
+        return {}
+    return {"CELERY_BROKER_URL": broker_url, "CELERY_RESULT_BACKEND": "cache+memory://"}
+
+
+def setup_django(broker_url: str = "memory://") -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "fizikl_assignment.settings")
+    os.environ.update(get_broker_environment(broker_url))
+    django.setup()
+
+
+def configure_filesystem_broker() -> None:
+    """
+    Point the filesystem transport at ``BENCHMARK_BROKER_FOLDER`` shared by the processes.
+    """
+    folder = os.environ.get("BENCHMARK_BROKER_FOLDER")
+    if folder is None:
+        return
+
+    from django.conf import settings
+
+    # Celery reads the same dictionary, so it is updated in place
+    settings.CELERY_BROKER_TRANSPORT_OPTIONS.update(
+        data_folder_in=folder,
+        data_folder_out=folder,
+        control_folder=os.path.join(folder, "control"),
+    )
+
+
+def get_settings_overrides() -> Dict[str, Any]:
+    return {} if use_redis() else dict(WITHOUT_REDIS)
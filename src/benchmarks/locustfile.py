@@ -0,0 +1,61 @@
+"""
+HTTP load test of a running stack.
+
+Every simulated user registers, obtains a token and then creates, lists and polls tasks::
+
+    locust -f benchmarks/locustfile.py --host http://localhost:8000 --headless \
+        --users 100 --spawn-rate 10 --run-time 1m --csv /tmp/locust
+
+Locust reports throughput and percentiles per endpoint, query counts are measured by
+``python -m benchmarks.api``.
+"""
+
+import json
+import random
+import uuid
+from typing import List
+
+from locust import HttpUser
+from locust import between
+from locust import task
+
+PASSWORD = "benchmark-password-123"  # noqa: S105
+
+
+class TaskApiUser(HttpUser):
+    wait_time = between(0.1, 0.5)
+
+    def on_start(self) -> None:
+        self.task_ids: List[int] = []
+
+        name = f"locust_{uuid.uuid4().hex}"
+        email = f"{name}@example.com"
+        self.client.post("/api/users/register/", json={"username": name, "email": email, "password": PASSWORD})
+        response = self.client.post("/api/users/token/", json={"email": email, "password": PASSWORD})
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access']}"
+
+    @task(2)
+    def create_sum(self) -> None:
+        data = {"task_type": "sum", "input_data": json.dumps({"num1": random.randint(1, 100), "num2": 1})}  # noqa: S311
+        response = self.client.post("/api/tasks/", json=data)
+        if response.status_code == 201:
+            self.task_ids.append(response.json()["id"])
+
+    @task(1)
+    def create_countdown(self) -> None:
+        data = {"task_type": "countdown", "input_data": json.dumps({"seconds": 1})}
+        with self.client.post("/api/tasks/", json=data, catch_response=True) as response:
+            # The active task quota is expected to reject some of them
+            if response.status_code in (201, 403):
+                response.success()
+            if response.status_code == 201:
+                self.task_ids.append(response.json()["id"])
+
+    @task(5)
+    def list_tasks(self) -> None:
+        self.client.get("/api/tasks/")
+
+    @task(10)
+    def detail(self) -> None:
+        if self.task_ids:
+            self.client.get(f"/api/tasks/{random.choice(self.task_ids)}/", name="/api/tasks/[id]/")  # noqa: S311
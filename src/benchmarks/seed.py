@@ -0,0 +1,42 @@
+"""
+Realistic volumes of data built with the test factories.
+"""
+
+import sys
+from typing import List
+
+import factory.random
+
+from tasks.models import Task
+from tests.factories import TaskFactory
+from tests.factories import UserFactory
+from users.models import User
+
+SEED_PASSWORD = "benchmark-password-123"  # noqa: S105
+
+
+def seed_users(count: int) -> List[User]:
+    return UserFactory.create_batch(count, password=SEED_PASSWORD)
+
+
+def seed_tasks(users: List[User], tasks_per_user: int, batch_size: int = 5000) -> None:
+    """
+    Insert ``tasks_per_user`` tasks of every type and status for every user.
+
+    Tasks are built by the factory and inserted with ``bulk_create``, so millions of rows
+    take minutes instead of hours.
+    """
+    for user in users:
+        for start in range(0, tasks_per_user, batch_size):
+            size = min(batch_size, tasks_per_user - start)
+            Task.objects.bulk_create(TaskFactory.build_batch(size, user=user), batch_size=batch_size)
+            sys.stderr.write(f"\rSeeded {start + size}/{tasks_per_user} tasks of {user.username}")
+        sys.stderr.write("\n")
+
+
+def seed(users: int, tasks_per_user: int, random_seed: int) -> List[User]:
+    # The same seed builds the same data, so runs are comparable
+    factory.random.reseed_random(random_seed)
+    seeded = seed_users(users)
+    seed_tasks(seeded, tasks_per_user)
+    return seeded
@@ -0,0 +1,117 @@
+"""
+Micro-benchmark of the task list serializers and JSON renderers.
+
+Renders the same page of tasks with ``TaskSerializer`` from model instances, the way the list
+used to do it, and with ``TaskListSerializer`` from ``values()`` rows, the way it does now.
+The page is then encoded with the DRF ``JSONRenderer`` and with ``ORJSONRenderer``::
+
+    python -m benchmarks.serializers --rows 100 --repeat 500
+
+Only the Python cost of the response is measured: the tasks are built in memory and no
+database is used. Both serializers and both renderers have to produce identical output,
+otherwise the run fails.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from datetime import timedelta
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from benchmarks.environment import setup_django
+
+setup_django()
+# Factory logs would drown the report
+logging.disable(logging.INFO)
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from benchmarks.stats import format_results  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+from tasks.models import Task  # noqa: E402
+from tasks.serializers import TaskListSerializer  # noqa: E402
+from tasks.serializers import TaskSerializer  # noqa: E402
+from tests.factories import TaskFactory  # noqa: E402
+from tests.factories import UserFactory  # noqa: E402
+from utils.renderers import ORJSONRenderer  # noqa: E402
+
+Render = Callable[[], Any]
+
+
+def build_tasks(count: int) -> List[Task]:
+    user = UserFactory.build(id=1)
+    now = timezone.now()
+    return [TaskFactory.build(id=i, user=user, created_at=now - timedelta(seconds=i)) for i in range(1, count + 1)]
+
+
+def get_row(task: Task) -> Dict[str, Any]:
+    # The row ``values(*TaskListSerializer.values)`` would read for the task
+    return {
+        "id": task.id,
+        "user__username": task.user.username,
+        "task_type": task.task_type,
+        "input_data": task.input_data,
+        "status": task.status,
+        "result": task.result,
+        "created_at": task.created_at,
+    }
+
+
+def measure(render: Render, repeat: int) -> Dict[str, float]:
+    durations: List[float] = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        render()
+        durations.append(time.perf_counter() - begin)
+    return summarize(durations, time.perf_counter() - started)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="tasks on the rendered page")
+    parser.add_argument("--repeat", type=int, default=500, help="rendered pages per serializer")
+    parser.add_argument("--warmup", type=int, default=50, help="pages rendered before measuring")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    tasks = build_tasks(args.rows)
+    rows = [get_row(task) for task in tasks]
+    data = TaskListSerializer(rows, many=True).data
+    renders: Dict[str, Render] = {
+        "model_serializer": lambda: TaskSerializer(tasks, many=True).data,
+        "values_serializer": lambda: TaskListSerializer(rows, many=True).data,
+        "json_renderer": lambda: JSONRenderer().render(data),
+        "orjson_renderer": lambda: ORJSONRenderer().render(data),
+    }
+
+    if renders["model_serializer"]() != data:
+        print("The serializers render different data")  # noqa: T201
+        return 1
+    if renders["json_renderer"]() != renders["orjson_renderer"]():
+        print("The renderers encode different JSON")  # noqa: T201
+        return 1
+
+    for render in renders.values():
+        for _ in range(args.warmup):
+            render()
+
+    results = {name: measure(render, args.repeat) for name, render in renders.items()}
+    print(format_results(results))  # noqa: T201
+
+    for slow, fast in (("model_serializer", "values_serializer"), ("json_renderer", "orjson_renderer")):
+        speedup = results[slow]["mean_ms"] / results[fast]["mean_ms"]
+        print(f"{args.rows} rows per page, {fast} is {speedup:.1f}x faster than {slow}")  # noqa: T201
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Summaries of benchmark samples and their comparison with a baseline.
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import django
+
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+
+# Relative slowdown of the percentiles and the throughput tolerated before a run is considered a regression
+DEFAULT_TOLERANCE = 0.2
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Percentile of the samples with linear interpolation between the closest ranks.
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(durations: Sequence[float], elapsed: float, queries: Sequence[int] = ()) -> Dict[str, float]:
+    """
+    Summarize the durations of operations in seconds, run sequentially within ``elapsed`` seconds.
+    """
+    summary = {
+        "count": len(durations),
+        "throughput": len(durations) / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": statistics.fmean(durations) * 1000 if durations else 0.0,
+        "p50_ms": percentile(durations, 50) * 1000,
+        "p95_ms": percentile(durations, 95) * 1000,
+        "p99_ms": percentile(durations, 99) * 1000,
+    }
+    if queries:
+        summary["queries"] = max(queries)
+    return summary
+
+
+def get_environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def compare_results(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """
+    List regressions of the results against the baseline.
+
+    More queries than in the baseline are a regression whatever the tolerance, percentiles and
+    the throughput are compared with the relative ``tolerance`` to absorb the noise of a run.
+    """
+    regressions: List[str] = []
+    for name, expected in baseline.items():
+        actual = results.get(name)
+        if actual is None:
+            continue
+
+        if "queries" in expected and actual.get("queries", 0) > expected["queries"]:
+            regressions.append(f"{name}: {actual['queries']} queries, baseline {expected['queries']}")
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if actual[key] > expected[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {actual[key]:.2f}, baseline {expected[key]:.2f}")
+        if actual["throughput"] < expected["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {actual['throughput']:.1f}/s, baseline {expected['throughput']:.1f}/s"
+            )
+    return regressions
+
+
+def load_report(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_report(path: Path, report: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    lines = [f"{'name':<20}{'count':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"]
+    for name, summary in results.items():
+        lines.append(
+            f"{name:<20}{summary['count']:>8}{summary['throughput']:>10.1f}{summary['p50_ms']:>10.2f}"
+            f"{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}{summary.get('queries', '-'):>9}"
+        )
+    return "\n".join(lines)
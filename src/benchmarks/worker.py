@@ -0,0 +1,263 @@
+"""
+Celery worker benchmark.
+
+Starts a real worker with the given pool and concurrency, floods it with tasks of a type and
+measures the throughput, the latency from ``created_at`` to ``finished_at`` and the database
+queries per task::
+
+    python -m benchmarks.worker --task-types sum countdown --tasks 1000 --pool prefork --concurrency 4
+
+Tasks are created and dispatched the way the API does it, so the task settings (message
+payload, batch consumer, fair dispatch, deferred countdown) apply. With ``BENCHMARK_REDIS``
+the configured Redis broker is used, otherwise a filesystem transport stands in for it.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import signal
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from benchmarks.environment import configure_filesystem_broker
+from benchmarks.environment import get_broker_environment
+from benchmarks.environment import get_settings_overrides
+from benchmarks.environment import setup_django
+from benchmarks.environment import use_redis
+
+# The worker process has to find the messages of the filesystem transport
+BROKER_FOLDER = tempfile.mkdtemp(prefix="benchmark-broker-")
+os.environ["BENCHMARK_BROKER_FOLDER"] = BROKER_FOLDER
+
+setup_django(broker_url="filesystem://")
+configure_filesystem_broker()
+# Factory logs would drown the report
+logging.disable(logging.INFO)
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from benchmarks.stats import BASELINES_DIR  # noqa: E402
+from benchmarks.stats import DEFAULT_TOLERANCE  # noqa: E402
+from benchmarks.stats import compare_results  # noqa: E402
+from benchmarks.stats import format_results  # noqa: E402
+from benchmarks.stats import get_environment  # noqa: E402
+from benchmarks.stats import load_report  # noqa: E402
+from benchmarks.stats import percentile  # noqa: E402
+from benchmarks.stats import save_report  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+from tasks.backlog import get_task_queues  # noqa: E402
+from tasks.models import ACTIVE_TASK_STATUSES  # noqa: E402
+from tasks.models import Task  # noqa: E402
+from tasks.models import TaskTypeEnum  # noqa: E402
+from tasks.tasks import dispatch_tasks  # noqa: E402
+from tests.factories import UserFactory  # noqa: E402
+from users.models import User  # noqa: E402
+
+POOLS = ("prefork", "threads", "gevent", "eventlet", "solo")
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class Worker:
+    """
+    A worker process serving the task queues of the test database.
+    """
+
+    def __init__(self, pool: str, concurrency: int) -> None:
+        self.stats_dir = tempfile.mkdtemp(prefix="benchmark-worker-")
+        self.log_path = Path(self.stats_dir, "worker.log")
+        self.command = [
+            sys.executable,
+            "-m",
+            "celery",
+            "--app",
+            "benchmarks.worker_app",
+            "worker",
+            "--pool",
+            pool,
+            "--concurrency",
+            str(concurrency),
+            "--queues",
+            ",".join(get_task_queues()),
+            "--loglevel",
+            "WARNING",
+            "--without-heartbeat",
+            "--without-mingle",
+            "--without-gossip",
+        ]
+        self.process: Optional[subprocess.Popen] = None
+
+    def get_environment(self) -> Dict[str, str]:
+        # The settings of the worker are read from the environment
+        overrides = {name: str(value) for name, value in get_settings_overrides().items()}
+        return {
+            **os.environ,
+            **get_broker_environment("filesystem://"),
+            **overrides,
+            "POSTGRES_DB": settings.DATABASES["default"]["NAME"],
+            "BENCHMARK_STATS_DIR": self.stats_dir,
+        }
+
+    def start(self) -> None:
+        # Logs of every task would drown the report
+        with self.log_path.open("wb") as log:
+            self.process = subprocess.Popen(  # noqa: S603
+                self.command, env=self.get_environment(), stdout=log, stderr=subprocess.STDOUT
+            )
+
+    def check(self) -> None:
+        if self.process is not None and self.process.poll() is not None:
+            raise BenchmarkError(f"Worker exited with code {self.process.returncode}, see {self.log_path}")
+
+    def stop(self) -> Dict[str, int]:
+        """
+        Shut the worker down warmly and sum the totals written by its processes.
+        """
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            self.process.wait(timeout=60)
+
+        totals = {"tasks": 0, "queries": 0}
+        for path in Path(self.stats_dir).glob("*.json"):
+            for name, value in json.loads(path.read_text()).items():
+                totals[name] += value
+        return totals
+
+
+def get_input_data(task_type: str, index: int, seconds: float) -> Dict[str, Any]:
+    # Distinct inputs, so the result cache does not serve them
+    if task_type == TaskTypeEnum.COUNTDOWN:
+        return {"seconds": seconds}
+    return {"num1": index, "num2": 1}
+
+
+def flood(user: User, task_type: str, count: int, seconds: float) -> List[int]:
+    tasks = Task.objects.bulk_create(
+        [Task(user=user, task_type=task_type, input_data=get_input_data(task_type, i, seconds)) for i in range(count)]
+    )
+    dispatch_tasks(tasks)
+    return [task.id for task in tasks]
+
+
+def wait_finished(worker: Worker, task_ids: List[int], timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while Task.objects.filter(id__in=task_ids, status__in=ACTIVE_TASK_STATUSES).exists():
+        worker.check()
+        if time.monotonic() > deadline:
+            raise BenchmarkError(f"Tasks were not finished in {timeout} seconds")
+        time.sleep(0.2)
+
+
+def summarize_tasks(task_ids: List[int]) -> Dict[str, float]:
+    tasks = list(Task.objects.filter(id__in=task_ids).values("created_at", "started_at", "finished_at"))
+    latencies = [(task["finished_at"] - task["created_at"]).total_seconds() for task in tasks]
+    elapsed = (max(task["finished_at"] for task in tasks) - min(task["created_at"] for task in tasks)).total_seconds()
+
+    summary = summarize(latencies, elapsed)
+    waits = [(task["started_at"] - task["created_at"]).total_seconds() for task in tasks if task["started_at"]]
+    runs = [(task["finished_at"] - task["started_at"]).total_seconds() for task in tasks if task["started_at"]]
+    summary["queue_wait_p95_ms"] = percentile(waits, 95) * 1000
+    summary["run_p95_ms"] = percentile(runs, 95) * 1000
+    return summary
+
+
+def run_task_type(args: argparse.Namespace, user: User, task_type: str) -> Dict[str, float]:
+    # Every task type gets a fresh worker, so the query totals belong to it alone
+    worker = Worker(args.pool, args.concurrency)
+    worker.start()
+    try:
+        # The warmup also waits for the worker to start consuming
+        warmup_ids = flood(user, task_type, args.warmup, args.countdown_seconds)
+        wait_finished(worker, warmup_ids, args.timeout)
+
+        task_ids = flood(user, task_type, args.tasks, args.countdown_seconds)
+        wait_finished(worker, task_ids, args.timeout)
+    finally:
+        totals = worker.stop()
+
+    summary = summarize_tasks(task_ids)
+    summary["queries"] = round(totals["queries"] / (args.warmup + args.tasks), 2)
+    return summary
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    user = UserFactory()
+    results = {task_type: run_task_type(args, user, task_type) for task_type in args.task_types}
+    return {
+        "environment": get_environment(),
+        "parameters": {
+            "pool": args.pool,
+            "concurrency": args.concurrency,
+            "tasks": args.tasks,
+            "countdown_seconds": args.countdown_seconds,
+            "redis": use_redis(),
+        },
+        "results": results,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--task-types", nargs="+", default=[TaskTypeEnum.SUM, TaskTypeEnum.COUNTDOWN])
+    parser.add_argument("--tasks", type=int, default=1000, help="measured tasks per type")
+    parser.add_argument("--warmup", type=int, default=50, help="tasks per type before measuring")
+    parser.add_argument("--pool", choices=POOLS, default="prefork")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--countdown-seconds", type=float, default=0, help="input of the countdown tasks")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for a flood to finish")
+    parser.add_argument("--output", type=Path, help="file to write the report to")
+    parser.add_argument("--baseline", type=Path, default=BASELINES_DIR / "worker.json")
+    parser.add_argument("--save-baseline", action="store_true", help="replace the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        # The flood keeps far more active tasks than the quota allows
+        with override_settings(TASKS_ACTIVE_LIMIT=sys.maxsize, **get_settings_overrides()):
+            report = run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(BROKER_FOLDER, ignore_errors=True)
+
+    print(format_results(report["results"]))  # noqa: T201
+    if args.output:
+        save_report(args.output, report)
+    if args.save_baseline:
+        save_report(args.baseline, report)
+        return 0
+
+    baseline = load_report(args.baseline)
+    if baseline is None:
+        return 0
+    if baseline["parameters"] != report["parameters"]:
+        print(f"Parameters differ from the baseline {baseline['parameters']}, not compared")  # noqa: T201
+        return 0
+
+    regressions = compare_results(report["results"], baseline["results"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")  # noqa: T201
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
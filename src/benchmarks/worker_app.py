@@ -0,0 +1,61 @@
+"""
+Celery app of the benchmark worker.
+
+The app of the project counting the database queries of every executed task with ``utils.queries``.
+Every worker process writes its totals to ``BENCHMARK_STATS_DIR`` when it shuts down::
+
+    celery --app benchmarks.worker_app worker --pool threads --concurrency 8
+"""
+
+import json
+import os
+import threading
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict
+
+from celery.signals import task_postrun
+from celery.signals import task_prerun
+from celery.signals import worker_process_shutdown
+from celery.signals import worker_shutdown
+
+from benchmarks.environment import configure_filesystem_broker
+from fizikl_assignment.celery import app
+from utils.queries import count_queries
+
+__all__ = ("app",)
+
+configure_filesystem_broker()
+# The local transports do not support broadcasts and the benchmark does not need them
+app.conf.worker_enable_remote_control = False
+
+# Query counter of the task running in the current thread or greenlet
+current = threading.local()
+
+totals: Dict[str, int] = {"tasks": 0, "queries": 0}
+totals_lock = threading.Lock()
+
+
+@task_prerun.connect
+def start_task_queries(**kwargs) -> None:
+    current.queries = ExitStack()
+    current.counter = current.queries.enter_context(count_queries())
+
+
+@task_postrun.connect
+def add_task_queries(**kwargs) -> None:
+    current.queries.close()
+    with totals_lock:
+        totals["tasks"] += 1
+        totals["queries"] += current.counter.count
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def save_totals(**kwargs) -> None:
+    stats_dir = os.environ.get("BENCHMARK_STATS_DIR")
+    if stats_dir is None:
+        return
+
+    with totals_lock:
+        Path(stats_dir, f"{os.getpid()}.json").write_text(json.dumps(totals))
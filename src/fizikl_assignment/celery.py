@@ -2,8 +2,12 @@ import os
 
 from celery import Celery
 from celery.signals import setup_logging
+from celery.signals import worker_init
+from celery.signals import worker_process_shutdown
 from django.conf import settings
 from django_structlog.celery.steps import DjangoStructLogInitStep
+from prometheus_client import multiprocess
+from prometheus_client import start_http_server
 
 from fizikl_assignment.loggers import setup_logger
 
@@ -28,6 +32,21 @@ def receiver_setup_logging(loglevel, logfile, format, colorize, **kwargs):
     setup_logger()
 
 
+@worker_init.connect
+def receiver_worker_init(**kwargs):
+    # The main process serves the metrics of the pool, prefork children write them to PROMETHEUS_MULTIPROC_DIR
+    if settings.CELERY_METRICS_PORT:
+        from utils.metrics import get_metrics_registry
+
+        start_http_server(settings.CELERY_METRICS_PORT, registry=get_metrics_registry())
+
+
+@worker_process_shutdown.connect
+def receiver_worker_process_shutdown(pid=None, **kwargs):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f"Request: {self.request!r}")  # noqa: T201
@@ -86,6 +86,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django_structlog.middlewares.RequestMiddleware",
+    "utils.middleware.QueryCountMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -180,11 +181,21 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # REST Framework settings
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("users.authentication.CachedJWTAuthentication",),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    # orjson in place of the standard library json, same output and errors
+    "DEFAULT_RENDERER_CLASSES": [
+        "utils.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "utils.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
 }
@@ -209,8 +220,105 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_DEFAULT_QUEUE = env.str("CELERY_TASK_DEFAULT_QUEUE", "celery")
+# ETA messages (deferred countdowns) are redelivered by Redis after the visibility timeout,
+# so it has to be longer than the longest countdown we expect
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "visibility_timeout": env.int("CELERY_VISIBILITY_TIMEOUT", 12 * 60 * 60),
+}
+# Handlers of task types are routed to the queues of their cost classes (see tasks.registry)
+CELERY_TASK_ROUTES = ("tasks.registry.route_task",)
+# Port of the Prometheus exporter of a worker, 0 disables it
+CELERY_METRICS_PORT = env.int("CELERY_METRICS_PORT", 0)
+
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-active-task-quota": {
+        "task": "tasks.tasks.reconcile_active_task_quota",
+        "schedule": env.int("TASKS_QUOTA_RECONCILE_INTERVAL", 60),
+    },
+    "record-task-backlog": {
+        "task": "tasks.tasks.record_task_backlog",
+        "schedule": env.int("TASKS_BACKLOG_MEASURE_INTERVAL", 10),
+    },
+    "dispatch-fair-share": {
+        "task": "tasks.tasks.dispatch_fair_share",
+        "schedule": env.int("TASKS_FAIR_DISPATCH_INTERVAL", 5),
+    },
+    "manage-task-partitions": {
+        "task": "tasks.tasks.manage_task_partitions",
+        "schedule": env.int("TASKS_PARTITIONS_MANAGE_INTERVAL", 60 * 60),
+    },
+    "archive-expired-tasks": {
+        "task": "tasks.tasks.archive_expired_tasks",
+        "schedule": env.int("TASKS_RETENTION_INTERVAL", 10 * 60),
+    },
+}
+
+# Redis settings
+REDIS_HOST = env.str("REDIS_HOST", "localhost")
+REDIS_PORT = env.int("REDIS_PORT", 6379)
+REDIS_APP_DB = env.int("REDIS_APP_DB", 3)
+REDIS_APP_URL = env.str("REDIS_APP_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_APP_DB}")
+# Result cache, evicted under memory pressure, so kept apart from the broker and the counters
+REDIS_CACHE_URL = env.str("REDIS_CACHE_URL", REDIS_APP_URL)
+
+# Tasks settings
+TASKS_ACTIVE_LIMIT = env.int("TASKS_ACTIVE_LIMIT", 5)
+# "redis" keeps atomic per-user counters, "db" counts active tasks on every creation
+TASKS_QUOTA_BACKEND = env.str("TASKS_QUOTA_BACKEND", "redis")
+TASKS_QUOTA_REDIS_KEY = env.str("TASKS_QUOTA_REDIS_KEY", "tasks:active")
+TASKS_BATCH_MAX_SIZE = env.int("TASKS_BATCH_MAX_SIZE", 500)
+TASKS_COUNTDOWN_DEFERRED = env.bool("TASKS_COUNTDOWN_DEFERRED", True)
+TASKS_INLINE_ENABLED = env.bool("TASKS_INLINE_ENABLED", True)
+TASKS_MESSAGE_PAYLOAD_ENABLED = env.bool("TASKS_MESSAGE_PAYLOAD_ENABLED", True)
+TASKS_BATCH_CONSUMER_ENABLED = env.bool("TASKS_BATCH_CONSUMER_ENABLED", False)
+TASKS_BATCH_CONSUMER_SIZE = env.int("TASKS_BATCH_CONSUMER_SIZE", 200)
+TASKS_FAIR_DISPATCH_ENABLED = env.bool("TASKS_FAIR_DISPATCH_ENABLED", False)
+TASKS_FAIR_WINDOW = env.int("TASKS_FAIR_WINDOW", 20)
+TASKS_FAIR_REDISPATCH_AFTER = env.int("TASKS_FAIR_REDISPATCH_AFTER", 5 * 60)
+TASKS_ADMISSION_ENABLED = env.bool("TASKS_ADMISSION_ENABLED", True)
+TASKS_ADMISSION_RETRY_AFTER = env.int("TASKS_ADMISSION_RETRY_AFTER", 30)
+TASKS_BACKLOG_MAX_DEPTH = env.int("TASKS_BACKLOG_MAX_DEPTH", 10_000)
+TASKS_BACKLOG_MAX_AGE = env.int("TASKS_BACKLOG_MAX_AGE", 5 * 60)
+# Pending tasks older than this lost their message rather than wait behind a backlog
+TASKS_BACKLOG_STALE_AGE = env.int("TASKS_BACKLOG_STALE_AGE", 15 * 60)
+TASKS_BACKLOG_MEASURE_INTERVAL = env.int("TASKS_BACKLOG_MEASURE_INTERVAL", 10)
+TASKS_BACKLOG_KEY = env.str("TASKS_BACKLOG_KEY", "tasks:backlog")
+TASKS_QUEUES = {
+    "light": env.str("TASKS_LIGHT_QUEUE", "tasks.light"),
+    "heavy": env.str("TASKS_HEAVY_QUEUE", "tasks.heavy"),
+}
+# Task status changes published to Redis pub/sub and streamed to clients as Server-Sent Events
+TASKS_EVENTS_ENABLED = env.bool("TASKS_EVENTS_ENABLED", True)
+TASKS_EVENTS_CHANNEL_PREFIX = env.str("TASKS_EVENTS_CHANNEL_PREFIX", "tasks:events")
+TASKS_EVENTS_KEEPALIVE = env.int("TASKS_EVENTS_KEEPALIVE", 15)
+TASKS_EVENTS_RETRY_MS = env.int("TASKS_EVENTS_RETRY_MS", 3000)
+TASKS_EVENTS_SNAPSHOT_WINDOW = env.int("TASKS_EVENTS_SNAPSHOT_WINDOW", 5 * 60)
+# Results of deterministic task types cached by their input
+TASKS_RESULT_CACHE_ENABLED = env.bool("TASKS_RESULT_CACHE_ENABLED", True)
+TASKS_RESULT_CACHE_TTL = env.int("TASKS_RESULT_CACHE_TTL", 24 * 60 * 60)
+TASKS_RESULT_CACHE_KEY_PREFIX = env.str("TASKS_RESULT_CACHE_KEY_PREFIX", "tasks:result")
+# Task list and detail served by native async views, for the ASGI application
+TASKS_ASYNC_VIEWS_ENABLED = env.bool("TASKS_ASYNC_VIEWS_ENABLED", False)
+# Per-user task list version in Redis used as the list ETag
+TASKS_LIST_VERSION_ENABLED = env.bool("TASKS_LIST_VERSION_ENABLED", True)
+TASKS_LIST_VERSION_KEY_PREFIX = env.str("TASKS_LIST_VERSION_KEY_PREFIX", "tasks:list-version")
+# Monthly partitions of the task table: created months ahead, retired after a number of months (0 keeps all)
+TASKS_PARTITIONS_PREMAKE = env.int("TASKS_PARTITIONS_PREMAKE", 3)
+TASKS_PARTITIONS_RETENTION = env.int("TASKS_PARTITIONS_RETENTION", 0)
+TASKS_PARTITIONS_DROP = env.bool("TASKS_PARTITIONS_DROP", False)
+# Finished tasks older than the age in seconds are soft deleted and moved to the archive table in chunks
+TASKS_RETENTION_ENABLED = env.bool("TASKS_RETENTION_ENABLED", False)
+TASKS_RETENTION_AGE = env.int("TASKS_RETENTION_AGE", 90 * 24 * 60 * 60)
+TASKS_RETENTION_CHUNK_SIZE = env.int("TASKS_RETENTION_CHUNK_SIZE", 500)
+TASKS_RETENTION_MAX_CHUNKS = env.int("TASKS_RETENTION_MAX_CHUNKS", 100)
 
 AUTH_USER_MODEL = "users.User"
+# Users of JWT authentication cached in Redis, invalidated on every change of the user
+USERS_AUTH_CACHE_ENABLED = env.bool("USERS_AUTH_CACHE_ENABLED", True)
+USERS_AUTH_CACHE_TTL = env.int("USERS_AUTH_CACHE_TTL", 5 * 60)
+USERS_AUTH_CACHE_KEY_PREFIX = env.str("USERS_AUTH_CACHE_KEY_PREFIX", "users:auth")
 AUTHENTICATION_BACKENDS = [
     "users.backends.EmailBackend",
 ]
@@ -230,6 +338,8 @@ DJANGO_REQUEST_LOG_LEVEL = env.str("DJANGO_REQUEST_LOG_LEVEL", "INFO")
 DJANGO_DATABASE_LOG_LEVEL = env.str("DJANGO_DATABASE_LOG_LEVEL", "DEBUG")
 DEFAULT_LOGGER_HANDLER = env.str("DJANGO_DEFAULT_LOGGER_HANDLER", "console")
 DJANGO_STRUCTLOG_STATUS_4XX_LOG_LEVEL = logging.WARNING
+# Fail requests over the query budget of their view instead of logging them
+DB_QUERY_BUDGET_RAISE = env.bool("DB_QUERY_BUDGET_RAISE", False)
 SHARED_PROCESSORS = [
     structlog.contextvars.merge_contextvars,
     structlog.processors.TimeStamper(fmt="iso"),
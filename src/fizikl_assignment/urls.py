@@ -23,6 +23,7 @@ from drf_spectacular.views import SpectacularRedocView
 from drf_spectacular.views import SpectacularSwaggerView
 
 from users.forms import CustomAuthenticationForm
+from utils.metrics import metrics_view
 
 admin.autodiscover()
 admin.site.login_form = CustomAuthenticationForm
@@ -30,7 +31,7 @@ admin.site.login_form = CustomAuthenticationForm
 urlpatterns = [
     path("admin/", admin.site.urls),
     path(r"api/healthcheck/", include("health_check.urls")),
-
+    path("metrics", metrics_view, name="metrics"),
     path("api/tasks/", include("tasks.urls")),
     path("api/users/", include("users.urls")),
     # Swagger URLs
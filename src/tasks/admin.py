@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from .models import ArchivedTask
 from .models import Task
 
 
@@ -9,3 +10,16 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ("task_type", "status", "created_at")
     search_fields = ("user__username", "task_type", "status")
     readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "task_type", "status", "created_at", "archived_at")
+    list_filter = ("task_type", "status", "created_at")
+    search_fields = ("user__username", "task_type", "status")
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
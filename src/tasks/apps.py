@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tasks"
+
+    def ready(self) -> None:
+        from health_check.plugins import plugin_dir
+
+        # Register the built-in task types
+        from . import tasks  # noqa: F401
+        from .health_checks import TaskBacklogHealthCheck
+
+        plugin_dir.register(TaskBacklogHealthCheck)
@@ -0,0 +1,136 @@
+"""
+Broker backlog monitor and admission control.
+
+``record_task_backlog`` periodically measures the depth of the task queues and the age of
+the oldest pending task and keeps the snapshot in Redis. While the backlog is above the
+thresholds, new tasks that would be enqueued are refused with ``503`` and ``Retry-After``:
+they would only wait behind the backlog while their clients time out polling.
+
+Only pending tasks that can be waiting in the queues are aged: none while the queues are
+empty, and none created more than ``TASKS_BACKLOG_STALE_AGE`` seconds ago. A task whose message
+was lost stays pending forever and would otherwise refuse every new task for good.
+"""
+
+import json
+import time
+from datetime import timedelta
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+import redis
+import structlog
+from django.conf import settings
+from django.db.models import Min
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from utils.redis import get_broker_redis
+from utils.redis import get_redis
+
+from .models import Task
+from .models import TaskStatusEnum
+from .registry import task_types
+
+logger = structlog.get_logger(__name__)
+
+# Priority steps of the Redis transport, every non-zero step is kept in a separate list
+BROKER_PRIORITY_STEPS = (0, 3, 6, 9)
+BROKER_PRIORITY_SEP = "\x06\x16"
+
+
+class TaskBacklog(NamedTuple):
+    # Messages waiting in the task queues
+    depth: int
+    # Seconds the oldest pending task not yet stale has been waiting
+    oldest_pending_age: float
+    measured_at: float
+
+    def is_exceeded(self) -> bool:
+        return self.depth > settings.TASKS_BACKLOG_MAX_DEPTH or self.oldest_pending_age > settings.TASKS_BACKLOG_MAX_AGE
+
+
+class TaskBacklogExceeded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many tasks are waiting to be processed, try again later."
+    default_code = "task_backlog_exceeded"
+
+    @property
+    def wait(self) -> int:
+        # Sent as the Retry-After header by the DRF exception handler
+        return settings.TASKS_ADMISSION_RETRY_AFTER
+
+
+def get_task_queues() -> List[str]:
+    return sorted({settings.CELERY_TASK_DEFAULT_QUEUE, *task_types.get_queues()})
+
+
+def measure_queue_depths() -> Dict[str, int]:
+    """
+    Messages waiting in every task queue, summed over its priority lists.
+    """
+    queues = get_task_queues()
+    pipe = get_broker_redis().pipeline(transaction=False)
+    for queue in queues:
+        for priority in BROKER_PRIORITY_STEPS:
+            pipe.llen(f"{queue}{BROKER_PRIORITY_SEP}{priority}" if priority else queue)
+    # The lengths come in the order of the queues and of their priority steps
+    lengths = iter(pipe.execute())
+    return {queue: sum(next(lengths) for _ in BROKER_PRIORITY_STEPS) for queue in queues}
+
+
+def measure_task_backlog(queue_depths: Optional[Dict[str, int]] = None) -> TaskBacklog:
+    if queue_depths is None:
+        queue_depths = measure_queue_depths()
+    depth = sum(queue_depths.values())
+
+    age = 0.0
+    if depth:
+        now = timezone.now()
+        pending = Task.objects.filter(
+            status=TaskStatusEnum.PENDING,
+            created_at__gte=now - timedelta(seconds=settings.TASKS_BACKLOG_STALE_AGE),
+        )
+        oldest = pending.aggregate(oldest=Min("created_at"))["oldest"]
+        if oldest is not None:
+            age = (now - oldest).total_seconds()
+
+    return TaskBacklog(depth=depth, oldest_pending_age=max(age, 0.0), measured_at=time.time())
+
+
+def save_task_backlog(backlog: TaskBacklog) -> None:
+    # A snapshot outlives a few missed measurements, a stale one expires and admits everything
+    get_redis().set(
+        settings.TASKS_BACKLOG_KEY,
+        json.dumps(backlog._asdict()),
+        ex=settings.TASKS_BACKLOG_MEASURE_INTERVAL * 3,
+    )
+
+
+def get_task_backlog() -> Optional[TaskBacklog]:
+    try:
+        value = get_redis().get(settings.TASKS_BACKLOG_KEY)
+    except redis.RedisError:
+        logger.exception("Failed to get task backlog")
+        return None
+
+    if value is None:
+        return None
+    return TaskBacklog(**json.loads(value))
+
+
+def check_task_admission() -> None:
+    """
+    Refuse a new task that would be enqueued while the backlog is above the thresholds.
+
+    The check fails open: without a recent snapshot every task is admitted.
+    """
+    if not settings.TASKS_ADMISSION_ENABLED:
+        return
+
+    backlog = get_task_backlog()
+    if backlog is not None and backlog.is_exceeded():
+        logger.warning("Task refused by admission control", **backlog._asdict())
+        raise TaskBacklogExceeded()
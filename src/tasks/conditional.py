@@ -0,0 +1,111 @@
+"""
+Validators for conditional GET requests on tasks.
+
+A task detail is validated by ``updated_at`` of the task, the task list by a per-user
+version in Redis that is bumped on every change of the user's tasks. Both are
+cheap to compute, so an unchanged resource is answered with ``304`` without running
+the serializer.
+"""
+
+import hashlib
+import time
+from datetime import datetime
+from typing import Optional
+from typing import Tuple
+
+import redis
+import structlog
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from rest_framework.request import Request
+
+from utils.redis import get_redis
+
+from .models import ACTIVE_TASK_STATUSES
+from .models import Task
+
+logger = structlog.get_logger(__name__)
+
+
+def get_task_list_version_key(user_id: int) -> str:
+    return f"{settings.TASKS_LIST_VERSION_KEY_PREFIX}:{user_id}"
+
+
+def bump_task_list_version(user_id: int) -> None:
+    if not settings.TASKS_LIST_VERSION_ENABLED:
+        return
+
+    try:
+        # A timestamp instead of a counter never repeats a version after Redis loses the key
+        get_redis().set(get_task_list_version_key(user_id), time.time_ns())
+    except redis.RedisError:
+        # A stale version would let clients keep an outdated list, so drop it
+        logger.exception("Failed to bump task list version", user_id=user_id)
+        try:
+            get_redis().delete(get_task_list_version_key(user_id))
+        except redis.RedisError:
+            pass
+
+
+def bump_task_list_version_on_commit(user_id: int) -> None:
+    transaction.on_commit(lambda: bump_task_list_version(user_id))
+
+
+def get_task_state(request: Request, pk: int) -> Optional[Tuple[datetime, str]]:
+    # Both validators of a request share a single lookup
+    if not hasattr(request, "_task_state"):
+        request._task_state = get_task_state_queryset(request, pk).first()
+    return request._task_state
+
+
+async def aget_task_state(request: HttpRequest, pk: int) -> Optional[Tuple[datetime, str]]:
+    # Looked up ahead by async views, the validators then read it from the request
+    if not hasattr(request, "_task_state"):
+        request._task_state = await get_task_state_queryset(request, pk).afirst()
+    return request._task_state
+
+
+def get_task_state_queryset(request: HttpRequest, pk: int) -> QuerySet:
+    return Task.objects.filter(pk=pk, user=request.user).values_list("updated_at", "status")
+
+
+def task_detail_etag(request: Request, pk: int) -> Optional[str]:
+    state = get_task_state(request, pk)
+    if state is None:
+        return None
+    updated_at, _ = state
+    return f"task-{pk}-{int(updated_at.timestamp() * 1_000_000)}"
+
+
+def task_detail_last_modified(request: Request, pk: int) -> Optional[datetime]:
+    state = get_task_state(request, pk)
+    if state is None:
+        return None
+    updated_at, status = state
+    # HTTP dates have a one second resolution while an active task can change several
+    # times per second, so only finished tasks are validated by date
+    if status in ACTIVE_TASK_STATUSES:
+        return None
+    return updated_at
+
+
+def task_list_etag(request: Request) -> Optional[str]:
+    if not settings.TASKS_LIST_VERSION_ENABLED:
+        return None
+
+    key = get_task_list_version_key(request.user.id)
+    try:
+        version = get_redis().get(key)
+        if version is None:
+            # Start versioning the list of a user who has not changed any task yet
+            get_redis().set(key, time.time_ns(), nx=True)
+            version = get_redis().get(key)
+    except redis.RedisError:
+        logger.exception("Failed to get task list version", user_id=request.user.id)
+        return None
+
+    # Every filter and page of the list is a different representation
+    query = hashlib.md5(request.META.get("QUERY_STRING", "").encode(), usedforsecurity=False).hexdigest()
+    return f"tasks-{request.user.id}-{version.decode()}-{query}"
@@ -0,0 +1,111 @@
+"""
+Task status change events.
+
+Workers publish every task state change to a per-user Redis pub/sub channel and
+the ``/api/tasks/events/`` endpoint relays them to clients as Server-Sent Events,
+so clients do not have to poll the task detail endpoint. The stream never ends, so it is
+served by the ASGI application only: under WSGI Django would read it into memory first and
+hold the worker forever, so the endpoint answers ``501`` there.
+"""
+
+import json
+from datetime import timedelta
+from typing import Any
+from typing import AsyncIterator
+from typing import Dict
+
+import redis
+import structlog
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from utils.redis import get_async_redis
+from utils.redis import get_redis
+
+from .models import ACTIVE_TASK_STATUSES
+from .models import Task
+
+logger = structlog.get_logger(__name__)
+
+
+class TaskEventsUnavailable(APIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = "Task events are only streamed by the ASGI application."
+    default_code = "task_events_unavailable"
+
+
+def get_task_events_channel(user_id: int) -> str:
+    return f"{settings.TASKS_EVENTS_CHANNEL_PREFIX}:{user_id}"
+
+
+def build_task_event(task: Task) -> Dict[str, Any]:
+    return {
+        "id": task.id,
+        "status": task.status,
+        "result": task.result,
+        "updated_at": task.updated_at,
+    }
+
+
+def publish_task_event(user_id: int, event: Dict[str, Any]) -> None:
+    if not settings.TASKS_EVENTS_ENABLED:
+        return
+
+    try:
+        get_redis().publish(get_task_events_channel(user_id), json.dumps(event, cls=DjangoJSONEncoder))
+    except redis.RedisError:
+        # Events are best effort, clients can still poll the task
+        logger.exception("Failed to publish task event", task_id=event["id"])
+
+
+def publish_task_event_on_commit(task: Task) -> None:
+    # Build the event right away, the task may change again before the transaction is committed
+    event = build_task_event(task)
+    transaction.on_commit(lambda: publish_task_event(task.user_id, event))
+
+
+def format_sse(data: str, event: str = "task") -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def stream_task_events(user_id: int) -> AsyncIterator[str]:
+    """
+    Yield Server-Sent Events with the changes of the tasks of a user.
+
+    The stream starts with the current state of the active tasks and of the tasks changed
+    in the last ``TASKS_EVENTS_SNAPSHOT_WINDOW`` seconds, so a client that subscribes within
+    that window after creating a task cannot miss its completion. Changes older than the
+    window are not replayed, such clients have to fetch the task.
+    """
+    client = get_async_redis()
+    pubsub = client.pubsub()
+    await pubsub.subscribe(get_task_events_channel(user_id))
+
+    try:
+        yield f"retry: {settings.TASKS_EVENTS_RETRY_MS}\n\n"
+
+        # Subscribed before the snapshot is read, so a change is in the snapshot, in the channel or in both
+        changed_after = timezone.now() - timedelta(seconds=settings.TASKS_EVENTS_SNAPSHOT_WINDOW)
+        snapshot = Task.objects.filter(Q(status__in=ACTIVE_TASK_STATUSES) | Q(updated_at__gte=changed_after))
+        async for task in snapshot.filter(user_id=user_id):
+            yield format_sse(json.dumps(build_task_event(task), cls=DjangoJSONEncoder))
+
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=settings.TASKS_EVENTS_KEEPALIVE,
+            )
+            if message is None:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(message["data"].decode())
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+        await client.aclose()
@@ -0,0 +1,32 @@
+from health_check.backends import BaseHealthCheckBackend
+from health_check.exceptions import ServiceWarning
+
+from .backlog import get_task_backlog
+
+
+class TaskBacklogHealthCheck(BaseHealthCheckBackend):
+    """
+    Report the broker backlog measured for admission control.
+
+    A backlog means the service is degraded rather than down, so it never fails the health check.
+    """
+
+    critical_service = False
+
+    def check_status(self) -> None:
+        self.backlog = get_task_backlog()
+        if self.backlog is None:
+            raise ServiceWarning("Task backlog has not been measured recently")
+        if self.backlog.is_exceeded():
+            raise ServiceWarning(f"Task backlog exceeded: {self.describe()}")
+
+    def describe(self) -> str:
+        return (
+            f"{self.backlog.depth} queued messages, "
+            f"oldest pending task waits {self.backlog.oldest_pending_age:.0f}s"
+        )
+
+    def pretty_status(self) -> str:
+        if self.errors:
+            return super().pretty_status()
+        return f"{super().pretty_status()} ({self.describe()})"
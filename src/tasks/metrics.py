@@ -0,0 +1,118 @@
+"""
+Prometheus metrics of the task lifecycle.
+
+A task waits in the queue from its creation until a worker starts it and runs until it
+finishes. Both stages and the end-to-end latency are observed per task type, so a slow
+queue can be told apart from a slow handler.
+
+The backlog measured for admission control is exported as the depth of every task queue
+and the age of the oldest pending task.
+
+The retention reports the tasks it has soft deleted and archived, the duration of its
+chunks and its lag: how long the oldest expired task has been kept past the retention age.
+"""
+
+from datetime import datetime
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+
+from .backlog import TaskBacklog
+from .models import Task
+from .models import TaskStatusEnum
+
+# From a task computed in the request to a countdown of an hour
+TASK_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+tasks_created = Counter("tasks_created", "Created tasks", ["task_type"])
+tasks_finished = Counter("tasks_finished", "Finished tasks", ["task_type", "status"])
+task_queue_wait = Histogram(
+    "task_queue_wait_seconds",
+    "Time from the creation of a task to its start",
+    ["task_type"],
+    buckets=TASK_DURATION_BUCKETS,
+)
+task_run = Histogram(
+    "task_run_seconds",
+    "Time from the start of a task to its finish",
+    ["task_type", "status"],
+    buckets=TASK_DURATION_BUCKETS,
+)
+task_latency = Histogram(
+    "task_latency_seconds",
+    "Time from the creation of a task to its finish",
+    ["task_type", "status"],
+    buckets=TASK_DURATION_BUCKETS,
+)
+# Set by a single beat task at a time, the last value is the current one
+task_queue_depth = Gauge(
+    "task_queue_depth",
+    "Messages waiting in a task queue",
+    ["queue"],
+    multiprocess_mode="mostrecent",
+)
+task_oldest_pending_age = Gauge(
+    "task_oldest_pending_age_seconds",
+    "Time the oldest pending task has been waiting",
+    multiprocess_mode="mostrecent",
+)
+
+tasks_retention_deleted = Counter("tasks_retention_deleted", "Expired tasks soft deleted by the retention")
+tasks_retention_archived = Counter("tasks_retention_archived", "Tasks moved to the archive by the retention")
+task_retention_chunk = Histogram(
+    "task_retention_chunk_seconds",
+    "Time to move a chunk of tasks to the archive",
+    buckets=TASK_DURATION_BUCKETS,
+)
+# Set by a single beat task at a time, the last value is the current one
+task_retention_lag = Gauge(
+    "task_retention_lag_seconds",
+    "Time the oldest expired task has been kept past the retention age",
+    multiprocess_mode="mostrecent",
+)
+
+
+def get_duration(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    # A task computed in the request is finished before the INSERT sets its creation date
+    return max((end - start).total_seconds(), 0.0)
+
+
+def observe_tasks_created(tasks: Iterable[Task]) -> None:
+    for task in tasks:
+        tasks_created.labels(task.task_type).inc()
+
+
+def observe_task_changed(task: Task) -> None:
+    """
+    Observe a task that has reached a new status, a stage without a known start is skipped.
+    """
+    if task.status == TaskStatusEnum.IN_PROGRESS or (
+        task.started_at is not None and task.started_at == task.finished_at
+    ):
+        # Tasks completed at once never pass through in progress, so their wait ends with the finish
+        wait = get_duration(task.created_at, task.started_at)
+        if wait is not None:
+            task_queue_wait.labels(task.task_type).observe(wait)
+
+    if task.is_active:
+        return
+
+    tasks_finished.labels(task.task_type, task.status).inc()
+    run = get_duration(task.started_at, task.finished_at)
+    if run is not None:
+        task_run.labels(task.task_type, task.status).observe(run)
+    latency = get_duration(task.created_at, task.finished_at)
+    if latency is not None:
+        task_latency.labels(task.task_type, task.status).observe(latency)
+
+
+def observe_task_backlog(backlog: TaskBacklog, queue_depths: Dict[str, int]) -> None:
+    for queue, depth in queue_depths.items():
+        task_queue_depth.labels(queue).set(depth)
+    task_oldest_pending_age.set(backlog.oldest_pending_age)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:35
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    # The index is built concurrently to avoid locking the tasks table
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="task",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(fields=["user", "-created_at", "-id"], name="task_user_created_id_idx"),
+        ),
+    ]
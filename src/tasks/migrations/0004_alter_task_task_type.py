@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:56
+
+from django.db import migrations
+from django.db import models
+
+import tasks.registry
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_user_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="task",
+            name="task_type",
+            field=models.CharField(choices=tasks.registry.get_task_type_choices, max_length=20),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:58
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    # The index is built concurrently to avoid locking the tasks table
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0004_alter_task_task_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="dispatched_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Дата отправки исполнителю"),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["user", "id"],
+                name="task_pending_user_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:06
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_task_dispatched_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="finished_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Дата завершения"),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Дата начала выполнения"),
+        ),
+    ]
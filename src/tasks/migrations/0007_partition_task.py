@@ -0,0 +1,100 @@
+"""
+Partition the task table by month of ``created_at``.
+
+The table is rebuilt as a declarative range partitioned one, the rows are copied into it.
+Every month from the oldest task to the next one gets its partition, later months are
+created by the ``manage_task_partitions`` beat task. Rows outside of all partitions land
+in the default one.
+
+A primary key of a partitioned table has to include the partition key, so the table
+key is ``(id, created_at)``. The model keeps ``id`` as its primary key, the identity
+sequence keeps it unique.
+
+The migration needs a write downtime: the old table is locked in ``EXCLUSIVE`` mode before
+it is read, so inserts and status updates wait until the copy is committed instead of being
+lost with the dropped table, while reads go on. The copy runs in the single transaction of
+the migration, its duration grows with the table, so on a large table the migration is run
+in a maintenance window with the workers and the beat stopped.
+"""
+
+from django.db import migrations
+
+PARTITION_SQL = [
+    # Writes made after the copy would be dropped with the old table
+    "LOCK TABLE tasks_task IN EXCLUSIVE MODE",
+    """
+    CREATE TABLE tasks_task_partitioned (LIKE tasks_task INCLUDING DEFAULTS INCLUDING IDENTITY)
+    PARTITION BY RANGE (created_at)
+    """,
+    """
+    DO $$
+    DECLARE
+        month timestamp;
+    BEGIN
+        FOR month IN
+            SELECT generate_series(
+                date_trunc('month', coalesce((SELECT min(created_at) FROM tasks_task), now()) AT TIME ZONE 'UTC'),
+                date_trunc('month', now() AT TIME ZONE 'UTC') + interval '1 month',
+                interval '1 month'
+            )
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF tasks_task_partitioned FOR VALUES FROM (%L) TO (%L)',
+                'tasks_task_p' || to_char(month, 'YYYYMM'),
+                month AT TIME ZONE 'UTC',
+                (month + interval '1 month') AT TIME ZONE 'UTC'
+            );
+        END LOOP;
+    END
+    $$
+    """,
+    "CREATE TABLE tasks_task_default PARTITION OF tasks_task_partitioned DEFAULT",
+    "INSERT INTO tasks_task_partitioned SELECT * FROM tasks_task",
+    "SELECT setval(pg_get_serial_sequence('tasks_task_partitioned', 'id'), coalesce(max(id), 0) + 1, false)"
+    " FROM tasks_task_partitioned",
+    "DROP TABLE tasks_task",
+    "ALTER TABLE tasks_task_partitioned RENAME TO tasks_task",
+    "ALTER SEQUENCE tasks_task_partitioned_id_seq RENAME TO tasks_task_id_seq",
+    "ALTER TABLE tasks_task ADD CONSTRAINT tasks_task_pkey PRIMARY KEY (id, created_at)",
+    """
+    ALTER TABLE tasks_task ADD CONSTRAINT tasks_task_user_id_f0e531b0_fk_users_user_id
+    FOREIGN KEY (user_id) REFERENCES users_user (id) DEFERRABLE INITIALLY DEFERRED
+    """,
+    "CREATE INDEX tasks_task_created_at_0fbeae19 ON tasks_task (created_at)",
+    "CREATE INDEX tasks_task_user_id_f0e531b0 ON tasks_task (user_id)",
+    "CREATE INDEX task_user_created_id_idx ON tasks_task (user_id, created_at DESC, id DESC)",
+    "CREATE INDEX task_pending_user_id_idx ON tasks_task (user_id, id) WHERE status = 'pending'",
+]
+
+UNPARTITION_SQL = [
+    "LOCK TABLE tasks_task IN EXCLUSIVE MODE",
+    "CREATE TABLE tasks_task_unpartitioned (LIKE tasks_task INCLUDING DEFAULTS INCLUDING IDENTITY)",
+    "INSERT INTO tasks_task_unpartitioned SELECT * FROM tasks_task",
+    "SELECT setval(pg_get_serial_sequence('tasks_task_unpartitioned', 'id'), coalesce(max(id), 0) + 1, false)"
+    " FROM tasks_task_unpartitioned",
+    # Detached partitions are standalone tables and stay
+    "DROP TABLE tasks_task",
+    "ALTER TABLE tasks_task_unpartitioned RENAME TO tasks_task",
+    "ALTER SEQUENCE tasks_task_unpartitioned_id_seq RENAME TO tasks_task_id_seq",
+    "ALTER TABLE tasks_task ADD CONSTRAINT tasks_task_pkey PRIMARY KEY (id)",
+    """
+    ALTER TABLE tasks_task ADD CONSTRAINT tasks_task_user_id_f0e531b0_fk_users_user_id
+    FOREIGN KEY (user_id) REFERENCES users_user (id) DEFERRABLE INITIALLY DEFERRED
+    """,
+    "CREATE INDEX tasks_task_created_at_0fbeae19 ON tasks_task (created_at)",
+    "CREATE INDEX tasks_task_user_id_f0e531b0 ON tasks_task (user_id)",
+    "CREATE INDEX task_user_created_id_idx ON tasks_task (user_id, created_at DESC, id DESC)",
+    "CREATE INDEX task_pending_user_id_idx ON tasks_task (user_id, id) WHERE status = 'pending'",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0006_task_started_finished_at"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITION_SQL, reverse_sql=UNPARTITION_SQL),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+import tasks.registry
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_partition_task"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTask",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "task_type",
+                    models.CharField(choices=tasks.registry.get_task_type_choices, max_length=20),
+                ),
+                ("input_data", models.JSONField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Запланировано"),
+                            ("in_progress", "Выполняется"),
+                            ("completed", "Выполнено"),
+                            ("error", "Ошибка"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(verbose_name="Дата создания")),
+                ("updated_at", models.DateTimeField(verbose_name="Дата обновления")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name='Дата "ленивого" удаления'),
+                ),
+                (
+                    "dispatched_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Дата отправки исполнителю"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Дата начала выполнения"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Дата завершения"),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Дата архивации"),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at", "-id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["created_at"],
+                name="task_deleted_created_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedtask",
+            name="user",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
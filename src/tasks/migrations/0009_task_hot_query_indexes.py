@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:09
+
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_archived_task"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # CONCURRENTLY is not available for indexes of a partitioned table, every partition
+    # is indexed under the lock of the table
+    operations = [
+        migrations.RemoveIndex(
+            model_name="task",
+            name="task_user_created_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["user", "-created_at", "-id"],
+                name="task_user_created_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["user", "status", "-created_at", "-id"],
+                name="task_user_status_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("status__in", ("pending", "in_progress")),
+                ),
+                fields=["user"],
+                name="task_active_user_idx",
+            ),
+        ),
+    ]
@@ -1,7 +1,21 @@
+from datetime import datetime
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Union
+
 from django.db import models
+from django.db.models.functions import RowNumber
+from django.utils import timezone
 
+from utils import json_codec
+from utils.models import SoftDeleteManager
+from utils.models import SoftDeleteQuerySet
 from utils.models import TimedMixin
 
+from .registry import get_task_type_choices
+
 
 class TaskStatusEnum(models.TextChoices):
     PENDING = "pending", "Запланировано"
@@ -10,11 +24,67 @@ class TaskStatusEnum(models.TextChoices):
     ERROR = "error", "Ошибка"
 
 
+# Names of the built-in task types, the set of available types is kept by the registry
 class TaskTypeEnum(models.TextChoices):
     SUM = "sum", "Сумма двух чисел"
     COUNTDOWN = "countdown", "Обратный отсчёт"
 
 
+ACTIVE_TASK_STATUSES = (
+    TaskStatusEnum.PENDING,
+    TaskStatusEnum.IN_PROGRESS,
+)
+
+FINISHED_TASK_STATUSES = (
+    TaskStatusEnum.COMPLETED,
+    TaskStatusEnum.ERROR,
+)
+
+
+def get_transition_fields(to: str, result: Optional[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+    fields = {"status": to, "result": result, "updated_at": now}
+    if to == TaskStatusEnum.IN_PROGRESS:
+        fields["started_at"] = now
+    elif to not in ACTIVE_TASK_STATUSES:
+        fields["finished_at"] = now
+    return fields
+
+
+class TaskQuerySet(SoftDeleteQuerySet):
+    def transition(
+        self,
+        task_id: int,
+        from_: Union[str, Iterable[str]],
+        to: str,
+        result: Optional[Dict[str, Any]] = None,
+        updated_at: Optional[datetime] = None,
+        created_at: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Move a task from one of the ``from_`` statuses to ``to`` with a single conditional UPDATE.
+
+        Only ``status``, ``result``, ``updated_at`` and the timestamp of the reached stage are
+        written, so the row is neither read nor locked beforehand. Returns whether the task was
+        in the expected status, i.e. whether this transition won over concurrent ones.
+
+        The creation date of the task, when known, confines the UPDATE to the partition of the task.
+        """
+        statuses = [from_] if isinstance(from_, str) else list(from_)
+        fields = get_transition_fields(to, result, updated_at or timezone.now())
+        queryset = self.filter(pk=task_id, status__in=statuses)
+        if created_at is not None:
+            queryset = queryset.filter(created_at=created_at)
+        updated = queryset.update(**fields)
+        return updated == 1
+
+    def fair_order(self) -> "TaskQuerySet":
+        """
+        Order tasks round-robin by user: the oldest task of every user first, then the second ones and so on.
+        """
+        user_rank = models.Window(RowNumber(), partition_by=models.F("user"), order_by=models.F("id").asc())
+        return self.annotate(user_rank=user_rank).order_by("user_rank", "id")
+
+
 class Task(
     TimedMixin,
     models.Model,
@@ -26,7 +96,7 @@ class Task(
     )
     task_type = models.CharField(
         max_length=20,
-        choices=TaskTypeEnum.choices,
+        choices=get_task_type_choices,
     )
     input_data = models.JSONField()
     status = models.CharField(
@@ -38,16 +108,170 @@ class Task(
         null=True,
         blank=True,
     )
+    dispatched_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Дата отправки исполнителю",
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Дата начала выполнения",
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Дата завершения",
+    )
+
+    # Soft deleted tasks are kept only until the retention moves them to the archive
+    objects = SoftDeleteManager.from_queryset(TaskQuerySet)()
+    all_objects = TaskQuerySet.as_manager()
 
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # Serves the task list of a user and its keyset pagination, the default manager hides soft deleted tasks
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="task_user_created_id_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+            # Serves the task list of a user filtered by status
+            models.Index(
+                fields=["user", "status", "-created_at", "-id"],
+                name="task_user_status_created_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+            # Serves the active task quota, small since finished tasks are left out
+            models.Index(
+                fields=["user"],
+                name="task_active_user_idx",
+                condition=models.Q(status__in=ACTIVE_TASK_STATUSES, deleted_at__isnull=True),
+            ),
+            # Serves the fair dispatcher, which only looks at pending tasks
+            models.Index(
+                fields=["user", "id"],
+                name="task_pending_user_id_idx",
+                condition=models.Q(status=TaskStatusEnum.PENDING),
+            ),
+            # Serves the retention, which archives the soft deleted tasks
+            models.Index(
+                fields=["created_at"],
+                name="task_deleted_created_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.get_task_type_display()} - {self.get_status_display()}"
 
+    def load_input_data(self) -> Dict[str, Any]:
+        # The API stores input data as a JSON encoded string, fixtures store a plain object
+        if isinstance(self.input_data, str):
+            return json_codec.loads(self.input_data)
+        return self.input_data
+
+    def transition(
+        self,
+        from_: Union[str, Iterable[str]],
+        to: str,
+        result: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        # Mirror a won transition on the instance, so it can be published without a reload
+        updated_at = timezone.now()
+        won = Task.objects.transition(
+            self.pk,
+            from_,
+            to,
+            result=result,
+            updated_at=updated_at,
+            created_at=self.created_at,
+        )
+        if not won:
+            return False
+        for name, value in get_transition_fields(to, result, updated_at).items():
+            setattr(self, name, value)
+        return True
+
+    def finish(self, status: str, result: Dict[str, Any]) -> None:
+        # A task completed without a worker starts and finishes at the same moment
+        now = timezone.now()
+        self.status = status
+        self.result = result
+        self.started_at = now
+        self.finished_at = now
+
     @property
     def is_active(self) -> bool:
-        return self.status in [
-            TaskStatusEnum.PENDING,
-            TaskStatusEnum.IN_PROGRESS,
-        ]
+        return self.status in ACTIVE_TASK_STATUSES
+
+
+class ArchivedTask(models.Model):
+    """
+    Task moved out of the task table by the retention, with the same id and fields.
+    """
+
+    id = models.BigIntegerField(
+        primary_key=True,
+    )
+    # Without a constraint archived tasks neither hold back nor cascade the deletion of users
+    user = models.ForeignKey(
+        "users.User",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    task_type = models.CharField(
+        max_length=20,
+        choices=get_task_type_choices,
+    )
+    input_data = models.JSONField()
+    status = models.CharField(
+        max_length=20,
+        choices=TaskStatusEnum.choices,
+    )
+    result = models.JSONField(
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Дата создания",
+    )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата обновления",
+    )
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата "ленивого" удаления',
+    )
+    dispatched_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Дата отправки исполнителю",
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Дата начала выполнения",
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Дата завершения",
+    )
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата архивации",
+    )
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self) -> str:
+        return f"{self.get_task_type_display()} - {self.get_status_display()}"
+
+    @classmethod
+    def from_task(cls, task: Task) -> "ArchivedTask":
+        return cls(**{field.attname: getattr(task, field.attname) for field in Task._meta.concrete_fields})
@@ -0,0 +1,158 @@
+import base64
+from datetime import datetime
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from django.core.paginator import InvalidPage
+from django.db.models import QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class TaskKeysetPagination(BasePagination):
+    """
+    Keyset pagination over ``(created_at, id)``.
+
+    The next page starts right after the last row of the current one, so deep pages cost
+    the same as the first one and no total count is computed. Matches the
+    ``(user_id, created_at DESC, id DESC)`` index of the tasks table.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: Any = None) -> List[Any]:
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset: QuerySet, request: Request, view: Any = None) -> List[Any]:
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset: QuerySet, request: Request) -> QuerySet:
+        self.base_url = request.build_absolute_uri()
+        queryset = queryset.order_by("-created_at", "-id")
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=pk)
+
+        # Fetch one extra row to know whether there is a next page
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, page: List[Any]) -> List[Any]:
+        self.has_next = len(page) > self.page_size
+        self.page = page[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data: List[Any]) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        # Pages hold model instances or ``values()`` rows
+        if isinstance(last, dict):
+            created_at, pk = last["created_at"], last["id"]
+        else:
+            created_at, pk = last.created_at, last.id
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(created_at, pk))
+
+    def decode_cursor(self, request: Request) -> Optional[Tuple[datetime, int]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            created_at, pk = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            position = parse_datetime(created_at), int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, created_at: datetime, pk: int) -> str:
+        return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{pk}".encode("ascii")).decode("ascii")
+
+
+class TaskListPagination(PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset mode enabled by ``?pagination=cursor``.
+    """
+
+    mode_query_param = "pagination"
+    keyset_mode = "cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: Any = None) -> Optional[List[Any]]:
+        self.keyset = None
+        if request.query_params.get(self.mode_query_param) == self.keyset_mode:
+            self.keyset = TaskKeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data: List[Any]) -> Response:
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    async def apaginate_queryset(self, queryset: QuerySet, request: Request, view: Any = None) -> Optional[List[Any]]:
+        """
+        ``paginate_queryset`` of async views, with the same state for ``get_paginated_response``.
+        """
+        self.keyset = None
+        if request.query_params.get(self.mode_query_param) == self.keyset_mode:
+            self.keyset = TaskKeysetPagination()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # The count is the only query of the paginator, made ahead so the paginator does not run it
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+    def get_schema_operation_parameters(self, view: Any) -> List[dict]:
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Use `{self.keyset_mode}` for keyset pagination without a total count.",
+                "schema": {"type": "string", "enum": [self.keyset_mode]},
+            },
+            {
+                "name": TaskKeysetPagination.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+        ]
@@ -0,0 +1,148 @@
+"""
+Monthly partitions of the task table.
+
+The table is range partitioned by ``created_at``, a partition holds the tasks of a calendar
+month in UTC and is named ``tasks_task_pYYYYMM``. Tasks outside of all partitions land in
+the default partition, which has to stay empty: Postgres refuses to create a partition for
+a month the default one has rows of. So partitions are created ``TASKS_PARTITIONS_PREMAKE``
+months ahead.
+
+Partitions of the months older than ``TASKS_PARTITIONS_RETENTION`` are detached from the
+table, the tasks in them are no longer visible to the application but stay in the database
+as standalone tables, unless ``TASKS_PARTITIONS_DROP`` drops them. A partition still holding
+pending or in progress tasks is kept until they finish, their quota slots and their users wait
+for them. The task lists of the users of a retired partition get a new version.
+"""
+
+import re
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import structlog
+from django.conf import settings
+from django.db import DatabaseError
+from django.db import connection
+from django.db import transaction
+from django.utils import timezone
+
+from .conditional import bump_task_list_version_on_commit
+from .models import ACTIVE_TASK_STATUSES
+from .models import Task
+
+logger = structlog.get_logger(__name__)
+
+TASK_TABLE = Task._meta.db_table
+PARTITION_NAME_RE = re.compile(rf"^{TASK_TABLE}_p(\d{{6}})$")
+# DDL waits for the running queries of the table and blocks the new ones meanwhile,
+# so it gives up quickly and is retried by the next run instead
+PARTITION_LOCK_TIMEOUT = "5s"
+
+
+def get_month(value: datetime) -> datetime:
+    return value.astimezone(dt_timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def get_partition_name(month: datetime) -> str:
+    return f"{TASK_TABLE}_p{month:%Y%m}"
+
+
+def get_task_partitions() -> Dict[datetime, str]:
+    """
+    Monthly partitions attached to the task table by their month.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [TASK_TABLE],
+        )
+        names = [name for (name,) in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME_RE.match(name)
+        if match is not None:
+            month = datetime.strptime(match.group(1), "%Y%m").replace(tzinfo=dt_timezone.utc)
+            partitions[month] = name
+    return partitions
+
+
+def execute_partition_ddl(sql: str, name: str) -> bool:
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'")
+            cursor.execute(sql)
+    except DatabaseError:
+        logger.exception("Failed to change task partition", partition=name)
+        return False
+    return True
+
+
+def create_task_partitions(now: Optional[datetime] = None) -> List[str]:
+    """
+    Create the missing partitions from the current month to ``TASKS_PARTITIONS_PREMAKE`` months ahead.
+    """
+    current = get_month(now or timezone.now())
+    partitions = get_task_partitions()
+    quote_name = connection.ops.quote_name
+
+    created = []
+    for months in range(settings.TASKS_PARTITIONS_PREMAKE + 1):
+        month = add_months(current, months)
+        if month in partitions:
+            continue
+
+        name = get_partition_name(month)
+        sql = (
+            f"CREATE TABLE {quote_name(name)} PARTITION OF {quote_name(TASK_TABLE)} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+        if execute_partition_ddl(sql, name):
+            created.append(name)
+    return created
+
+
+def retire_task_partitions(now: Optional[datetime] = None) -> List[str]:
+    """
+    Detach, or drop if ``TASKS_PARTITIONS_DROP``, the partitions older than ``TASKS_PARTITIONS_RETENTION`` months.
+    """
+    if not settings.TASKS_PARTITIONS_RETENTION:
+        return []
+
+    oldest = add_months(get_month(now or timezone.now()), -settings.TASKS_PARTITIONS_RETENTION)
+    quote_name = connection.ops.quote_name
+
+    retired = []
+    for month, name in sorted(get_task_partitions().items()):
+        if month >= oldest:
+            break
+
+        tasks = Task.all_objects.filter(created_at__gte=month, created_at__lt=add_months(month, 1))
+        if tasks.filter(status__in=ACTIVE_TASK_STATUSES).exists():
+            logger.warning("Task partition kept for its active tasks", partition=name)
+            continue
+        user_ids = list(tasks.filter(deleted_at__isnull=True).values_list("user_id", flat=True).distinct())
+
+        # CONCURRENTLY is not available for tables with a default partition
+        sql = f"ALTER TABLE {quote_name(TASK_TABLE)} DETACH PARTITION {quote_name(name)}"
+        if not execute_partition_ddl(sql, name):
+            continue
+        # The tasks disappear from the lists of their users
+        for user_id in user_ids:
+            bump_task_list_version_on_commit(user_id)
+        if settings.TASKS_PARTITIONS_DROP:
+            execute_partition_ddl(f"DROP TABLE {quote_name(name)}", name)
+        retired.append(name)
+    return retired
@@ -0,0 +1,187 @@
+"""
+Active task quota.
+
+Every user may have a limited number of active (pending or in progress) tasks.
+The Redis backend keeps a counter per user in a single hash and admits new tasks
+with an atomic check-and-increment script, so the API does not run an aggregate
+query on every task creation and concurrent requests cannot exceed the limit.
+Counters are decremented when a task leaves the active statuses and periodically
+reconciled against the database to repair any drift.
+
+A single comparison cannot tell a drift from work in flight: an admission has incremented the
+counter before its task is committed, a finished task is committed before its release runs.
+So a drift is only repaired once two consecutive runs see the same counter and the same
+database count, and the counter is only overwritten if it has not changed since it was read.
+"""
+
+import typing
+from typing import Dict
+from typing import Optional
+
+import redis
+import structlog
+from django.conf import settings
+from django.db.models import Count
+
+from utils.redis import get_redis
+
+from .models import ACTIVE_TASK_STATUSES
+from .models import Task
+
+if typing.TYPE_CHECKING:
+    from users.models import User
+
+
+logger = structlog.get_logger(__name__)
+
+# Returns the number of granted slots or -1 when the counter of the user is not initialized yet
+ACQUIRE_SCRIPT = """
+local current = redis.call("HGET", KEYS[1], ARGV[1])
+if not current then
+    return -1
+end
+local granted = math.min(tonumber(ARGV[2]) - tonumber(current), tonumber(ARGV[3]))
+if granted <= 0 then
+    return 0
+end
+redis.call("HINCRBY", KEYS[1], ARGV[1], granted)
+return granted
+"""
+
+# Never goes below zero and never creates a counter, an unknown user is seeded from the database
+RELEASE_SCRIPT = """
+local current = redis.call("HGET", KEYS[1], ARGV[1])
+if not current then
+    return -1
+end
+local value = math.max(tonumber(current) - tonumber(ARGV[2]), 0)
+redis.call("HSET", KEYS[1], ARGV[1], value)
+return value
+"""
+
+# Overwrites the counter only if it still holds the value the database count was compared with,
+# an empty expected value stands for a missing counter. Returns whether the counter was written
+RECONCILE_SCRIPT = """
+local current = redis.call("HGET", KEYS[1], ARGV[1])
+if (current or "") ~= ARGV[2] then
+    return 0
+end
+if tonumber(ARGV[3]) == 0 then
+    redis.call("HDEL", KEYS[1], ARGV[1])
+else
+    redis.call("HSET", KEYS[1], ARGV[1], ARGV[3])
+end
+return 1
+"""
+
+
+def get_active_tasks_limit(user: "User") -> int:
+    return user.active_tasks_limit if user.active_tasks_limit is not None else settings.TASKS_ACTIVE_LIMIT
+
+
+def get_active_tasks_limit_message(user: "User") -> str:
+    return f"You can't have more than {get_active_tasks_limit(user)} active tasks at the same time"
+
+
+def get_active_tasks_count(user_id: int) -> int:
+    return Task.objects.filter(user_id=user_id, status__in=ACTIVE_TASK_STATUSES).count()
+
+
+class DatabaseActiveTaskQuota:
+    """
+    Quota computed from the tasks table on every admission.
+    """
+
+    def acquire(self, user: "User", count: int = 1) -> int:
+        free = get_active_tasks_limit(user) - get_active_tasks_count(user.id)
+        return max(min(free, count), 0)
+
+    def release(self, user_id: int, count: int = 1) -> None:
+        pass
+
+    def reconcile(self) -> int:
+        return 0
+
+
+class RedisActiveTaskQuota:
+    """
+    Quota kept as per-user counters in Redis.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None) -> None:
+        self.client = client or get_redis()
+        self.key = settings.TASKS_QUOTA_REDIS_KEY
+        # Drifts seen by the last reconciliation, as "<counter>:<database count>" per user
+        self.drift_key = f"{self.key}:drift"
+        self.acquire_script = self.client.register_script(ACQUIRE_SCRIPT)
+        self.release_script = self.client.register_script(RELEASE_SCRIPT)
+        self.reconcile_script = self.client.register_script(RECONCILE_SCRIPT)
+
+    def acquire(self, user: "User", count: int = 1) -> int:
+        limit = get_active_tasks_limit(user)
+        try:
+            granted = self.acquire_script(keys=[self.key], args=[user.id, limit, count])
+            if granted < 0:
+                # Cold counter: seed it from the database once and retry
+                self.client.hsetnx(self.key, user.id, get_active_tasks_count(user.id))
+                granted = self.acquire_script(keys=[self.key], args=[user.id, limit, count])
+        except redis.RedisError:
+            logger.exception("Failed to acquire active task quota in Redis, falling back to database")
+            return DatabaseActiveTaskQuota().acquire(user, count)
+        return max(granted, 0)
+
+    def release(self, user_id: int, count: int = 1) -> None:
+        try:
+            self.release_script(keys=[self.key], args=[user_id, count])
+        except redis.RedisError:
+            # The reconciler will repair the counter
+            logger.exception("Failed to release active task quota in Redis", user_id=user_id)
+
+    def reconcile(self) -> int:
+        """
+        Overwrite the counters drifted since the previous run with the actual number of active tasks.
+
+        A drift seen for the first time is only recorded, it may be an admission or a release in
+        flight. A counter changed between its read and its repair is skipped and left to the next
+        run. Returns the number of users whose counter has been repaired.
+        """
+        stored = {key.decode(): value.decode() for key, value in self.client.hgetall(self.key).items()}
+        previous = {key.decode(): value.decode() for key, value in self.client.hgetall(self.drift_key).items()}
+        rows = (
+            Task.objects.filter(status__in=ACTIVE_TASK_STATUSES)
+            .values_list("user_id")
+            .annotate(active=Count("id"))
+            .order_by()
+        )
+        actual: Dict[str, int] = {str(user_id): active for user_id, active in rows}
+
+        drifts: Dict[str, str] = {}
+        repaired = 0
+        for user_id in actual.keys() | stored.keys():
+            expected = stored.get(user_id, "")
+            active = actual.get(user_id, 0)
+            if int(expected or 0) == active:
+                continue
+            drift = f"{expected}:{active}"
+            if previous.get(user_id) != drift:
+                drifts[user_id] = drift
+            elif self.reconcile_script(keys=[self.key], args=[user_id, expected, active]):
+                repaired += 1
+            else:
+                logger.info("Active task quota counter changed during reconciliation", user_id=user_id)
+
+        pipe = self.client.pipeline()
+        pipe.delete(self.drift_key)
+        if drifts:
+            pipe.hset(self.drift_key, mapping=drifts)
+        pipe.execute()
+        return repaired
+
+
+ActiveTaskQuota = DatabaseActiveTaskQuota | RedisActiveTaskQuota
+
+
+def get_active_task_quota() -> ActiveTaskQuota:
+    if settings.TASKS_QUOTA_BACKEND == "redis":
+        return RedisActiveTaskQuota()
+    return DatabaseActiveTaskQuota()
@@ -0,0 +1,118 @@
+"""
+Registry of task types.
+
+Every task type declares its input schema, handler and execution policy in one place.
+Input validation, dispatching and Celery routing are generated from the registry, so a
+new type only has to be registered. Types are routed to the queue of their cost class,
+which lets CPU-light and long-running types run on separately sized worker pools.
+"""
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from typing import Type
+
+from celery import Task as CeleryTask
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from rest_framework import serializers
+
+
+class TaskCostEnum(models.TextChoices):
+    LIGHT = "light", "Лёгкая"
+    HEAVY = "heavy", "Тяжёлая"
+
+
+class TaskType(NamedTuple):
+    name: str
+    label: str
+    # Serializer validating the input data
+    input_serializer: Type[serializers.Serializer]
+    handler: CeleryTask
+    # Pure function computing the result from the input data
+    compute: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    cost: str = TaskCostEnum.LIGHT
+    # Queue overriding the one of the cost class
+    queue: Optional[str] = None
+    # Priority of the messages, 0 is the highest one for the Redis transport
+    priority: Optional[int] = None
+    # Hard and soft time limits of the handler in seconds
+    time_limit: Optional[float] = None
+    soft_time_limit: Optional[float] = None
+    # Tasks continuing the work of the handler, routed along with it
+    followups: Tuple[CeleryTask, ...] = ()
+    # Deterministic task types whose results may be served from the result cache
+    cacheable: bool = False
+    # Task types cheaper than a broker round trip, computed right in the request
+    inline: bool = False
+    # Task types completed in bulk by complete_pending_tasks
+    batchable: bool = False
+
+    def get_queue(self) -> str:
+        return self.queue or settings.TASKS_QUEUES[self.cost]
+
+    def get_route(self) -> Dict[str, Any]:
+        route: Dict[str, Any] = {"queue": self.get_queue()}
+        if self.priority is not None:
+            route["priority"] = self.priority
+        return route
+
+
+class TaskTypeRegistry:
+    def __init__(self) -> None:
+        self._types: Dict[str, TaskType] = {}
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, task_type: TaskType) -> TaskType:
+        if task_type.name in self._types:
+            raise ImproperlyConfigured(f"Task type {task_type.name} is already registered")
+
+        self._types[task_type.name] = task_type
+        for task in (task_type.handler, *task_type.followups):
+            self._routes[task.name] = task_type.get_route()
+
+        # The worker applies the limits of the task to messages that do not carry their own
+        if task_type.time_limit is not None:
+            task_type.handler.time_limit = task_type.time_limit
+        if task_type.soft_time_limit is not None:
+            task_type.handler.soft_time_limit = task_type.soft_time_limit
+
+        return task_type
+
+    def __getitem__(self, name: str) -> TaskType:
+        return self._types[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._types
+
+    def __iter__(self) -> Iterator[TaskType]:
+        return iter(self._types.values())
+
+    def get_choices(self) -> List[Tuple[str, str]]:
+        return [(task_type.name, task_type.label) for task_type in self]
+
+    def get_queues(self) -> List[str]:
+        return sorted({task_type.get_queue() for task_type in self})
+
+    def get_route(self, task_name: str) -> Optional[Dict[str, Any]]:
+        return self._routes.get(task_name)
+
+
+task_types = TaskTypeRegistry()
+
+
+def get_task_type_choices() -> List[Tuple[str, str]]:
+    return task_types.get_choices()
+
+
+def route_task(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any], options: Dict[str, Any], **kw) -> Any:
+    """
+    Celery router sending the handlers of every task type to the queue of the type.
+    """
+    return task_types.get_route(name)
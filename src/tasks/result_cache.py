@@ -0,0 +1,67 @@
+"""
+Content-addressed cache of task results.
+
+Deterministic task types always produce the same result for the same input, so
+their results are cached in Redis under ``(task_type, hash of the canonical input)``.
+Entries expire after ``TASKS_RESULT_CACHE_TTL``. The cache lives in the Redis of
+``REDIS_CACHE_URL``, capped and evicting the least recently used keys (``allkeys-lru``),
+apart from the broker and the counters, which must never be evicted.
+"""
+
+import hashlib
+import json
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import redis
+import structlog
+from django.conf import settings
+
+from utils.redis import get_cache_redis
+
+logger = structlog.get_logger(__name__)
+
+
+def get_result_cache_key(task_type: str, input_data: Dict[str, Any]) -> str:
+    canonical = json.dumps(input_data, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(canonical.encode()).hexdigest()
+    return f"{settings.TASKS_RESULT_CACHE_KEY_PREFIX}:{task_type}:{digest}"
+
+
+def get_cached_results(items: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Look up results of many ``(task_type, input_data)`` pairs with a single round trip.
+    """
+    if not settings.TASKS_RESULT_CACHE_ENABLED or not items:
+        return [None] * len(items)
+
+    try:
+        values = get_cache_redis().mget(
+            [get_result_cache_key(task_type, input_data) for task_type, input_data in items]
+        )
+    except redis.RedisError:
+        logger.exception("Failed to get cached task results")
+        return [None] * len(items)
+
+    return [json.loads(value) if value is not None else None for value in values]
+
+
+def get_cached_result(task_type: str, input_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return get_cached_results([(task_type, input_data)])[0]
+
+
+def cache_result(task_type: str, input_data: Dict[str, Any], result: Dict[str, Any]) -> None:
+    if not settings.TASKS_RESULT_CACHE_ENABLED:
+        return
+
+    try:
+        get_cache_redis().set(
+            get_result_cache_key(task_type, input_data),
+            json.dumps(result),
+            ex=settings.TASKS_RESULT_CACHE_TTL,
+        )
+    except redis.RedisError:
+        logger.exception("Failed to cache task result", task_type=task_type)
@@ -0,0 +1,120 @@
+"""
+Retention of finished tasks.
+
+Finished tasks older than ``TASKS_RETENTION_AGE`` seconds are soft deleted first: ``deleted_at``
+hides them from the default manager, so from the API, at once. Soft deleted tasks older than
+the retention age are then copied to the ``ArchivedTask`` table and deleted from the task table,
+tasks soft deleted earlier wait in the task table until they reach the age.
+
+Every step handles ``TASKS_RETENTION_CHUNK_SIZE`` tasks in a short transaction of its own, so
+rows are locked briefly and a run can stop anywhere: the soft deleted tasks not archived yet
+are picked up by the next run. A run handles at most ``TASKS_RETENTION_MAX_CHUNKS`` chunks.
+"""
+
+import time
+from datetime import datetime
+from datetime import timedelta
+from typing import NamedTuple
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .conditional import bump_task_list_version_on_commit
+from .metrics import task_retention_chunk
+from .metrics import task_retention_lag
+from .metrics import tasks_retention_archived
+from .metrics import tasks_retention_deleted
+from .models import FINISHED_TASK_STATUSES
+from .models import ArchivedTask
+from .models import Task
+
+
+class TaskRetention(NamedTuple):
+    deleted: int
+    archived: int
+    # Seconds the oldest expired task left has been kept past the retention age
+    lag: float
+
+
+def get_retention_cutoff(now: Optional[datetime] = None) -> datetime:
+    return (now or timezone.now()) - timedelta(seconds=settings.TASKS_RETENTION_AGE)
+
+
+def get_expired_tasks(cutoff: datetime) -> QuerySet[Task]:
+    # The creation date bound skips the partitions of the recent months
+    return Task.all_objects.filter(status__in=FINISHED_TASK_STATUSES, created_at__lt=cutoff)
+
+
+def delete_expired_tasks(cutoff: datetime, limit: int) -> int:
+    """
+    Soft delete a chunk of the oldest expired tasks, returns the number of deleted tasks.
+    """
+    expired = get_expired_tasks(cutoff).filter(deleted_at__isnull=True).order_by("created_at")
+    rows = list(expired.values_list("id", "user_id")[:limit])
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        deleted = Task.objects.filter(id__in=[pk for pk, _ in rows], created_at__lt=cutoff).soft_delete()
+        # The tasks disappear from the lists of their users
+        for user_id in {row[1] for row in rows}:
+            bump_task_list_version_on_commit(user_id)
+
+    tasks_retention_deleted.inc(deleted)
+    return deleted
+
+
+def archive_deleted_tasks(cutoff: datetime, limit: int) -> int:
+    """
+    Move a chunk of soft deleted tasks older than the cutoff to the archive, returns the number of archived tasks.
+    """
+    started = time.perf_counter()
+    with transaction.atomic():
+        # Locked rows are being archived by a concurrent run, the creation date bound skips
+        # the partitions of the recent months
+        tasks = list(
+            Task.all_objects.filter(deleted_at__isnull=False, created_at__lt=cutoff)
+            .order_by("created_at")
+            .select_for_update(skip_locked=True)[:limit]
+        )
+        if not tasks:
+            return 0
+
+        ArchivedTask.objects.bulk_create([ArchivedTask.from_task(task) for task in tasks])
+        Task.all_objects.filter(
+            id__in=[task.id for task in tasks],
+            created_at__range=(tasks[0].created_at, tasks[-1].created_at),
+        ).delete()
+
+    tasks_retention_archived.inc(len(tasks))
+    task_retention_chunk.observe(time.perf_counter() - started)
+    return len(tasks)
+
+
+def get_retention_lag(cutoff: datetime) -> float:
+    oldest = get_expired_tasks(cutoff).aggregate(oldest=Min("created_at"))["oldest"]
+    if oldest is None:
+        return 0.0
+    return (cutoff - oldest).total_seconds()
+
+
+def run_task_retention(now: Optional[datetime] = None) -> TaskRetention:
+    cutoff = get_retention_cutoff(now)
+    chunk_size = settings.TASKS_RETENTION_CHUNK_SIZE
+
+    deleted = archived = 0
+    for _ in range(settings.TASKS_RETENTION_MAX_CHUNKS):
+        chunk_deleted = delete_expired_tasks(cutoff, chunk_size)
+        chunk_archived = archive_deleted_tasks(cutoff, chunk_size)
+        if not chunk_deleted and not chunk_archived:
+            break
+        deleted += chunk_deleted
+        archived += chunk_archived
+
+    lag = get_retention_lag(cutoff)
+    task_retention_lag.set(lag)
+    return TaskRetention(deleted, archived, lag)
@@ -1,13 +1,16 @@
-import json
 from typing import Any
 from typing import Dict
 
 import structlog
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from utils import json_codec
+
 from .models import Task
-from .models import TaskTypeEnum
+from .models import TaskStatusEnum
+from .registry import task_types
 
 logger = structlog.get_logger(__name__)
 User = get_user_model()
@@ -57,23 +60,67 @@ class TaskSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        task_serializer_map = {
-            TaskTypeEnum.SUM: SumTaskSerializer,
-            TaskTypeEnum.COUNTDOWN: CountdownTaskSerializer,
-        }
-
         # Validate input data based on task type
         task_type = data.get("task_type")
         input_data = data.get("input_data", "{}")  # noqa: P103
+        # The model field takes any JSON value, the API takes the input encoded in a string
+        if not isinstance(input_data, str):
+            raise serializers.ValidationError("Input data must be a JSON object encoded in a string")
 
         try:
-            input_data = json.loads(input_data)
-        except json.decoder.JSONDecodeError:
+            input_data = json_codec.loads(input_data)
+        except ValueError:
             raise serializers.ValidationError("Input data must be a valid JSON object")
 
-        task_serializer = task_serializer_map[task_type]
+        task_serializer = task_types[task_type].input_serializer
         task_data = task_serializer(data=input_data)
         if not task_data.is_valid():
             raise serializers.ValidationError(task_data.errors)
 
         return data
+
+
+class TaskListSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer of ``Task.objects.values(*TaskListSerializer.values)`` rows.
+
+    Renders the same JSON as ``TaskSerializer`` without model instances and field objects
+    per row: display labels are looked up in dictionaries built once per response.
+    """
+
+    values = ("id", "user__username", "task_type", "input_data", "status", "result", "created_at")
+    status_labels = dict(TaskStatusEnum.choices)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Task types can be registered at runtime, so their labels are read per response
+        self.task_type_labels = dict(task_types.get_choices())
+        self.created_at_field = serializers.DateTimeField()
+
+    def to_representation(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "user": row["user__username"],
+            "task_type": row["task_type"],
+            "task_type_display": self.task_type_labels.get(row["task_type"], row["task_type"]),
+            "input_data": row["input_data"],
+            "status": row["status"],
+            "status_display": self.status_labels.get(row["status"], row["status"]),
+            "result": row["result"],
+            "created_at": self.created_at_field.to_representation(row["created_at"]),
+        }
+
+
+class TaskBatchCreateSerializer(serializers.Serializer):
+    tasks = serializers.ListField(
+        child=serializers.DictField(),
+        min_length=1,
+        max_length=settings.TASKS_BATCH_MAX_SIZE,
+        help_text="List of tasks, each one in the same format as a single task creation request.",
+    )
+
+
+class TaskBatchItemResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    id = serializers.IntegerField(allow_null=True)
+    errors = serializers.JSONField(allow_null=True)
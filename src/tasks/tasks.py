@@ -1,86 +1,446 @@
-import json
 import time
+from collections import Counter
+from datetime import timedelta
+from functools import partial
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
 
 import structlog
+from celery import Task as CeleryTask
+from celery import group
 from celery import shared_task
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
+from .backlog import measure_queue_depths
+from .backlog import measure_task_backlog
+from .backlog import save_task_backlog
+from .conditional import bump_task_list_version_on_commit
+from .events import publish_task_event_on_commit
+from .metrics import observe_task_backlog
+from .metrics import observe_task_changed
 from .models import Task
 from .models import TaskStatusEnum
+from .models import TaskTypeEnum
+from .partitions import create_task_partitions
+from .partitions import retire_task_partitions
+from .quota import get_active_task_quota
+from .registry import TaskCostEnum
+from .registry import TaskType
+from .registry import task_types
+from .result_cache import cache_result
+from .result_cache import get_cached_result
+from .retention import run_task_retention
+from .serializers import CountdownTaskSerializer
+from .serializers import SumTaskSerializer
 
 logger = structlog.get_logger(__name__)
 
 
+def add_numbers(data: Dict[str, Any]) -> Dict[str, Any]:
+    num1 = float(data.get("num1", 0))
+    num2 = float(data.get("num2", 0))
+
+    # Calculate sum
+    return {"sum": num1 + num2}
+
+
+# Dates of the payload travel as ISO strings in the JSON messages
+TASK_PAYLOAD_DATES = ("created_at", "started_at")
+
+
+def get_task_payload(task: Task) -> Dict[str, Any]:
+    return {
+        "user_id": task.user_id,
+        "task_type": task.task_type,
+        "input_data": task.load_input_data(),
+        "created_at": task.created_at.isoformat(),
+    }
+
+
+def build_task(task_id: int, status: str, payload: Dict[str, Any]) -> Task:
+    fields = {name: parse_datetime(value) if name in TASK_PAYLOAD_DATES else value for name, value in payload.items()}
+    return Task(id=task_id, status=status, **fields)
+
+
+def load_task(task_id: int, payload: Optional[Dict[str, Any]]) -> Optional[Task]:
+    # A message carrying the payload saves the fetch, the transitions guard against stale messages
+    if payload is not None:
+        return build_task(task_id, TaskStatusEnum.PENDING, payload)
+    return Task.objects.filter(id=task_id).first()
+
+
 @shared_task
-@transaction.atomic
-def sum_two_numbers(task_id: int) -> None:
+def sum_two_numbers(task_id: int, payload: Optional[Dict[str, Any]] = None) -> None:
     """
     Task to sum two numbers.
     """
     log = logger.bind(task_id=task_id)
 
-    try:
-        task = Task.objects.get(id=task_id)
-    except Task.DoesNotExist:
+    task = load_task(task_id, payload)
+    if task is None:
         log.warning("Task with id %s does not exist", task_id)
         return
 
-    try:
-        # Update task status to in progress
-        task.status = TaskStatusEnum.IN_PROGRESS
-        task.save()
+    # Update task status to in progress, a redelivered message loses the transition
+    if not task.transition(TaskStatusEnum.PENDING, TaskStatusEnum.IN_PROGRESS):
+        log.warning("Task with id %s is not pending", task_id)
+        return
+    notify_task_changed(task)
 
+    try:
         # Extract input data
-        data = json.loads(task.input_data)
-        num1 = float(data.get("num1", 0))
-        num2 = float(data.get("num2", 0))
+        data = task.load_input_data()
 
-        # Calculate sum
-        result = num1 + num2
-
-        # Update task with result
-        task.result = {"sum": result}
-        task.status = TaskStatusEnum.COMPLETED
-        task.save()
+        cacheable = task_types[task.task_type].cacheable
+        result = get_cached_result(task.task_type, data) if cacheable else None
+        if result is None:
+            result = add_numbers(data)
+            if cacheable:
+                cache_result(task.task_type, data, result)
+        status = TaskStatusEnum.COMPLETED
     except Exception as e:
         # Handle any errors
-        task.status = "error"
-        task.result = {"error": str(e)}
-        task.save()
+        result = {"error": str(e)}
+        status = TaskStatusEnum.ERROR
+
+    # Update task with result
+    if task.transition(TaskStatusEnum.IN_PROGRESS, status, result=result):
+        notify_task_changed(task)
 
 
 @shared_task
-def countdown(task_id: int) -> None:
+def countdown(task_id: int, payload: Optional[Dict[str, Any]] = None) -> None:
     """
     Task to perform a countdown for a specified number of seconds.
+
+    With ``TASKS_COUNTDOWN_DEFERRED`` enabled the worker only marks the task as in progress
+    and schedules ``complete_countdown`` with an ETA, so the worker slot is released right away.
     """
     log = logger.bind(task_id=task_id)
 
-    try:
-        task = Task.objects.get(id=task_id)
-    except Task.DoesNotExist:
+    task = load_task(task_id, payload)
+    if task is None:
         log.warning("Task with id %s does not exist", task_id)
         return
 
-    try:
-        # Update task status to in progress
-        task.status = TaskStatusEnum.IN_PROGRESS
-        task.save()
+    # Update task status to in progress, a redelivered message loses the transition
+    if not task.transition(TaskStatusEnum.PENDING, TaskStatusEnum.IN_PROGRESS):
+        log.warning("Task with id %s is not pending", task_id)
+        return
+    notify_task_changed(task)
 
+    try:
         # Extract input data
-        data = task.input_data
+        data = task.load_input_data()
         seconds = float(data.get("seconds", 0))
 
+        if settings.TASKS_COUNTDOWN_DEFERRED:
+            # Let the broker hold the countdown instead of the worker
+            if payload is not None:
+                payload = {**payload, "started_at": task.started_at.isoformat()}
+            complete_countdown.apply_async((task_id, payload), countdown=seconds)
+            return
+
         # Perform countdown (sleep)
         time.sleep(seconds)
-
-        # Update task with result
-        message = "Обратный отсчёт завершён"
-        task.result = {"message": message}
-        task.status = TaskStatusEnum.COMPLETED
-        task.save()
     except Exception as e:
         # Handle any errors
-        task.status = TaskStatusEnum.ERROR
-        task.result = {"error": str(e)}
-        task.save()
+        if task.transition(TaskStatusEnum.IN_PROGRESS, TaskStatusEnum.ERROR, result={"error": str(e)}):
+            notify_task_changed(task)
+        return
+
+    finish_countdown(task)
+
+
+@shared_task
+def complete_countdown(task_id: int, payload: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Task to complete a deferred countdown once its ETA has been reached.
+    """
+    log = logger.bind(task_id=task_id)
+
+    if payload is not None:
+        # The transition only completes an in-progress countdown, so a redelivery is harmless
+        finish_countdown(build_task(task_id, TaskStatusEnum.IN_PROGRESS, payload))
+        return
+
+    # The message may be redelivered, so only an in-progress countdown is completed
+    task = (
+        Task.objects.filter(
+            id=task_id,
+            task_type=TaskTypeEnum.COUNTDOWN,
+            status=TaskStatusEnum.IN_PROGRESS,
+        )
+        .only("user", "task_type", "status", "created_at", "started_at")
+        .first()
+    )
+    if task is None:
+        log.warning("Countdown task with id %s is not in progress", task_id)
+        return
+
+    finish_countdown(task)
+
+
+@shared_task
+def complete_pending_tasks(task_type: str) -> None:
+    """
+    Task to complete pending tasks of a batchable type in bulk.
+
+    Up to ``TASKS_BATCH_CONSUMER_SIZE`` pending tasks are locked, computed together and
+    saved with a single ``bulk_update``. A full batch schedules the next one until the
+    backlog is drained.
+    """
+    compute = task_types[task_type].compute
+    batch_size = settings.TASKS_BATCH_CONSUMER_SIZE
+
+    with transaction.atomic():
+        # Concurrent consumers skip rows locked by each other instead of waiting
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(task_type=task_type, status=TaskStatusEnum.PENDING)
+            .only("user", "task_type", "input_data", "created_at")
+            .order_by("id")[:batch_size]
+        )
+
+        for task in tasks:
+            try:
+                task.finish(TaskStatusEnum.COMPLETED, compute(task.load_input_data()))
+            except Exception as e:
+                task.finish(TaskStatusEnum.ERROR, {"error": str(e)})
+            # bulk_update does not fill auto_now fields
+            task.updated_at = task.finished_at
+
+        Task.objects.bulk_update(tasks, ["status", "result", "updated_at", "started_at", "finished_at"])
+        notify_tasks_changed(tasks)
+
+    if len(tasks) == batch_size:
+        schedule_pending_tasks(task_type)
+
+
+def schedule_pending_tasks(task_type: str) -> None:
+    # The consumer runs on the queue of the task type it completes
+    complete_pending_tasks.apply_async((task_type,), **task_types[task_type].get_route())
+
+
+@shared_task
+def dispatch_fair_share() -> None:
+    """
+    Task to send pending tasks to the workers round-robin by user.
+
+    Tasks wait in the database instead of the broker queue, and at most ``TASKS_FAIR_WINDOW``
+    of them are dispatched but not yet started. Free slots of the window are filled with the
+    oldest waiting task of every user first, then with the second ones and so on, so a user
+    with a huge backlog delays the others by at most one round. The dispatcher is triggered
+    by new and finished tasks and periodically by beat. A task dispatched longer than ``TASKS_FAIR_REDISPATCH_AFTER``
+    ago is considered lost and dispatched again, its transitions make a duplicate harmless.
+    """
+    if not settings.TASKS_FAIR_DISPATCH_ENABLED:
+        return
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_FAIR_REDISPATCH_AFTER)
+    pending = Task.objects.filter(status=TaskStatusEnum.PENDING)
+
+    with transaction.atomic():
+        queued = pending.filter(dispatched_at__gte=stale).count()
+        free = settings.TASKS_FAIR_WINDOW - queued
+        if free <= 0:
+            return
+
+        waiting = pending.filter(Q(dispatched_at__isnull=True) | Q(dispatched_at__lt=stale))
+        ids = list(waiting.fair_order().values_list("id", flat=True)[:free])
+
+        # Concurrent dispatchers skip rows taken by each other
+        tasks = list(
+            waiting.select_for_update(skip_locked=True)
+            .filter(id__in=ids)
+            .only("user", "task_type", "input_data", "status", "created_at")
+        )
+        Task.objects.filter(id__in=[task.id for task in tasks]).update(dispatched_at=now)
+
+        order = {task_id: index for index, task_id in enumerate(ids)}
+        tasks.sort(key=lambda task: order[task.id])
+        transaction.on_commit(partial(send_tasks, tasks))
+
+
+def finish_countdown(task: Task) -> None:
+    # Update task with result
+    message = "Обратный отсчёт завершён"
+    if task.transition(TaskStatusEnum.IN_PROGRESS, TaskStatusEnum.COMPLETED, result={"message": message}):
+        notify_task_changed(task)
+
+
+def notify_task_changed(task: Task) -> None:
+    observe_task_changed(task)
+    publish_task_event_on_commit(task)
+    bump_task_list_version_on_commit(task.user_id)
+
+    if not task.is_active:
+        # The task has left the active statuses, free its slot once the change is committed
+        transaction.on_commit(lambda: get_active_task_quota().release(task.user_id))
+        if settings.TASKS_FAIR_DISPATCH_ENABLED:
+            # A slot of the dispatch window may have been freed as well
+            transaction.on_commit(dispatch_fair_share.delay)
+
+
+def notify_tasks_changed(tasks: List[Task]) -> None:
+    for task in tasks:
+        observe_task_changed(task)
+        publish_task_event_on_commit(task)
+    for user_id in {task.user_id for task in tasks}:
+        bump_task_list_version_on_commit(user_id)
+
+    # Free the slots of every user with a single call
+    finished = Counter(task.user_id for task in tasks if not task.is_active)
+    if finished:
+        transaction.on_commit(lambda: release_active_tasks(finished))
+
+
+def release_active_tasks(finished: Dict[int, int]) -> None:
+    quota = get_active_task_quota()
+    for user_id, count in finished.items():
+        quota.release(user_id, count)
+
+
+@shared_task
+def reconcile_active_task_quota() -> None:
+    """
+    Task to repair drift between the active task quota counters and the database.
+    """
+    drifted = get_active_task_quota().reconcile()
+    if drifted:
+        logger.warning("Active task quota counters drifted for %s users", drifted)
+
+
+@shared_task
+def record_task_backlog() -> None:
+    """
+    Task to measure the broker backlog for admission control and monitoring.
+    """
+    queue_depths = measure_queue_depths()
+    backlog = measure_task_backlog(queue_depths)
+    save_task_backlog(backlog)
+    observe_task_backlog(backlog, queue_depths)
+    logger.info("Task backlog measured", **backlog._asdict())
+
+
+@shared_task
+def manage_task_partitions() -> None:
+    """
+    Task to create the partitions of the coming months and retire the expired ones.
+    """
+    created = create_task_partitions()
+    retired = retire_task_partitions()
+    if created or retired:
+        logger.info("Task partitions changed", created=created, retired=retired)
+
+
+@shared_task
+def archive_expired_tasks() -> None:
+    """
+    Task to soft delete the expired finished tasks and move them to the archive.
+    """
+    if not settings.TASKS_RETENTION_ENABLED:
+        return
+
+    retention = run_task_retention()
+    logger.info("Task retention completed", **retention._asdict())
+
+
+def execute_inline(task: Task) -> bool:
+    """
+    Compute a task of a cheap type in the calling process instead of dispatching it to a worker.
+
+    The task is not saved, so the caller stores it together with its result in a single INSERT.
+    Returns whether the task has been executed.
+    """
+    task_type = task_types[task.task_type]
+    if not settings.TASKS_INLINE_ENABLED or not task_type.inline:
+        return False
+
+    try:
+        task.finish(TaskStatusEnum.COMPLETED, task_type.compute(task.load_input_data()))
+    except Exception as e:
+        task.finish(TaskStatusEnum.ERROR, {"error": str(e)})
+    return True
+
+
+def dispatch_tasks(tasks: List[Task]) -> None:
+    """
+    Send saved active tasks to the workers.
+
+    With ``TASKS_FAIR_DISPATCH_ENABLED`` the tasks are left to ``dispatch_fair_share``.
+    With ``TASKS_BATCH_CONSUMER_ENABLED`` batchable task types get a single
+    ``complete_pending_tasks`` message per type once the transaction is committed.
+    Other tasks get a message each, several messages are published through one producer.
+    """
+    tasks = [task for task in tasks if task.is_active]
+    if not tasks:
+        return
+
+    if settings.TASKS_FAIR_DISPATCH_ENABLED:
+        # The dispatcher picks the tasks up from the database once they are committed
+        transaction.on_commit(dispatch_fair_share.delay)
+        return
+
+    batched = {task.task_type for task in tasks if task_types[task.task_type].batchable}
+    if not settings.TASKS_BATCH_CONSUMER_ENABLED:
+        batched.clear()
+
+    for name in batched:
+        # The consumer only sees committed rows
+        transaction.on_commit(partial(schedule_pending_tasks, name))
+
+    send_tasks([task for task in tasks if task.task_type not in batched])
+
+
+def send_tasks(tasks: List[Task]) -> None:
+    """
+    Publish a message per task, several messages are published through one producer.
+
+    With ``TASKS_MESSAGE_PAYLOAD_ENABLED`` a message carries the owner, the type and the
+    input of the task, so the worker does not have to fetch it.
+    """
+    messages: List[Tuple[CeleryTask, Tuple[Any, ...]]] = []
+    for task in tasks:
+        args = (task.id, get_task_payload(task)) if settings.TASKS_MESSAGE_PAYLOAD_ENABLED else (task.id,)
+        messages.append((task_types[task.task_type].handler, args))
+
+    if len(messages) == 1:
+        handler, args = messages[0]
+        handler.delay(*args)
+    elif messages:
+        group([handler.s(*args) for handler, args in messages]).apply_async()
+
+
+task_types.register(
+    TaskType(
+        name=TaskTypeEnum.SUM,
+        label=TaskTypeEnum.SUM.label,
+        input_serializer=SumTaskSerializer,
+        handler=sum_two_numbers,
+        compute=add_numbers,
+        cost=TaskCostEnum.LIGHT,
+        time_limit=30,
+        cacheable=True,
+        inline=True,
+        batchable=True,
+    )
+)
+task_types.register(
+    TaskType(
+        name=TaskTypeEnum.COUNTDOWN,
+        label=TaskTypeEnum.COUNTDOWN.label,
+        input_serializer=CountdownTaskSerializer,
+        handler=countdown,
+        cost=TaskCostEnum.HEAVY,
+        followups=(complete_countdown,),
+    )
+)
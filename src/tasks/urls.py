@@ -1,10 +1,24 @@
+from django.conf import settings
 from django.urls import path
 
+from .views import AsyncTaskDetailView
+from .views import AsyncTaskListCreateView
+from .views import TaskBatchCreateView
 from .views import TaskDetailView
+from .views import TaskEventsView
 from .views import TaskListCreateView
 
 urlpatterns = [
     # Task URLs
+    path("batch/", TaskBatchCreateView.as_view(), name="task-batch-create"),
+    path("events/", TaskEventsView.as_view(), name="task-events"),
     path("<int:pk>/", TaskDetailView.as_view(), name="task-detail"),
     path("", TaskListCreateView.as_view(), name="task-list-create"),
 ]
+
+if settings.TASKS_ASYNC_VIEWS_ENABLED:
+    # Shadow the sync views, which stay routed for the schema generator
+    urlpatterns = [
+        path("<int:pk>/", AsyncTaskDetailView.as_view(), name="task-detail"),
+        path("", AsyncTaskListCreateView.as_view(), name="task-list-create"),
+    ] + urlpatterns
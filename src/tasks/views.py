@@ -1,15 +1,54 @@
-from http import HTTPMethod
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
 
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import QuerySet
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http import HttpResponseBase
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django_filters.filterset import filterset_factory
+from django_filters.utils import translate_validation
+from drf_spectacular.utils import extend_schema
 from rest_framework import generics
 from rest_framework import permissions
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.request import Request
+from rest_framework.response import Response
 
+from utils.views import AsyncAPIView
+
+from .backlog import check_task_admission
+from .conditional import aget_task_state
+from .conditional import bump_task_list_version_on_commit
+from .conditional import task_detail_etag
+from .conditional import task_detail_last_modified
+from .conditional import task_list_etag
+from .events import TaskEventsUnavailable
+from .events import stream_task_events
+from .metrics import observe_task_changed
+from .metrics import observe_tasks_created
 from .models import Task
-from .models import TaskTypeEnum
-from .permissions import ActiveTaskLimitPermission
+from .models import TaskStatusEnum
+from .pagination import TaskListPagination
+from .quota import get_active_task_quota
+from .quota import get_active_tasks_limit_message
+from .registry import task_types
+from .result_cache import get_cached_result
+from .result_cache import get_cached_results
+from .serializers import TaskBatchCreateSerializer
+from .serializers import TaskBatchItemResultSerializer
+from .serializers import TaskListSerializer
 from .serializers import TaskSerializer
-from .tasks import countdown
-from .tasks import sum_two_numbers
+from .tasks import dispatch_tasks
+from .tasks import execute_inline
 
 
 class TaskListCreateView(generics.ListCreateAPIView):
@@ -18,16 +57,13 @@ class TaskListCreateView(generics.ListCreateAPIView):
     """
 
     serializer_class = TaskSerializer
-    queryset = Task.objects.all()
-    filterset_fields = ["status"]
-
-    def get_permissions(self):
-        if self.request.method == HTTPMethod.POST:
-            return [
-                permissions.IsAuthenticated(),
-                ActiveTaskLimitPermission(),
-            ]
-        return [permissions.IsAuthenticated()]
+    # The serializer shows the username, so the owner is joined instead of fetched per row
+    queryset = Task.objects.select_related("user")
+    # Bounds on the creation date restrict the list to the partitions of the months in between
+    filterset_fields = {"status": ["exact"], "created_at": ["gte", "lt"]}
+    pagination_class = TaskListPagination
+    # A page takes the same queries whatever its size: user, count and rows
+    query_budget = {"GET": 3, "POST": 4}
 
     def get_queryset(self) -> QuerySet[Task]:
         user = self.request.user
@@ -37,17 +73,140 @@ class TaskListCreateView(generics.ListCreateAPIView):
 
         return queryset
 
+    @method_decorator(condition(etag_func=task_list_etag))
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        # Rows are read as dictionaries and rendered without building model instances,
+        # ``serializer_class`` still describes the response in the schema
+        queryset = self.filter_queryset(self.get_queryset()).values(*TaskListSerializer.values)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = TaskListSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = TaskListSerializer(queryset, many=True)
+        return Response(serializer.data)
+
     def perform_create(self, serializer: TaskSerializer) -> None:
-        task_map = {
-            TaskTypeEnum.SUM: sum_two_numbers,
-            TaskTypeEnum.COUNTDOWN: countdown,
-        }
+        user = self.request.user
+
+        # Cheap task types and cached results complete the task right away, without taking a quota slot
+        task = Task(**serializer.validated_data)
+        if not execute_inline(task) and task_types[task.task_type].cacheable:
+            result = get_cached_result(task.task_type, task.load_input_data())
+            if result is not None:
+                task.finish(TaskStatusEnum.COMPLETED, result)
+        if not task.is_active:
+            task = serializer.save(
+                user=user,
+                status=task.status,
+                result=task.result,
+                started_at=task.started_at,
+                finished_at=task.finished_at,
+            )
+            bump_task_list_version_on_commit(user.id)
+            observe_tasks_created([task])
+            observe_task_changed(task)
+            return
+
+        # Do not enqueue behind a backlog the task would only wait in
+        check_task_admission()
+
+        # Reserve a slot in the active task quota of the user
+        quota = get_active_task_quota()
+        if not quota.acquire(user):
+            raise PermissionDenied(get_active_tasks_limit_message(user))
 
         # Save the task with the current user
-        task = serializer.save(user=self.request.user)
+        try:
+            task = serializer.save(user=user)
+        except Exception:
+            quota.release(user.id)
+            raise
+        bump_task_list_version_on_commit(user.id)
+        observe_tasks_created([task])
 
         # Start the appropriate Celery task based on task_type
-        task_map.get(task.task_type).delay(task.id)
+        dispatch_tasks([task])
+
+
+class TaskBatchCreateView(generics.GenericAPIView):
+    """
+    View for creating many tasks in a single request.
+
+    The active task quota is reserved once for the whole batch: items beyond the remaining
+    quota are rejected, valid items are inserted with a single query and published to the
+    broker through one producer.
+    """
+
+    serializer_class = TaskBatchCreateSerializer
+    queryset = Task.objects.none()
+    permission_classes = [permissions.IsAuthenticated]
+    # Tasks are inserted in bulk, so the queries do not depend on the size of the batch
+    query_budget = {"POST": 4}
+
+    @extend_schema(responses={201: TaskBatchItemResultSerializer(many=True)})
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        user = request.user
+
+        results: List[Dict[str, Any]] = []
+        entries: List[Tuple[Dict[str, Any], Task]] = []
+        for index, item in enumerate(serializer.validated_data["tasks"]):
+            result = {"index": index, "id": None, "errors": None}
+            results.append(result)
+
+            item_serializer = TaskSerializer(data=item)
+            if not item_serializer.is_valid():
+                result["errors"] = item_serializer.errors
+                continue
+
+            entries.append((result, Task(user=user, **item_serializer.validated_data)))
+
+        # Cheap task types and cached results complete their tasks right away, without taking a quota slot
+        for _, task in entries:
+            execute_inline(task)
+        cacheable = [task for _, task in entries if task.is_active and task_types[task.task_type].cacheable]
+        cached = get_cached_results([(task.task_type, task.load_input_data()) for task in cacheable])
+        for task, cached_result in zip(cacheable, cached):
+            if cached_result is not None:
+                task.finish(TaskStatusEnum.COMPLETED, cached_result)
+
+        # Reserve quota once for the whole batch, items beyond it are rejected
+        pending = [(result, task) for result, task in entries if task.is_active]
+        if pending:
+            check_task_admission()
+        quota = get_active_task_quota()
+        granted = quota.acquire(user, len(pending)) if pending else 0
+        rejected = {"non_field_errors": [get_active_tasks_limit_message(user)]}
+        for result, _ in pending[granted:]:
+            result["errors"] = rejected
+        entries = [(result, task) for result, task in entries if result["errors"] is None]
+
+        if not entries:
+            return Response(results, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            Task.objects.bulk_create([task for _, task in entries])
+        except Exception:
+            quota.release(user.id, granted)
+            raise
+        bump_task_list_version_on_commit(user.id)
+        observe_tasks_created([task for _, task in entries])
+
+        for result, task in entries:
+            result["id"] = task.id
+            if not task.is_active:
+                observe_task_changed(task)
+
+        dispatch_tasks([task for _, task in entries])
+
+        return Response(results, status=status.HTTP_201_CREATED)
 
 
 class TaskDetailView(generics.RetrieveAPIView):
@@ -57,8 +216,106 @@ class TaskDetailView(generics.RetrieveAPIView):
 
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 3}
 
     def get_queryset(self) -> QuerySet[Task]:
         # Filter tasks by current user
         user = self.request.user
-        return Task.objects.filter(user=user)
+        return Task.objects.select_related("user").filter(user=user)
+
+    @method_decorator(condition(etag_func=task_detail_etag, last_modified_func=task_detail_last_modified))
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        return super().get(request, *args, **kwargs)
+
+
+class AsyncTaskListCreateView(AsyncAPIView):
+    """
+    Async version of ``TaskListCreateView`` served instead of it with ``TASKS_ASYNC_VIEWS_ENABLED``.
+
+    The list is read with the async ORM. Django still runs every query of it in a thread through
+    ``sync_to_async``, so a thread is held for each query rather than for the whole request:
+    authentication, rendering and slow clients are served by the event loop. Creation reserves
+    the quota and publishes to the broker synchronously, it is handed over to ``TaskListCreateView``
+    in a thread.
+    """
+
+    filterset_class = filterset_factory(Task, fields=TaskListCreateView.filterset_fields)
+    pagination_class = TaskListCreateView.pagination_class
+    query_budget = TaskListCreateView.query_budget
+    create_view = staticmethod(sync_to_async(TaskListCreateView.as_view()))
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponseBase:
+        # The sync view authenticates the request itself
+        if request.method == "POST":
+            return await self.post(request, *args, **kwargs)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        etag = await sync_to_async(task_list_etag)(request)
+        return await self.respond_conditionally(request, lambda: self.list(request), etag=etag)
+
+    async def post(self, request: HttpRequest, *args, **kwargs) -> HttpResponseBase:
+        return await self.create_view(request, *args, **kwargs)
+
+    async def list(self, request: HttpRequest) -> HttpResponse:
+        filterset = self.filterset_class(request.GET, queryset=Task.objects.filter(user=request.user))
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        queryset = filterset.qs.values(*TaskListSerializer.values)
+
+        # Pagination reads the query parameters of a DRF request, it never authenticates it
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, Request(request))
+        if page is not None:
+            serializer = TaskListSerializer(page, many=True)
+            return self.render(paginator.get_paginated_response(serializer.data).data)
+
+        serializer = TaskListSerializer([row async for row in queryset], many=True)
+        return self.render(serializer.data)
+
+
+class AsyncTaskDetailView(AsyncAPIView):
+    """
+    Async version of ``TaskDetailView`` served instead of it with ``TASKS_ASYNC_VIEWS_ENABLED``.
+    """
+
+    query_budget = TaskDetailView.query_budget
+
+    async def get(self, request: HttpRequest, pk: int, *args, **kwargs) -> HttpResponse:
+        # The validators read the state looked up here instead of querying it themselves
+        await aget_task_state(request, pk)
+        return await self.respond_conditionally(
+            request,
+            lambda: self.retrieve(request, pk),
+            etag=task_detail_etag(request, pk),
+            last_modified=task_detail_last_modified(request, pk),
+        )
+
+    async def retrieve(self, request: HttpRequest, pk: int) -> HttpResponse:
+        try:
+            task = await Task.objects.select_related("user").aget(pk=pk, user=request.user)
+        except Task.DoesNotExist:
+            raise NotFound(f"No {Task._meta.object_name} matches the given query.")
+        return self.render(TaskSerializer(task).data)
+
+
+class TaskEventsView(AsyncAPIView):
+    """
+    View streaming status changes of the user's tasks as Server-Sent Events.
+
+    The view is async and keeps no thread busy while the connection is idle,
+    so it has to be served by the ASGI application and refuses requests of the WSGI one.
+    """
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponseBase:
+        # WSGI reads the endless stream into a list before sending it, holding the worker forever
+        if not isinstance(request, ASGIRequest):
+            return self.handle_exception(request, TaskEventsUnavailable())
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponseBase:
+        response = StreamingHttpResponse(stream_task_events(request.user.id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Disable response buffering in nginx
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -2,8 +2,10 @@
 Base test configurations and utilities for API testing.
 """
 
+from contextlib import contextmanager
 from typing import Any
 from typing import Dict
+from typing import Iterator
 from typing import Optional
 
 import pytest
@@ -12,6 +14,8 @@ from rest_framework.test import APIClient
 from rest_framework.test import APITestCase
 
 from tests.factories import UserFactory
+from utils.queries import QueryCounter
+from utils.queries import count_queries
 
 
 @pytest.mark.django_db
@@ -69,3 +73,10 @@ class BaseAPITestCase(APITestCase):
             raise ValueError(f"Invalid method: {method}")
 
         return method_map[method.lower()](url, data=data, format=format)
+
+    @contextmanager
+    def assertMaxQueries(self, limit: int) -> Iterator[QueryCounter]:  # noqa: N802
+        """Assert that the block executes at most ``limit`` SQL queries."""
+        with count_queries() as counter:
+            yield counter
+        assert counter.count <= limit, f"{counter.count} queries executed, expected at most {limit}"
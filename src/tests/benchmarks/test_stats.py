@@ -0,0 +1,32 @@
+"""
+Tests for the summaries of benchmark samples.
+"""
+
+import pytest
+
+from benchmarks.stats import compare_results
+from benchmarks.stats import percentile
+from benchmarks.stats import summarize
+
+
+class TestBenchmarkStats:
+    """Tests for percentiles and the comparison with a baseline."""
+
+    def test_percentile(self) -> None:
+        """Test that percentiles interpolate between the closest ranks."""
+        values = [0.4, 0.1, 0.3, 0.2]
+
+        assert percentile(values, 0) == pytest.approx(0.1)
+        assert percentile(values, 50) == pytest.approx(0.25)
+        assert percentile(values, 100) == pytest.approx(0.4)
+        assert percentile([], 95) == 0.0
+
+    def test_compare_results(self) -> None:
+        """Test that extra queries always regress and timings only beyond the tolerance."""
+        baseline = {"list": summarize([0.01] * 10, 0.1, [3] * 10)}
+
+        assert compare_results({"list": summarize([0.011] * 10, 0.11, [3] * 10)}, baseline, tolerance=0.2) == []
+
+        regressions = compare_results({"list": summarize([0.02] * 10, 0.2, [4] * 10)}, baseline, tolerance=0.2)
+        assert regressions[0] == "list: 4 queries, baseline 3"
+        assert len(regressions) == 5
@@ -28,6 +28,23 @@ def _celery_eager():
     settings.CELERY_TASK_EAGER_PROPAGATES = original_eager_propagates
 
 
+@pytest.fixture(autouse=True)
+def _without_redis(settings):
+    """Count active tasks in the database and skip Redis notifications so tests do not depend on Redis state."""
+    settings.TASKS_QUOTA_BACKEND = "db"
+    settings.TASKS_EVENTS_ENABLED = False
+    settings.TASKS_LIST_VERSION_ENABLED = False
+    settings.TASKS_RESULT_CACHE_ENABLED = False
+    settings.TASKS_ADMISSION_ENABLED = False
+    settings.USERS_AUTH_CACHE_ENABLED = False
+
+
+@pytest.fixture(autouse=True)
+def _strict_query_budgets(settings):
+    """Fail requests that take more queries than the budget of their view."""
+    settings.DB_QUERY_BUDGET_RAISE = True
+
+
 @pytest.fixture(autouse=True)
 def _db_cleanup(django_db_setup, django_db_blocker):
     """Reset database after each test to ensure no data persists between tests."""
@@ -0,0 +1,130 @@
+"""
+Tests for the async task list and detail views.
+"""
+
+import json
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.views import AsyncTaskDetailView
+from tasks.views import AsyncTaskListCreateView
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+class TestAsyncTaskViews(BaseAPITestCase):
+    """Tests that the async views answer like the DRF views they replace."""
+
+    list_view = staticmethod(AsyncTaskListCreateView.as_view())
+    detail_view = staticmethod(AsyncTaskDetailView.as_view())
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+        self.url = reverse("task-list-create")
+        self.create_user()
+        self.authenticate()
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def get(self, view, url: str, headers=None, **kwargs) -> HttpResponse:
+        """Call an async view with a JWT authenticated GET request."""
+        request = self.factory.get(url, headers=self.headers if headers is None else headers)
+        return await view(request, **kwargs)
+
+    async def test_list_matches_sync_view(self) -> None:
+        """Test that pages, filters and the keyset mode return the same data as the DRF view."""
+        await sync_to_async(TaskFactory.create_batch)(12, user=self.user)
+        await sync_to_async(TaskFactory)()
+
+        for query in ("", "?page=2", "?status=pending", "?pagination=cursor"):
+            response = await self.get(self.list_view, f"{self.url}{query}")
+            expected = await sync_to_async(self.api_call)("get", f"{self.url}{query}")
+
+            assert response.status_code == status.HTTP_200_OK
+            assert json.loads(response.content) == expected.json()
+
+    async def test_list_invalid_parameters(self) -> None:
+        """Test that an unknown status and a page out of range are rejected as the DRF view does."""
+        response = await self.get(self.list_view, f"{self.url}?status=unknown")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "status" in json.loads(response.content)
+
+        response = await self.get(self.list_view, f"{self.url}?page=5")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @override_settings(TASKS_LIST_VERSION_ENABLED=True)
+    async def test_list_not_modified(self) -> None:
+        """Test that the list ETag is honored."""
+        with patch("tasks.conditional.get_redis") as get_redis:
+            get_redis.return_value.get.return_value = b"1"
+            etag = (await self.get(self.list_view, self.url))["ETag"]
+            response = await self.get(self.list_view, self.url, headers={**self.headers, "If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    async def test_detail(self) -> None:
+        """Test that a task is returned like the DRF view returns it and validated by its ETag."""
+        task = await sync_to_async(TaskFactory)(user=self.user, status=TaskStatusEnum.COMPLETED)
+        url = reverse("task-detail", kwargs={"pk": task.id})
+
+        response = await self.get(self.detail_view, url, pk=task.id)
+        expected = await sync_to_async(self.api_call)("get", url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == expected.json()
+        assert response["ETag"] == expected["ETag"]
+        assert response["Last-Modified"] == expected["Last-Modified"]
+
+        headers = {**self.headers, "If-None-Match": response["ETag"]}
+        response = await self.get(self.detail_view, url, headers=headers, pk=task.id)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    async def test_detail_same_bytes(self) -> None:
+        """Test that the body is rendered to the same bytes as by the DRF view, line separators included."""
+        task = await sync_to_async(TaskFactory)(user=self.user, input_data='{"name": "line\u2028separator"}')
+        url = reverse("task-detail", kwargs={"pk": task.id})
+
+        response = await self.get(self.detail_view, url, pk=task.id)
+        expected = await sync_to_async(self.api_call)("get", url)
+
+        assert b"\\u2028" in response.content
+        assert response.content == expected.content
+
+    async def test_detail_not_owned(self) -> None:
+        """Test that tasks of other users are not found."""
+        task = await sync_to_async(TaskFactory)()
+
+        response = await self.get(self.detail_view, reverse("task-detail", kwargs={"pk": task.id}), pk=task.id)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert json.loads(response.content) == {"detail": "No Task matches the given query."}
+
+    async def test_unauthenticated(self) -> None:
+        """Test that requests without a token are rejected with the JWT challenge."""
+        response = await self.get(self.list_view, self.url, headers={})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response["WWW-Authenticate"] == 'Bearer realm="api"'
+
+    async def test_create_delegated(self) -> None:
+        """Test that creation is served by the DRF view."""
+        data = {"task_type": "sum", "input_data": json.dumps({"num1": 1, "num2": 2})}
+        request = self.factory.post(self.url, data, content_type="application/json", headers=self.headers)
+
+        response = await self.list_view(request)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert await Task.objects.filter(user=self.user).acount() == 1
@@ -0,0 +1,124 @@
+"""
+Tests for the broker backlog monitor and admission control.
+"""
+
+import json
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework import status
+
+from tasks.backlog import measure_task_backlog
+from tasks.health_checks import TaskBacklogHealthCheck
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tasks.tasks import record_task_backlog
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+def backlog_snapshot(depth: int = 0, oldest_pending_age: float = 0.0) -> bytes:
+    """Create a stored backlog snapshot."""
+    return json.dumps({"depth": depth, "oldest_pending_age": oldest_pending_age, "measured_at": time.time()}).encode()
+
+
+class TestTaskBacklog(BaseAPITestCase):
+    """Tests for measuring the backlog and refusing tasks behind it."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.url = reverse("task-list-create")
+        self.data = {"task_type": TaskTypeEnum.COUNTDOWN, "input_data": json.dumps({"seconds": 1})}
+        self.create_user()
+        self.authenticate()
+
+    def test_measure_backlog(self) -> None:
+        """Test that the backlog sums all priority lists of the task queues and ages pending tasks."""
+        TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+
+        with patch("tasks.backlog.get_broker_redis") as get_broker_redis:
+            pipe = get_broker_redis.return_value.pipeline.return_value
+            pipe.execute.return_value = [1] * 12
+            backlog = measure_task_backlog()
+
+        queues = {call.args[0].split("\x06\x16")[0] for call in pipe.llen.call_args_list}
+        assert queues == {"celery", "tasks.light", "tasks.heavy"}
+        assert backlog.depth == 12
+        assert backlog.oldest_pending_age >= 0
+
+    @override_settings(TASKS_BACKLOG_MAX_AGE=60, TASKS_BACKLOG_STALE_AGE=15 * 60)
+    def test_measure_backlog_skips_lost_tasks(self) -> None:
+        """Test that a pending task whose message was lost does not age the backlog."""
+        task = TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+        Task.objects.filter(id=task.id).update(created_at=timezone.now() - timedelta(minutes=20))
+
+        backlog = measure_task_backlog({"celery": 1})
+
+        assert backlog.oldest_pending_age == 0
+        assert not backlog.is_exceeded()
+
+        Task.objects.filter(id=task.id).update(created_at=timezone.now() - timedelta(minutes=2))
+
+        assert measure_task_backlog({"celery": 0}).oldest_pending_age == 0
+        assert measure_task_backlog({"celery": 1}).is_exceeded()
+
+    def test_record_backlog_metrics(self) -> None:
+        """Test that the recorded backlog is exported as the depth of every queue and the oldest pending age."""
+        task = TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+        Task.objects.filter(id=task.id).update(created_at=timezone.now() - timedelta(minutes=5))
+
+        with patch("tasks.backlog.get_broker_redis") as get_broker_redis, patch("tasks.backlog.get_redis"):
+            # Priority lists of celery, tasks.heavy and tasks.light in turn
+            get_broker_redis.return_value.pipeline.return_value.execute.return_value = [1, 0, 0, 0] + [2] * 4 + [0] * 4
+            record_task_backlog()
+
+        assert REGISTRY.get_sample_value("task_queue_depth", {"queue": "celery"}) == 1
+        assert REGISTRY.get_sample_value("task_queue_depth", {"queue": "tasks.heavy"}) == 8
+        assert REGISTRY.get_sample_value("task_queue_depth", {"queue": "tasks.light"}) == 0
+        assert REGISTRY.get_sample_value("task_oldest_pending_age_seconds") >= 5 * 60
+
+    @override_settings(TASKS_ADMISSION_ENABLED=True, TASKS_BACKLOG_MAX_DEPTH=100)
+    def test_create_refused_behind_backlog(self) -> None:
+        """Test that a task is refused with Retry-After while the backlog is too deep."""
+        with patch("tasks.backlog.get_redis") as get_redis:
+            get_redis.return_value.get.return_value = backlog_snapshot(depth=101)
+            response = self.api_call("post", self.url, data=self.data)
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == "30"
+        assert not Task.objects.exists()
+
+    @override_settings(TASKS_ADMISSION_ENABLED=True, TASKS_BACKLOG_MAX_AGE=60)
+    def test_create_admitted(self) -> None:
+        """Test that tasks are admitted under the thresholds and inline tasks are admitted behind a backlog."""
+        with patch("tasks.backlog.get_redis") as get_redis, patch("tasks.tasks.countdown.delay"):
+            get_redis.return_value.get.return_value = backlog_snapshot(oldest_pending_age=59)
+            response = self.api_call("post", self.url, data=self.data)
+            assert response.status_code == status.HTTP_201_CREATED
+
+            get_redis.return_value.get.return_value = backlog_snapshot(oldest_pending_age=61)
+            data = {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 1, "num2": 2})}
+            response = self.api_call("post", self.url, data=data)
+            assert response.status_code == status.HTTP_201_CREATED
+
+    def test_health_check_reports_backlog(self) -> None:
+        """Test that an exceeded backlog is reported as a warning of a non-critical check."""
+        check = TaskBacklogHealthCheck()
+
+        with patch("tasks.backlog.get_redis") as get_redis:
+            get_redis.return_value.get.return_value = backlog_snapshot(depth=5)
+            check.run_check()
+            assert not check.errors
+            assert "5 queued messages" in check.pretty_status()
+
+            get_redis.return_value.get.return_value = backlog_snapshot(depth=10_001)
+            check.run_check()
+            assert "Task backlog exceeded" in check.pretty_status()
+        assert not check.critical_service
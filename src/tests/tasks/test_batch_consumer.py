@@ -0,0 +1,72 @@
+"""
+Tests for the batched consumer of pending tasks.
+"""
+
+import json
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tasks.tasks import complete_pending_tasks
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+class TestBatchConsumer(BaseAPITestCase):
+    """Tests for completing pending tasks in bulk."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.create_user()
+        self.authenticate()
+
+    def test_complete_pending_tasks(self) -> None:
+        """Test that pending tasks of the type are completed with a constant number of queries."""
+        tasks = [
+            TaskFactory(user=self.user, task_type=TaskTypeEnum.SUM, status=TaskStatusEnum.PENDING) for _ in range(3)
+        ]
+        countdown = TaskFactory(user=self.user, task_type=TaskTypeEnum.COUNTDOWN, status=TaskStatusEnum.PENDING)
+
+        with self.assertNumQueries(4):
+            complete_pending_tasks(TaskTypeEnum.SUM)
+
+        for task in tasks:
+            task.refresh_from_db()
+            assert task.status == TaskStatusEnum.COMPLETED
+            assert task.result == {"sum": float(task.input_data["num1"] + task.input_data["num2"])}
+        countdown.refresh_from_db()
+        assert countdown.status == TaskStatusEnum.PENDING
+
+    @override_settings(TASKS_BATCH_CONSUMER_SIZE=2)
+    def test_full_batch_schedules_next(self) -> None:
+        """Test that a full batch schedules the next one."""
+        for _ in range(3):
+            TaskFactory(user=self.user, task_type=TaskTypeEnum.SUM, status=TaskStatusEnum.PENDING)
+
+        with patch("tasks.tasks.complete_pending_tasks.apply_async") as apply_async:
+            complete_pending_tasks(TaskTypeEnum.SUM)
+
+        apply_async.assert_called_once_with((TaskTypeEnum.SUM,), queue="tasks.light")
+        assert Task.objects.filter(status=TaskStatusEnum.PENDING).count() == 1
+
+    @override_settings(TASKS_INLINE_ENABLED=False, TASKS_BATCH_CONSUMER_ENABLED=True)
+    def test_batch_create_dispatches_consumer_once(self) -> None:
+        """Test that batchable tasks are left to a single consumer message after commit."""
+        item = {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 1, "num2": 2})}
+
+        with (
+            patch("tasks.tasks.complete_pending_tasks.apply_async") as apply_async,
+            patch("tasks.tasks.sum_two_numbers.delay") as sum_delay,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.api_call("post", reverse("task-batch-create"), data={"tasks": [item] * 3})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        apply_async.assert_called_once_with((TaskTypeEnum.SUM,), queue="tasks.light")
+        sum_delay.assert_not_called()
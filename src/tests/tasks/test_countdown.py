@@ -0,0 +1,97 @@
+"""
+Tests for the countdown Celery task.
+"""
+
+import pytest
+from django.test import override_settings
+
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tasks.tasks import complete_countdown
+from tasks.tasks import countdown
+from tasks.tasks import get_task_payload
+from tests.factories import TaskFactory
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCountdown:
+    """Tests for blocking and deferred countdown modes."""
+
+    def test_deferred_countdown_releases_worker(self, mocker) -> None:
+        """Test that the deferred mode schedules completion instead of sleeping."""
+        task = TaskFactory(task_type=TaskTypeEnum.COUNTDOWN, status=TaskStatusEnum.PENDING, input_data={"seconds": 30})
+        sleep = mocker.patch("tasks.tasks.time.sleep")
+        apply_async = mocker.patch("tasks.tasks.complete_countdown.apply_async")
+
+        with override_settings(TASKS_COUNTDOWN_DEFERRED=True):
+            countdown(task.id)
+
+        task.refresh_from_db()
+        assert task.status == TaskStatusEnum.IN_PROGRESS
+        sleep.assert_not_called()
+        apply_async.assert_called_once_with((task.id, None), countdown=30.0)
+
+    def test_deferred_countdown_payload_carries_start(self, mocker) -> None:
+        """Test that a deferred completion carrying the payload knows when the countdown started."""
+        task = TaskFactory(task_type=TaskTypeEnum.COUNTDOWN, status=TaskStatusEnum.PENDING, input_data={"seconds": 30})
+        payload = get_task_payload(task)
+        apply_async = mocker.patch("tasks.tasks.complete_countdown.apply_async")
+
+        with override_settings(TASKS_COUNTDOWN_DEFERRED=True):
+            countdown(task.id, payload)
+
+        task.refresh_from_db()
+        _, deferred_payload = apply_async.call_args.args[0]
+        assert deferred_payload == {**payload, "started_at": task.started_at.isoformat()}
+
+        complete_countdown(task.id, deferred_payload)
+
+        task.refresh_from_db()
+        assert task.status == TaskStatusEnum.COMPLETED
+        assert task.started_at < task.finished_at
+
+    def test_deferred_countdown_completes(self) -> None:
+        """Test that the scheduled completion finishes the countdown."""
+        task = TaskFactory(
+            task_type=TaskTypeEnum.COUNTDOWN, status=TaskStatusEnum.IN_PROGRESS, input_data={"seconds": 1}
+        )
+
+        complete_countdown(task.id)
+
+        task.refresh_from_db()
+        assert task.status == TaskStatusEnum.COMPLETED
+        assert task.result == {"message": "Обратный отсчёт завершён"}
+
+    def test_deferred_countdown_completes_from_payload(self, django_assert_num_queries) -> None:
+        """Test that a completion carrying the payload does not fetch the task."""
+        task = TaskFactory(
+            task_type=TaskTypeEnum.COUNTDOWN, status=TaskStatusEnum.IN_PROGRESS, input_data={"seconds": 1}
+        )
+        payload = {"user_id": task.user_id, "task_type": TaskTypeEnum.COUNTDOWN, "input_data": {"seconds": 1}}
+
+        with django_assert_num_queries(1):
+            complete_countdown(task.id, payload)
+
+        task.refresh_from_db()
+        assert task.status == TaskStatusEnum.COMPLETED
+
+    def test_complete_countdown_ignores_finished_task(self) -> None:
+        """Test that a redelivered completion does not touch an already finished task."""
+        task = TaskFactory(task_type=TaskTypeEnum.COUNTDOWN, status=TaskStatusEnum.ERROR)
+
+        complete_countdown(task.id)
+
+        task.refresh_from_db()
+        assert task.status == TaskStatusEnum.ERROR
+
+    def test_blocking_countdown(self, mocker) -> None:
+        """Test that the blocking mode sleeps inside the worker and completes the task."""
+        task = TaskFactory(task_type=TaskTypeEnum.COUNTDOWN, status=TaskStatusEnum.PENDING, input_data='{"seconds": 5}')
+        sleep = mocker.patch("tasks.tasks.time.sleep")
+
+        with override_settings(TASKS_COUNTDOWN_DEFERRED=False):
+            countdown(task.id)
+
+        task.refresh_from_db()
+        assert task.status == TaskStatusEnum.COMPLETED
+        sleep.assert_called_once_with(5.0)
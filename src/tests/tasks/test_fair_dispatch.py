@@ -0,0 +1,91 @@
+"""
+Tests for the fair dispatcher of pending tasks.
+"""
+
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tasks.tasks import dispatch_fair_share
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+from tests.factories import UserFactory
+
+
+class TestFairDispatch(BaseAPITestCase):
+    """Tests for dispatching pending tasks round-robin by user."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.create_user()
+        self.authenticate()
+        self.noisy_user = UserFactory()
+
+    def create_pending(self, user, count: int) -> list:
+        """Create pending countdown tasks of the user."""
+        return [
+            TaskFactory(user=user, task_type=TaskTypeEnum.COUNTDOWN, status=TaskStatusEnum.PENDING)
+            for _ in range(count)
+        ]
+
+    @override_settings(TASKS_FAIR_DISPATCH_ENABLED=True, TASKS_FAIR_WINDOW=3)
+    def test_dispatch_round_robin(self) -> None:
+        """Test that a light user is not queued behind the backlog of a noisy one."""
+        noisy = self.create_pending(self.noisy_user, 5)
+        light = self.create_pending(self.user, 1)
+
+        with patch("tasks.tasks.send_tasks") as send_tasks, self.captureOnCommitCallbacks(execute=True):
+            dispatch_fair_share()
+
+        sent = [task.id for task in send_tasks.call_args.args[0]]
+        assert sent == [noisy[0].id, light[0].id, noisy[1].id]
+        assert Task.objects.filter(dispatched_at__isnull=False).count() == 3
+
+    @override_settings(TASKS_FAIR_DISPATCH_ENABLED=True, TASKS_FAIR_WINDOW=3)
+    def test_dispatch_respects_window(self) -> None:
+        """Test that only the free slots of the window are filled and lost tasks are dispatched again."""
+        queued, lost, waiting = self.create_pending(self.user, 3)
+        Task.objects.filter(id=queued.id).update(dispatched_at=timezone.now())
+        Task.objects.filter(id=lost.id).update(dispatched_at=timezone.now() - timedelta(hours=1))
+        TaskFactory(user=self.user, task_type=TaskTypeEnum.COUNTDOWN, status=TaskStatusEnum.IN_PROGRESS)
+
+        with patch("tasks.tasks.send_tasks") as send_tasks, self.captureOnCommitCallbacks(execute=True):
+            dispatch_fair_share()
+
+        assert [task.id for task in send_tasks.call_args.args[0]] == [lost.id, waiting.id]
+
+    @override_settings(TASKS_FAIR_DISPATCH_ENABLED=True, TASKS_FAIR_WINDOW=1)
+    def test_dispatch_full_window(self) -> None:
+        """Test that nothing is dispatched while the window is full."""
+        queued, _ = self.create_pending(self.user, 2)
+        Task.objects.filter(id=queued.id).update(dispatched_at=timezone.now())
+
+        with patch("tasks.tasks.send_tasks") as send_tasks, self.captureOnCommitCallbacks(execute=True):
+            dispatch_fair_share()
+
+        send_tasks.assert_not_called()
+
+    @override_settings(TASKS_FAIR_DISPATCH_ENABLED=True)
+    def test_create_leaves_task_to_dispatcher(self) -> None:
+        """Test that a created task is not sent directly but triggers the dispatcher after commit."""
+        data = {"task_type": TaskTypeEnum.COUNTDOWN, "input_data": json.dumps({"seconds": 1})}
+
+        with (
+            patch("tasks.tasks.dispatch_fair_share.delay") as delay,
+            patch("tasks.tasks.countdown.delay") as countdown_delay,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.api_call("post", reverse("task-list-create"), data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        delay.assert_called_once_with()
+        countdown_delay.assert_not_called()
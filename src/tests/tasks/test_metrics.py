@@ -0,0 +1,80 @@
+"""
+Tests for the task lifecycle timestamps and metrics.
+"""
+
+import json
+from typing import Optional
+
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tasks.tasks import sum_two_numbers
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+def get_sample(name: str, **labels: str) -> float:
+    value: Optional[float] = REGISTRY.get_sample_value(name, labels)
+    return value or 0.0
+
+
+class TestTaskMetrics(BaseAPITestCase):
+    """Tests for the timestamps of task transitions and the metrics observed from them."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.create_user()
+        self.authenticate()
+
+    def test_worker_records_transition_timestamps(self) -> None:
+        """Test that the start of a task is kept when it finishes."""
+        task = TaskFactory(
+            user=self.user, task_type=TaskTypeEnum.SUM, status=TaskStatusEnum.PENDING, input_data={"num1": 1, "num2": 2}
+        )
+        labels = {"task_type": TaskTypeEnum.SUM}
+        finished = get_sample("tasks_finished_total", status=TaskStatusEnum.COMPLETED, **labels)
+        waits = get_sample("task_queue_wait_seconds_count", **labels)
+        runs = get_sample("task_run_seconds_count", status=TaskStatusEnum.COMPLETED, **labels)
+
+        sum_two_numbers(task.id)
+
+        task.refresh_from_db()
+        assert task.created_at <= task.started_at <= task.finished_at
+        assert get_sample("tasks_finished_total", status=TaskStatusEnum.COMPLETED, **labels) == finished + 1
+        assert get_sample("task_queue_wait_seconds_count", **labels) == waits + 1
+        assert get_sample("task_run_seconds_count", status=TaskStatusEnum.COMPLETED, **labels) == runs + 1
+
+    @override_settings(TASKS_INLINE_ENABLED=True)
+    def test_inline_task_observed(self) -> None:
+        """Test that a task computed in the request is counted as created and finished."""
+        data = {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 5, "num2": 7})}
+        labels = {"task_type": TaskTypeEnum.SUM}
+        created = get_sample("tasks_created_total", **labels)
+        latencies = get_sample("task_latency_seconds_count", status=TaskStatusEnum.COMPLETED, **labels)
+
+        response = self.api_call("post", reverse("task-list-create"), data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        task = Task.objects.get(id=response.data["id"])
+        assert task.started_at is not None
+        assert task.started_at == task.finished_at
+        assert get_sample("tasks_created_total", **labels) == created + 1
+        assert get_sample("task_latency_seconds_count", status=TaskStatusEnum.COMPLETED, **labels) == latencies + 1
+
+    def test_metrics_endpoint(self) -> None:
+        """Test that the metrics are exposed in the Prometheus text format."""
+        TaskFactory(user=self.user, task_type=TaskTypeEnum.SUM, status=TaskStatusEnum.PENDING)
+        sum_two_numbers(Task.objects.get().id)
+
+        self.client.credentials()
+        response = self.client.get(reverse("metrics"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"].startswith("text/plain")
+        assert b"tasks_finished_total" in response.content
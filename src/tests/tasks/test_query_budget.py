@@ -0,0 +1,77 @@
+"""
+Tests for per-request query counting and query budgets.
+"""
+
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import TaskStatusEnum
+from tasks.views import TaskDetailView
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+from utils.middleware import QueryBudgetError
+from utils.middleware import bind_query_count
+
+
+class TestQueryBudget(BaseAPITestCase):
+    """Tests for the query count middleware and the budgets of task views."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.url = reverse("task-list-create")
+        self.create_user()
+        self.authenticate()
+
+    def test_list_constant_queries(self) -> None:
+        """Test that the task list takes the same queries for one task and for a full page."""
+        TaskFactory(user=self.user, status=TaskStatusEnum.COMPLETED)
+        with self.assertMaxQueries(3) as single:
+            self.api_call("get", self.url)
+
+        TaskFactory.create_batch(20, user=self.user, status=TaskStatusEnum.COMPLETED)
+        with self.assertMaxQueries(3) as page:
+            response = self.api_call("get", self.url)
+
+        assert len(response.data["results"]) == 10
+        assert page.count == single.count
+
+    def test_request_queries_counted(self) -> None:
+        """Test that the queries and their time are attached to the request log."""
+        task = TaskFactory(user=self.user)
+
+        response = self.api_call("get", reverse("task-detail", kwargs={"pk": task.id}))
+        log_kwargs = {}
+        bind_query_count(request=response.wsgi_request, log_kwargs=log_kwargs)
+
+        assert log_kwargs["db_queries"] == response.wsgi_request.db_queries.count
+        assert log_kwargs["db_queries"] > 0
+        assert log_kwargs["db_time_ms"] >= 0
+
+    def test_budget_exceeded_raises(self) -> None:
+        """Test that a request over the budget of its view fails."""
+        task = TaskFactory(user=self.user)
+        url = reverse("task-detail", kwargs={"pk": task.id})
+
+        with patch.object(TaskDetailView, "query_budget", {"GET": 0}), pytest.raises(QueryBudgetError):
+            self.api_call("get", url)
+
+    @override_settings(DB_QUERY_BUDGET_RAISE=False)
+    def test_budget_exceeded_logged(self) -> None:
+        """Test that outside of tests a request over the budget is only logged."""
+        task = TaskFactory(user=self.user)
+        url = reverse("task-detail", kwargs={"pk": task.id})
+
+        with (
+            patch.object(TaskDetailView, "query_budget", {"GET": 0}),
+            patch("utils.middleware.logger", MagicMock()) as logger,
+        ):
+            response = self.api_call("get", url)
+
+        assert response.status_code == status.HTTP_200_OK
+        logger.warning.assert_called_once()
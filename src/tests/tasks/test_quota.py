@@ -0,0 +1,156 @@
+"""
+Tests for the active task quota.
+"""
+
+import json
+from typing import Dict
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tasks.quota import RedisActiveTaskQuota
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+def redis_client(granted: int) -> MagicMock:
+    """Create a Redis client mock whose acquire script grants the given number of slots."""
+    client = MagicMock()
+    scripts = {}
+
+    def register_script(script: str) -> MagicMock:
+        if "HINCRBY" in script:
+            return scripts.setdefault("acquire", MagicMock(return_value=granted))
+        if "HDEL" in script:
+            return scripts.setdefault("reconcile", MagicMock(return_value=1))
+        return scripts.setdefault("release", MagicMock(return_value=0))
+
+    client.register_script.side_effect = register_script
+    client.scripts = scripts
+    return client
+
+
+def set_hashes(client: MagicMock, counters: Dict[str, str], drifts: Dict[str, str]) -> None:
+    """Make the Redis client mock return the given counters and the drifts of the previous reconciliation."""
+    hashes = {"tasks:active": counters, "tasks:active:drift": drifts}
+    client.hgetall.side_effect = lambda key: {
+        user_id.encode(): value.encode() for user_id, value in hashes[key].items()
+    }
+
+
+class TestActiveTaskQuota(BaseAPITestCase):
+    """Tests for the database and Redis quota backends."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.url = reverse("task-list-create")
+        self.data = {"task_type": TaskTypeEnum.COUNTDOWN, "input_data": json.dumps({"seconds": 0})}
+        self.create_user()
+        self.authenticate()
+
+    def test_user_limit_overrides_default(self) -> None:
+        """Test that a per-user limit takes precedence over the default one."""
+        self.user.active_tasks_limit = 1
+        self.user.save()
+        TaskFactory(user=self.user, status=TaskStatusEnum.IN_PROGRESS)
+
+        response = self.api_call("post", self.url, data=self.data)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert "You can't have more than 1 active tasks at the same time" in str(response.data)
+
+    @override_settings(TASKS_QUOTA_BACKEND="redis")
+    def test_redis_quota_admits_and_releases(self) -> None:
+        """Test that the Redis backend admits a task without counting and releases the slot when it finishes."""
+        client = redis_client(granted=1)
+
+        with (
+            patch("tasks.quota.get_redis", return_value=client),
+            patch("tasks.quota.get_active_tasks_count") as count,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.api_call("post", self.url, data=self.data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        count.assert_not_called()
+        client.scripts["acquire"].assert_called_once_with(keys=["tasks:active"], args=[self.user.id, 5, 1])
+        client.scripts["release"].assert_called_once_with(keys=["tasks:active"], args=[self.user.id, 1])
+
+    @override_settings(TASKS_QUOTA_BACKEND="redis")
+    def test_redis_quota_rejects(self) -> None:
+        """Test that the Redis backend rejects a task when no slot is granted."""
+        client = redis_client(granted=0)
+
+        with patch("tasks.quota.get_redis", return_value=client):
+            response = self.api_call("post", self.url, data=self.data)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert "You can't have more than 5 active tasks at the same time" in str(response.data)
+
+    def test_redis_quota_seeds_cold_counter(self) -> None:
+        """Test that a missing counter is seeded from the database before admission."""
+        TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+        client = redis_client(granted=-1)
+        quota = RedisActiveTaskQuota(client=client)
+        client.scripts["acquire"].side_effect = [-1, 1]
+
+        assert quota.acquire(self.user) == 1
+        client.hsetnx.assert_called_once_with("tasks:active", self.user.id, 1)
+
+    def test_redis_quota_reconcile(self) -> None:
+        """Test that reconciliation overwrites counters drifted the same way on the previous run."""
+        other = TaskFactory(status=TaskStatusEnum.PENDING).user
+        TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+        TaskFactory(user=self.user, status=TaskStatusEnum.IN_PROGRESS)
+        TaskFactory(user=self.user, status=TaskStatusEnum.COMPLETED)
+        client = redis_client(granted=0)
+        set_hashes(
+            client,
+            counters={str(self.user.id): "5", "999": "1", str(other.id): "1"},
+            drifts={str(self.user.id): "5:2", "999": "1:0"},
+        )
+
+        drifted = RedisActiveTaskQuota(client=client).reconcile()
+
+        assert drifted == 2
+        reconcile = client.scripts["reconcile"]
+        assert sorted(call.kwargs["args"] for call in reconcile.call_args_list) == [
+            [str(self.user.id), "5", 2],
+            ["999", "1", 0],
+        ]
+        client.delete.assert_not_called()
+        client.pipeline.return_value.delete.assert_called_once_with("tasks:active:drift")
+        client.pipeline.return_value.hset.assert_not_called()
+
+    def test_redis_quota_reconcile_waits_for_repeated_drift(self) -> None:
+        """Test that a drift seen once, as of an admission not committed yet, is only recorded."""
+        TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+        client = redis_client(granted=0)
+        set_hashes(client, counters={str(self.user.id): "2"}, drifts={str(self.user.id): "3:1"})
+
+        drifted = RedisActiveTaskQuota(client=client).reconcile()
+
+        assert drifted == 0
+        client.scripts["reconcile"].assert_not_called()
+        client.pipeline.return_value.hset.assert_called_once_with(
+            "tasks:active:drift", mapping={str(self.user.id): "2:1"}
+        )
+
+    def test_redis_quota_reconcile_skips_changed_counters(self) -> None:
+        """Test that a counter changed by an admission during reconciliation is not overwritten."""
+        TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+        client = redis_client(granted=0)
+        set_hashes(client, counters={}, drifts={str(self.user.id): ":1"})
+        quota = RedisActiveTaskQuota(client=client)
+        client.scripts["reconcile"].return_value = 0
+
+        drifted = quota.reconcile()
+
+        assert drifted == 0
+        client.scripts["reconcile"].assert_called_once_with(keys=["tasks:active"], args=[str(self.user.id), "", 1])
@@ -0,0 +1,59 @@
+"""
+Tests for the task type registry.
+"""
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+from fizikl_assignment.celery import app
+from tasks.models import TaskTypeEnum
+from tasks.registry import TaskCostEnum
+from tasks.registry import TaskType
+from tasks.registry import TaskTypeRegistry
+from tasks.registry import task_types
+from tasks.tasks import complete_countdown
+from tasks.tasks import countdown
+from tasks.tasks import reconcile_active_task_quota
+from tasks.tasks import sum_two_numbers
+
+
+class TestTaskTypeRegistry:
+    """Tests for registering task types and routing their handlers."""
+
+    def test_builtin_types_registered(self) -> None:
+        """Test that the built-in task types are registered with their policies."""
+        assert task_types.get_choices() == TaskTypeEnum.choices
+        assert task_types[TaskTypeEnum.SUM].cost == TaskCostEnum.LIGHT
+        assert task_types[TaskTypeEnum.COUNTDOWN].cost == TaskCostEnum.HEAVY
+        assert task_types.get_queues() == ["tasks.heavy", "tasks.light"]
+
+    def test_handlers_routed_to_queue_of_type(self) -> None:
+        """Test that handlers and their followups are routed to the queue of their type."""
+        router = app.amqp.router
+
+        assert router.route({}, sum_two_numbers.name)["queue"].name == "tasks.light"
+        assert router.route({}, countdown.name)["queue"].name == "tasks.heavy"
+        assert router.route({}, complete_countdown.name)["queue"].name == "tasks.heavy"
+        assert router.route({}, reconcile_active_task_quota.name)["queue"].name == "celery"
+
+    def test_time_limit_applied_to_handler(self) -> None:
+        """Test that the time limit of a type is applied to its handler."""
+        assert sum_two_numbers.time_limit == 30
+
+    def test_register(self) -> None:
+        """Test that a registered type is routed with its priority and cannot be registered twice."""
+        registry = TaskTypeRegistry()
+        task_type = TaskType(
+            name="noop",
+            label="Noop",
+            input_serializer=serializers.Serializer,
+            handler=sum_two_numbers,
+            priority=3,
+        )
+
+        registry.register(task_type)
+
+        assert registry.get_route(sum_two_numbers.name) == {"queue": "tasks.light", "priority": 3}
+        with pytest.raises(ImproperlyConfigured):
+            registry.register(task_type)
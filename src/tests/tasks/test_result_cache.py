@@ -0,0 +1,105 @@
+"""
+Tests for the task result cache.
+"""
+
+import json
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tasks.result_cache import get_result_cache_key
+from tasks.tasks import sum_two_numbers
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+class TestResultCache(BaseAPITestCase):
+    """Tests for serving deterministic task results from the cache."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.url = reverse("task-list-create")
+        self.data = {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 5, "num2": 7})}
+        self.create_user()
+        self.authenticate()
+
+    def test_cache_key_is_canonical(self) -> None:
+        """Test that the cache key does not depend on the key order of the input."""
+        key = get_result_cache_key(TaskTypeEnum.SUM, {"num1": 1, "num2": 2})
+
+        assert key == get_result_cache_key(TaskTypeEnum.SUM, {"num2": 2, "num1": 1})
+        assert key != get_result_cache_key(TaskTypeEnum.SUM, {"num1": 2, "num2": 1})
+        assert key != get_result_cache_key(TaskTypeEnum.COUNTDOWN, {"num1": 1, "num2": 2})
+
+    @override_settings(TASKS_RESULT_CACHE_ENABLED=True, TASKS_INLINE_ENABLED=False)
+    def test_create_cache_hit(self) -> None:
+        """Test that a cache hit completes the task without dispatching it or taking a quota slot."""
+        for _ in range(5):
+            TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+
+        with (
+            patch("tasks.result_cache.get_cache_redis") as get_redis,
+            patch("tasks.tasks.sum_two_numbers.delay") as delay,
+        ):
+            get_redis.return_value.mget.return_value = [b'{"sum": 12.0}']
+            response = self.api_call("post", self.url, data=self.data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["status"] == TaskStatusEnum.COMPLETED
+        assert response.data["result"] == {"sum": 12.0}
+        delay.assert_not_called()
+
+    @override_settings(TASKS_RESULT_CACHE_ENABLED=True)
+    def test_worker_caches_result(self) -> None:
+        """Test that the worker stores a computed result and reuses a cached one."""
+        task = TaskFactory(
+            user=self.user, task_type=TaskTypeEnum.SUM, status=TaskStatusEnum.PENDING, input_data={"num1": 1, "num2": 2}
+        )
+
+        with patch("tasks.result_cache.get_cache_redis") as get_redis:
+            get_redis.return_value.mget.return_value = [None]
+            sum_two_numbers(task.id)
+
+        key, value = get_redis.return_value.set.call_args.args
+        assert key == get_result_cache_key(TaskTypeEnum.SUM, {"num1": 1, "num2": 2})
+        assert json.loads(value) == {"sum": 3.0}
+        assert get_redis.return_value.set.call_args.kwargs == {"ex": 24 * 60 * 60}
+
+        task = TaskFactory(
+            user=self.user, task_type=TaskTypeEnum.SUM, status=TaskStatusEnum.PENDING, input_data={"num1": 1, "num2": 2}
+        )
+        with patch("tasks.result_cache.get_cache_redis") as get_redis:
+            get_redis.return_value.mget.return_value = [b'{"sum": 3.0}']
+            sum_two_numbers(task.id)
+
+        task.refresh_from_db()
+        assert task.status == TaskStatusEnum.COMPLETED
+        assert task.result == {"sum": 3.0}
+        get_redis.return_value.set.assert_not_called()
+
+    @override_settings(TASKS_RESULT_CACHE_ENABLED=True, TASKS_INLINE_ENABLED=False)
+    def test_batch_create_cache_lookup_once(self) -> None:
+        """Test that a batch looks up all cacheable items with a single request."""
+        items = [
+            {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 1, "num2": 2})},
+            {"task_type": TaskTypeEnum.COUNTDOWN, "input_data": json.dumps({"seconds": 1})},
+            {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 3, "num2": 4})},
+        ]
+
+        with patch("tasks.result_cache.get_cache_redis") as get_redis, patch("tasks.tasks.group") as group:
+            get_redis.return_value.mget.return_value = [b'{"sum": 3.0}', None]
+            response = self.api_call("post", reverse("task-batch-create"), data={"tasks": items})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        get_redis.return_value.mget.assert_called_once()
+        assert len(get_redis.return_value.mget.call_args.args[0]) == 2
+
+        statuses = [Task.objects.get(id=item["id"]).status for item in response.data]
+        assert statuses == [TaskStatusEnum.COMPLETED, TaskStatusEnum.PENDING, TaskStatusEnum.PENDING]
+        assert len(group.call_args.args[0]) == 2
@@ -0,0 +1,132 @@
+"""
+Tests for the batch task creation endpoint.
+"""
+
+import json
+from unittest.mock import patch
+
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+class TestTaskBatchCreate(BaseAPITestCase):
+    """Tests for creating tasks in batches."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.url = reverse("task-batch-create")
+        self.create_user()
+        self.authenticate()
+
+    def test_batch_create_success(self) -> None:
+        """Test creating several tasks in a single request."""
+        data = {
+            "tasks": [
+                {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 1, "num2": 2})},
+                {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 3, "num2": 4})},
+            ]
+        }
+
+        response = self.api_call("post", self.url, data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [item["index"] for item in response.data] == [0, 1]
+        assert all(item["errors"] is None for item in response.data)
+
+        ids = [item["id"] for item in response.data]
+        assert Task.objects.filter(id__in=ids, user=self.user).count() == 2
+
+    def test_batch_create_reports_item_errors(self) -> None:
+        """Test that invalid items are reported without failing the whole batch."""
+        data = {
+            "tasks": [
+                {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 1})},  # Missing num2
+                {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 3, "num2": 4})},
+            ]
+        }
+
+        response = self.api_call("post", self.url, data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data[0]["id"] is None
+        assert response.data[0]["errors"]
+        assert response.data[1]["id"] is not None
+        assert Task.objects.filter(user=self.user).count() == 1
+
+    def test_batch_create_reports_unencoded_input(self) -> None:
+        """Test that an item with input data not encoded in a string is reported as an item error."""
+        data = {
+            "tasks": [
+                {"task_type": TaskTypeEnum.SUM, "input_data": {"num1": 1, "num2": 2}},
+                {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 3, "num2": 4})},
+            ]
+        }
+
+        response = self.api_call("post", self.url, data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data[0]["id"] is None
+        assert "encoded in a string" in str(response.data[0]["errors"])
+        assert response.data[1]["id"] is not None
+
+    def test_batch_create_applies_active_task_limit(self) -> None:
+        """Test that items beyond the remaining active task quota are rejected."""
+        for _ in range(3):
+            TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+
+        item = {"task_type": TaskTypeEnum.COUNTDOWN, "input_data": json.dumps({"seconds": 1})}
+        with patch("tasks.tasks.group"):
+            response = self.api_call("post", self.url, data={"tasks": [item] * 4})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [item["id"] is not None for item in response.data] == [True, True, False, False]
+        assert "You can't have more than 5 active tasks at the same time" in str(response.data[2]["errors"])
+
+    def test_batch_create_inline(self) -> None:
+        """Test that cheap items are completed in the request and only the rest is dispatched."""
+        data = {
+            "tasks": [
+                {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 1, "num2": 2})},
+                {"task_type": TaskTypeEnum.COUNTDOWN, "input_data": json.dumps({"seconds": 1})},
+            ]
+        }
+
+        with patch("tasks.tasks.countdown.delay") as delay:
+            response = self.api_call("post", self.url, data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        sum_task, countdown_task = (Task.objects.get(id=item["id"]) for item in response.data)
+        assert sum_task.status == TaskStatusEnum.COMPLETED
+        assert sum_task.result == {"sum": 3.0}
+        assert countdown_task.status == TaskStatusEnum.PENDING
+        delay.assert_called_once_with(
+            countdown_task.id,
+            {
+                "user_id": self.user.id,
+                "task_type": TaskTypeEnum.COUNTDOWN,
+                "input_data": {"seconds": 1},
+                "created_at": countdown_task.created_at.isoformat(),
+            },
+        )
+
+    def test_batch_create_all_invalid(self) -> None:
+        """Test that a batch without any valid item is rejected."""
+        data = {"tasks": [{"task_type": TaskTypeEnum.SUM, "input_data": "{invalid json}"}]}
+
+        response = self.api_call("post", self.url, data=data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Task.objects.exists()
+
+    def test_batch_create_empty(self) -> None:
+        """Test that an empty batch is rejected."""
+        response = self.api_call("post", self.url, data={"tasks": []})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
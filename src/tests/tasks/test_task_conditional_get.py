@@ -0,0 +1,121 @@
+"""
+Tests for conditional GET requests on task endpoints.
+"""
+
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import TaskStatusEnum
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+class TestTaskDetailConditionalGet(BaseAPITestCase):
+    """Tests for ETag and Last-Modified on the task detail endpoint."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.create_user()
+        self.authenticate()
+        self.task = TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+        self.url = reverse("task-detail", kwargs={"pk": self.task.id})
+
+    def test_unchanged_task_not_modified(self) -> None:
+        """Test that polling an unchanged task answers 304 after a single lookup."""
+        response = self.api_call("get", self.url)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_changed_task_modified(self) -> None:
+        """Test that a changed task is returned again with a new ETag."""
+        response = self.api_call("get", self.url)
+        etag = response["ETag"]
+
+        self.task.status = TaskStatusEnum.COMPLETED
+        self.task.save()
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["status"] == TaskStatusEnum.COMPLETED
+        assert response["ETag"] != etag
+
+    def test_last_modified_only_for_finished_tasks(self) -> None:
+        """Test that only finished tasks are validated by date."""
+        response = self.api_call("get", self.url)
+        assert "Last-Modified" not in response
+
+        self.task.status = TaskStatusEnum.COMPLETED
+        self.task.save()
+        response = self.api_call("get", self.url)
+        last_modified = response["Last-Modified"]
+
+        response = self.client.get(self.url, headers={"If-Modified-Since": last_modified})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_not_owned_task_not_found(self) -> None:
+        """Test that validators do not leak tasks of other users."""
+        other_task = TaskFactory()
+
+        response = self.api_call("get", reverse("task-detail", kwargs={"pk": other_task.id}))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert "ETag" not in response
+
+
+class TestTaskListConditionalGet(BaseAPITestCase):
+    """Tests for the ETag of the task list endpoint."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.url = reverse("task-list-create")
+        self.create_user()
+        self.authenticate()
+        TaskFactory(user=self.user)
+
+    @override_settings(TASKS_LIST_VERSION_ENABLED=True)
+    def test_unchanged_list_not_modified(self) -> None:
+        """Test that an unchanged list answers 304 without touching the database."""
+        with patch("tasks.conditional.get_redis") as get_redis:
+            get_redis.return_value.get.return_value = b"1"
+            etag = self.api_call("get", self.url)["ETag"]
+
+            with self.assertNumQueries(0):
+                response = self.client.get(self.url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @override_settings(TASKS_LIST_VERSION_ENABLED=True)
+    def test_list_version_and_query_change_etag(self) -> None:
+        """Test that a new version or another query string produce a new ETag."""
+        with patch("tasks.conditional.get_redis") as get_redis:
+            get_redis.return_value.get.return_value = b"1"
+            etag = self.api_call("get", self.url)["ETag"]
+            filtered_etag = self.api_call("get", f"{self.url}?status=pending")["ETag"]
+
+            get_redis.return_value.get.return_value = b"2"
+            response = self.client.get(self.url, headers={"If-None-Match": etag})
+
+        assert filtered_etag != etag
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    @override_settings(TASKS_LIST_VERSION_ENABLED=True)
+    def test_create_bumps_list_version(self) -> None:
+        """Test that creating a task bumps the list version after commit."""
+        data = {"task_type": "sum", "input_data": '{"num1": 1, "num2": 2}'}
+
+        with patch("tasks.conditional.get_redis") as get_redis, self.captureOnCommitCallbacks(execute=True):
+            response = self.api_call("post", self.url, data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        keys = {call.args[0] for call in get_redis.return_value.set.call_args_list}
+        assert keys == {f"tasks:list-version:{self.user.id}"}
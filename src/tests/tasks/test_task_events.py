@@ -0,0 +1,116 @@
+"""
+Tests for the task events stream.
+"""
+
+import json
+from datetime import timedelta
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.events import publish_task_event_on_commit
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+def async_redis_client(*messages: bytes) -> MagicMock:
+    """Create an async Redis client mock whose pub/sub delivers the given messages."""
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.unsubscribe = AsyncMock()
+    pubsub.aclose = AsyncMock()
+    pubsub.get_message = AsyncMock(side_effect=[{"data": message} for message in messages] + [None])
+
+    client = MagicMock()
+    client.pubsub.return_value = pubsub
+    client.aclose = AsyncMock()
+    return client
+
+
+class TestTaskEvents(BaseAPITestCase):
+    """Tests for streaming task status changes."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.url = reverse("task-events")
+        self.create_user()
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def test_events_unauthenticated(self) -> None:
+        """Test that the stream requires a JWT token."""
+        response = await self.async_client.get(self.url)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_events_invalid_token(self) -> None:
+        """Test that the stream rejects an invalid token."""
+        response = await self.async_client.get(self.url, headers={"Authorization": "Bearer invalid"})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_events_refused_under_wsgi(self) -> None:
+        """Test that the WSGI application refuses the stream instead of buffering it forever."""
+        with patch("tasks.views.stream_task_events") as stream:
+            response = self.client.get(self.url, headers={"Authorization": f"Bearer {self.token}"})
+
+        assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
+        stream.assert_not_called()
+
+    async def test_events_stream(self) -> None:
+        """Test that the stream sends active tasks first and then published changes."""
+        task = await sync_to_async(TaskFactory)(user=self.user, status=TaskStatusEnum.PENDING)
+        published = json.dumps({"id": task.id, "status": TaskStatusEnum.COMPLETED, "result": {"sum": 3.0}})
+        client = async_redis_client(published.encode())
+
+        with patch("tasks.events.get_async_redis", return_value=client):
+            response = await self.async_client.get(self.url, headers={"Authorization": f"Bearer {self.token}"})
+
+            assert response.status_code == status.HTTP_200_OK
+            assert response["Content-Type"] == "text/event-stream"
+
+            stream = aiter(response.streaming_content)
+            chunks = [await anext(stream) for _ in range(4)]
+
+        assert chunks[0].startswith(b"retry:")
+        assert json.loads(chunks[1].split(b"data: ")[1])["id"] == task.id
+        assert chunks[2] == f"event: task\ndata: {published}\n\n".encode()
+        assert chunks[3] == b": keepalive\n\n"
+        client.pubsub.return_value.subscribe.assert_awaited_once_with(f"tasks:events:{self.user.id}")
+
+    async def test_events_snapshot_recently_finished(self) -> None:
+        """Test that a task finished before the subscription is in the snapshot unless it is old."""
+        finished = await sync_to_async(TaskFactory)(user=self.user, status=TaskStatusEnum.COMPLETED)
+        old = await sync_to_async(TaskFactory)(user=self.user, status=TaskStatusEnum.COMPLETED)
+        await Task.objects.filter(id=old.id).aupdate(updated_at=timezone.now() - timedelta(hours=1))
+        client = async_redis_client()
+
+        with patch("tasks.events.get_async_redis", return_value=client):
+            response = await self.async_client.get(self.url, headers={"Authorization": f"Bearer {self.token}"})
+            stream = aiter(response.streaming_content)
+            chunks = [await anext(stream) for _ in range(3)]
+
+        assert json.loads(chunks[1].split(b"data: ")[1])["id"] == finished.id
+        assert chunks[2] == b": keepalive\n\n"
+
+    @override_settings(TASKS_EVENTS_ENABLED=True)
+    def test_publish_on_commit(self) -> None:
+        """Test that a task change is published to the channel of its owner after commit."""
+        task = TaskFactory(user=self.user, status=TaskStatusEnum.COMPLETED, result={"sum": 3})
+
+        with patch("tasks.events.get_redis") as get_redis, self.captureOnCommitCallbacks(execute=True):
+            publish_task_event_on_commit(task)
+            get_redis.return_value.publish.assert_not_called()
+
+        channel, payload = get_redis.return_value.publish.call_args.args
+        assert channel == f"tasks:events:{self.user.id}"
+        assert json.loads(payload)["status"] == TaskStatusEnum.COMPLETED
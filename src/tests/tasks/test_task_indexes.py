@@ -0,0 +1,82 @@
+"""
+Tests for the indexes serving the hot task queries.
+"""
+
+from typing import Set
+
+import factory
+from django.db import connection
+from django.db.models import QuerySet
+
+from tasks.models import ACTIVE_TASK_STATUSES
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+from tests.factories import UserFactory
+
+
+def get_index_names(name: str) -> Set[str]:
+    # Every partition scans an index of its own, attached to the index of the table
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = %s::regclass", [name])
+        return {name for (name,) in cursor.fetchall()}
+
+
+class TestTaskIndexes(BaseAPITestCase):
+    """Tests that the hot task queries scan their indexes instead of the tables."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """Set up users with a long history of finished tasks and a few active ones."""
+        cls.task_user = UserFactory()
+        statuses = [TaskStatusEnum.COMPLETED] * 17 + [
+            TaskStatusEnum.ERROR,
+            TaskStatusEnum.PENDING,
+            TaskStatusEnum.IN_PROGRESS,
+        ]
+        for user in [cls.task_user, *UserFactory.create_batch(19)]:
+            Task.objects.bulk_create(TaskFactory.build_batch(40, user=user, status=factory.Iterator(statuses)))
+        with connection.cursor() as cursor:
+            # ANALYZE refuses to run while deferred foreign key checks are pending
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute("ANALYZE tasks_task")
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.user = self.task_user
+        # Empty partitions are cheaper to scan than to look up, so only the indexes are compared
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assert_uses_index(self, queryset: QuerySet, index: str) -> None:
+        plan = queryset.explain()
+
+        assert "Seq Scan" not in plan
+        indexes = get_index_names(index)
+        assert indexes
+        # Every partition is scanned with its part of the expected index
+        scans = [line for line in plan.splitlines() if "Scan" in line and " on " in line and "Append" not in line]
+        assert scans
+        for scan in scans:
+            assert any(f" {name} " in f"{scan} " for name in indexes), plan
+
+    def test_active_tasks_of_user(self) -> None:
+        """Test that the active task quota counts the tasks of a user in the active task index."""
+        # The query of ``get_active_tasks_count``, a count is not ordered
+        queryset = Task.objects.filter(user_id=self.user.id, status__in=ACTIVE_TASK_STATUSES).order_by()
+
+        self.assert_uses_index(queryset, "task_active_user_idx")
+
+    def test_tasks_of_user_by_status(self) -> None:
+        """Test that the task list filtered by status reads the status index in order."""
+        queryset = Task.objects.filter(user=self.user, status=TaskStatusEnum.COMPLETED)[:10]
+
+        self.assert_uses_index(queryset, "task_user_status_created_idx")
+
+    def test_recent_tasks_of_user(self) -> None:
+        """Test that the task list reads the recent tasks of a user in order."""
+        queryset = Task.objects.filter(user=self.user)[:10]
+
+        self.assert_uses_index(queryset, "task_user_created_id_idx")
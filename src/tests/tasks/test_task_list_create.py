@@ -3,7 +3,9 @@ Tests for task list and creation endpoints.
 """
 
 import json
+from unittest.mock import patch
 
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 
@@ -74,7 +76,8 @@ class TestTaskListCreate(BaseAPITestCase):
 
         assert response.status_code == status.HTTP_201_CREATED
         assert response.data["task_type"] == TaskTypeEnum.SUM
-        assert response.data["status"] == TaskStatusEnum.PENDING
+        assert response.data["status"] == TaskStatusEnum.COMPLETED
+        assert response.data["result"] == {"sum": 12.0}
         assert response.data["user"] == self.user.username
 
         # Verify task was created in database
@@ -82,6 +85,56 @@ class TestTaskListCreate(BaseAPITestCase):
         assert task.task_type == TaskTypeEnum.SUM
         assert json.loads(task.input_data) == {"num1": 5, "num2": 7}
 
+    def test_create_task_sum_long_integers(self) -> None:
+        """Test that numbers beyond 64-bit integers are accepted and the task list still renders their sum."""
+        data = {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 2**64, "num2": 2**64})}
+
+        response = self.api_call("post", self.url, data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["result"] == {"sum": 2.0**65}
+
+        # The sum is read back from the database as an integer beyond 64 bits
+        response = self.api_call("get", self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert float(response.json()["results"][0]["result"]["sum"]) == 2.0**65
+
+    def test_create_task_sum_inline(self) -> None:
+        """Test that a sum task is computed in the request without dispatching it or taking a quota slot."""
+        for _ in range(5):
+            TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
+
+        data = {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 5, "num2": 7})}
+
+        with patch("tasks.tasks.sum_two_numbers.delay") as delay:
+            response = self.api_call("post", self.url, data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["status"] == TaskStatusEnum.COMPLETED
+        delay.assert_not_called()
+
+    @override_settings(TASKS_INLINE_ENABLED=False)
+    def test_create_task_sum_inline_disabled(self) -> None:
+        """Test that a sum task is dispatched to a worker when inline execution is disabled."""
+        data = {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 5, "num2": 7})}
+
+        with patch("tasks.tasks.sum_two_numbers.delay") as delay:
+            response = self.api_call("post", self.url, data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["status"] == TaskStatusEnum.PENDING
+        task = Task.objects.get(id=response.data["id"])
+        delay.assert_called_once_with(
+            task.id,
+            {
+                "user_id": self.user.id,
+                "task_type": TaskTypeEnum.SUM,
+                "input_data": {"num1": 5, "num2": 7},
+                "created_at": task.created_at.isoformat(),
+            },
+        )
+
     def test_create_task_countdown_success(self) -> None:
         """Test creating a countdown task successfully."""
         data = {"task_type": TaskTypeEnum.COUNTDOWN, "input_data": json.dumps({"seconds": 10})}
@@ -129,7 +182,7 @@ class TestTaskListCreate(BaseAPITestCase):
         for _ in range(5):
             TaskFactory(user=self.user, status=TaskStatusEnum.PENDING)
 
-        data = {"task_type": TaskTypeEnum.SUM, "input_data": json.dumps({"num1": 5, "num2": 7})}
+        data = {"task_type": TaskTypeEnum.COUNTDOWN, "input_data": json.dumps({"seconds": 10})}
 
         response = self.api_call("post", self.url, data=data)
 
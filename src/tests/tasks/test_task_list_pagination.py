@@ -0,0 +1,72 @@
+"""
+Tests for keyset pagination of the task list endpoint.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+class TestTaskListKeysetPagination(BaseAPITestCase):
+    """Tests for listing tasks with ``?pagination=cursor``."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.url = f"{reverse('task-list-create')}?pagination=cursor"
+        self.create_user()
+        self.authenticate()
+
+    def test_pages_follow_created_at_and_id(self) -> None:
+        """Test that following the cursors returns every task once in list order."""
+        tasks = [TaskFactory(user=self.user) for _ in range(12)]
+        expected = [task.id for task in sorted(tasks, key=lambda task: (task.created_at, task.id), reverse=True)]
+
+        first = self.api_call("get", self.url)
+
+        assert first.status_code == status.HTTP_200_OK
+        assert "count" not in first.data
+        assert len(first.data["results"]) == 10
+        assert first.data["next"] is not None
+
+        second = self.api_call("get", first.data["next"])
+
+        assert second.status_code == status.HTTP_200_OK
+        assert len(second.data["results"]) == 2
+        assert second.data["next"] is None
+
+        response_ids = [task["id"] for task in first.data["results"] + second.data["results"]]
+        assert response_ids == expected
+
+    def test_ties_on_created_at(self) -> None:
+        """Test that tasks sharing the same creation time are split between pages by id."""
+        tasks = [TaskFactory(user=self.user) for _ in range(11)]
+        for task in tasks:
+            task.created_at = tasks[0].created_at
+            task.save(update_fields=["created_at"])
+
+        first = self.api_call("get", self.url)
+        second = self.api_call("get", first.data["next"])
+
+        response_ids = [task["id"] for task in first.data["results"] + second.data["results"]]
+        assert response_ids == sorted((task.id for task in tasks), reverse=True)
+
+    def test_no_total_count_query(self) -> None:
+        """Test that keyset pages do not count the tasks."""
+        TaskFactory(user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api_call("get", self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not any("COUNT(" in query["sql"] for query in queries.captured_queries)
+
+    def test_invalid_cursor(self) -> None:
+        """Test that a malformed cursor is rejected."""
+        response = self.api_call("get", f"{self.url}&cursor=invalid")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
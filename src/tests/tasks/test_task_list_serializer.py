@@ -0,0 +1,53 @@
+"""
+Tests for the read-only serializer of the task list.
+"""
+
+import json
+
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tasks.serializers import TaskListSerializer
+from tasks.serializers import TaskSerializer
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+class TestTaskListSerializer(BaseAPITestCase):
+    """Tests that the list renders ``values()`` rows exactly like ``TaskSerializer`` renders tasks."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.url = reverse("task-list-create")
+        self.create_user()
+        self.authenticate()
+
+    def test_rows_match_model_serializer(self) -> None:
+        """Test that every status and task type is rendered the same from rows and from instances."""
+        TaskFactory.create_batch(8, user=self.user)
+        # The API stores input data as a JSON encoded string
+        TaskFactory(
+            user=self.user,
+            task_type=TaskTypeEnum.SUM,
+            status=TaskStatusEnum.PENDING,
+            input_data=json.dumps({"num1": 1, "num2": 2}),
+        )
+
+        tasks = Task.objects.filter(user=self.user)
+        rows = tasks.values(*TaskListSerializer.values)
+
+        assert TaskListSerializer(rows, many=True).data == TaskSerializer(tasks, many=True).data
+
+    def test_list_response_matches_model_serializer(self) -> None:
+        """Test that the list endpoint keeps the response of the model serializer."""
+        TaskFactory.create_batch(4, user=self.user)
+
+        response = self.api_call("get", self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        expected = TaskSerializer(Task.objects.filter(user=self.user), many=True).data
+        assert response.json()["results"] == json.loads(json.dumps(expected, default=str))
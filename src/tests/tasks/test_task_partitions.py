@@ -0,0 +1,139 @@
+"""
+Tests for the monthly partitions of the task table.
+"""
+
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.partitions import add_months
+from tasks.partitions import create_task_partitions
+from tasks.partitions import get_month
+from tasks.partitions import get_task_partitions
+from tasks.partitions import retire_task_partitions
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+NOW = datetime(2030, 1, 15, 12, tzinfo=dt_timezone.utc)
+
+
+def get_month_start(year: int, month: int) -> datetime:
+    return datetime(year, month, 1, tzinfo=dt_timezone.utc)
+
+
+def get_task_partition(task: Task) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT tableoid::regclass::text FROM tasks_task WHERE id = %s", [task.id])
+        return cursor.fetchone()[0]
+
+
+def table_exists(name: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+        return cursor.fetchone()[0]
+
+
+class TestTaskPartitions(BaseAPITestCase):
+    """Tests for creating, retiring and pruning the partitions of the task table."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.create_user()
+
+    def test_months(self) -> None:
+        """Test that months start in UTC and are added across years."""
+        assert get_month(datetime(2030, 1, 31, 23, tzinfo=dt_timezone.utc)) == get_month_start(2030, 1)
+        assert add_months(get_month_start(2030, 11), 3) == get_month_start(2031, 2)
+        assert add_months(get_month_start(2030, 1), -1) == get_month_start(2029, 12)
+
+    @override_settings(TASKS_PARTITIONS_PREMAKE=2)
+    def test_create_partitions(self) -> None:
+        """Test that the current and the coming months get partitions once."""
+        created = create_task_partitions(NOW)
+
+        assert created == ["tasks_task_p203001", "tasks_task_p203002", "tasks_task_p203003"]
+        assert create_task_partitions(NOW) == []
+
+        task = TaskFactory(user=self.user)
+        Task.objects.filter(id=task.id).update(created_at=datetime(2030, 2, 28, 23, 59, tzinfo=dt_timezone.utc))
+        assert get_task_partition(task) == "tasks_task_p203002"
+
+        Task.objects.filter(id=task.id).update(created_at=datetime(2031, 1, 1, tzinfo=dt_timezone.utc))
+        assert get_task_partition(task) == "tasks_task_default"
+
+    @override_settings(TASKS_PARTITIONS_PREMAKE=2, TASKS_PARTITIONS_RETENTION=0)
+    def test_retention_disabled(self) -> None:
+        """Test that no partition is retired without a retention."""
+        create_task_partitions(NOW)
+
+        assert retire_task_partitions(add_months(NOW, 12)) == []
+
+    @override_settings(TASKS_PARTITIONS_PREMAKE=2, TASKS_PARTITIONS_RETENTION=1, TASKS_PARTITIONS_DROP=False)
+    def test_retire_detaches(self) -> None:
+        """Test that expired partitions are detached and kept with their tasks, the lists of their users changed."""
+        create_task_partitions(NOW)
+        task = TaskFactory(user=self.user, status=TaskStatusEnum.COMPLETED)
+        Task.objects.filter(id=task.id).update(created_at=NOW)
+
+        with patch("tasks.partitions.bump_task_list_version_on_commit") as bump_version:
+            retired = retire_task_partitions(add_months(NOW, 2))
+
+        assert retired[-1] == "tasks_task_p203001"
+        assert sorted(get_task_partitions().values()) == ["tasks_task_p203002", "tasks_task_p203003"]
+        assert not Task.objects.filter(id=task.id).exists()
+        assert table_exists("tasks_task_p203001")
+        bump_version.assert_called_once_with(self.user.id)
+
+    @override_settings(TASKS_PARTITIONS_PREMAKE=2, TASKS_PARTITIONS_RETENTION=1, TASKS_PARTITIONS_DROP=False)
+    def test_retire_keeps_active_tasks(self) -> None:
+        """Test that an expired partition holding active tasks is kept until they finish."""
+        create_task_partitions(NOW)
+        task = TaskFactory(user=self.user, status=TaskStatusEnum.IN_PROGRESS)
+        Task.objects.filter(id=task.id).update(created_at=NOW)
+
+        assert "tasks_task_p203001" not in retire_task_partitions(add_months(NOW, 2))
+        assert Task.objects.filter(id=task.id).exists()
+
+        Task.objects.filter(id=task.id).update(status=TaskStatusEnum.COMPLETED)
+
+        assert "tasks_task_p203001" in retire_task_partitions(add_months(NOW, 2))
+        assert not Task.objects.filter(id=task.id).exists()
+
+    @override_settings(TASKS_PARTITIONS_PREMAKE=2, TASKS_PARTITIONS_RETENTION=1, TASKS_PARTITIONS_DROP=True)
+    def test_retire_drops(self) -> None:
+        """Test that expired partitions are dropped when configured."""
+        create_task_partitions(NOW)
+
+        retire_task_partitions(add_months(NOW, 2))
+
+        assert not table_exists("tasks_task_p203001")
+        assert table_exists("tasks_task_p203002")
+
+    @override_settings(TASKS_PARTITIONS_PREMAKE=2)
+    def test_list_prunes_partitions(self) -> None:
+        """Test that the creation date filters of the list skip the partitions of other months."""
+        create_task_partitions(NOW)
+        old, new = TaskFactory.create_batch(2, user=self.user)
+        Task.objects.filter(id=new.id).update(created_at=add_months(NOW, 1))
+        bounds = {"created_at__gte": add_months(get_month(NOW), 1), "created_at__lt": add_months(get_month(NOW), 2)}
+
+        plan = Task.objects.filter(user=self.user, **bounds).explain()
+
+        assert "tasks_task_p203002" in plan
+        assert "tasks_task_p203001" not in plan
+        assert "tasks_task_default" not in plan
+
+        self.authenticate()
+        query = {name: value.isoformat() for name, value in bounds.items()}
+        response = self.client.get(reverse("task-list-create"), query)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [task["id"] for task in response.json()["results"]] == [new.id]
@@ -0,0 +1,128 @@
+"""
+Tests for the soft deletion and the retention of finished tasks.
+"""
+
+from datetime import timedelta
+from typing import Optional
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework import status
+
+from tasks.models import ArchivedTask
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.retention import run_task_retention
+from tasks.tasks import archive_expired_tasks
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+RETENTION_AGE = 30 * 24 * 60 * 60
+
+
+def get_sample(name: str) -> float:
+    value: Optional[float] = REGISTRY.get_sample_value(name)
+    return value or 0.0
+
+
+class TestTaskRetention(BaseAPITestCase):
+    """Tests for hiding soft deleted tasks and moving expired ones to the archive."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.create_user()
+        self.authenticate()
+
+    def create_task(self, age: timedelta, status: str = TaskStatusEnum.COMPLETED) -> Task:
+        task = TaskFactory(user=self.user, status=status)
+        Task.objects.filter(id=task.id).update(created_at=timezone.now() - age)
+        task.refresh_from_db()
+        return task
+
+    def test_soft_deleted_tasks_hidden(self) -> None:
+        """Test that soft deleted tasks are left out of the default manager and the API."""
+        task, kept = TaskFactory.create_batch(2, user=self.user)
+
+        Task.objects.filter(id=task.id).soft_delete()
+
+        assert list(Task.objects.values_list("id", flat=True)) == [kept.id]
+        assert Task.all_objects.filter(id=task.id, deleted_at__isnull=False).exists()
+
+        response = self.api_call("get", reverse("task-list-create"))
+        assert [row["id"] for row in response.json()["results"]] == [kept.id]
+
+        response = self.api_call("get", reverse("task-detail", kwargs={"pk": task.id}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @override_settings(TASKS_RETENTION_AGE=RETENTION_AGE, TASKS_RETENTION_CHUNK_SIZE=10, TASKS_RETENTION_MAX_CHUNKS=10)
+    def test_expired_tasks_archived(self) -> None:
+        """Test that only finished tasks older than the retention age are moved to the archive."""
+        expired = self.create_task(timedelta(days=40))
+        failed = self.create_task(timedelta(days=31), status=TaskStatusEnum.ERROR)
+        active = self.create_task(timedelta(days=40), status=TaskStatusEnum.PENDING)
+        recent = self.create_task(timedelta(days=20))
+        archived = get_sample("tasks_retention_archived_total")
+
+        with patch("tasks.retention.bump_task_list_version_on_commit") as bump_version:
+            retention = run_task_retention()
+
+        assert retention.deleted == retention.archived == 2
+        assert retention.lag == 0
+        assert get_sample("tasks_retention_archived_total") == archived + 2
+        assert get_sample("task_retention_lag_seconds") == 0
+        bump_version.assert_called_once_with(self.user.id)
+
+        assert set(Task.all_objects.values_list("id", flat=True)) == {active.id, recent.id}
+        archived_task = ArchivedTask.objects.get(id=expired.id)
+        assert archived_task.user_id == self.user.id
+        assert archived_task.input_data == expired.input_data
+        assert archived_task.created_at == expired.created_at
+        assert archived_task.deleted_at is not None
+        assert ArchivedTask.objects.filter(id=failed.id, status=TaskStatusEnum.ERROR).exists()
+
+    @override_settings(TASKS_RETENTION_AGE=RETENTION_AGE, TASKS_RETENTION_CHUNK_SIZE=2, TASKS_RETENTION_MAX_CHUNKS=1)
+    def test_retention_chunks(self) -> None:
+        """Test that a run is limited to its chunks and the next one continues with the lag reported."""
+        tasks = [self.create_task(timedelta(days=days)) for days in (33, 32, 31)]
+
+        retention = run_task_retention()
+
+        assert retention.deleted == retention.archived == 2
+        assert retention.lag > 24 * 60 * 60 - 60
+        assert get_sample("task_retention_lag_seconds") == retention.lag
+        assert list(Task.all_objects.values_list("id", flat=True)) == [tasks[2].id]
+
+        retention = run_task_retention()
+
+        assert retention.archived == 1
+        assert retention.lag == 0
+        assert ArchivedTask.objects.count() == 3
+
+    @override_settings(TASKS_RETENTION_AGE=RETENTION_AGE)
+    def test_soft_deleted_tasks_archived(self) -> None:
+        """Test that tasks soft deleted before their expiration are archived once they reach the retention age."""
+        task = self.create_task(timedelta(days=20))
+        Task.objects.filter(id=task.id).soft_delete()
+
+        retention = run_task_retention()
+
+        assert (retention.deleted, retention.archived) == (0, 0)
+        assert Task.all_objects.filter(id=task.id).exists()
+
+        retention = run_task_retention(timezone.now() + timedelta(days=15))
+
+        assert (retention.deleted, retention.archived) == (0, 1)
+        assert ArchivedTask.objects.filter(id=task.id).exists()
+
+    @override_settings(TASKS_RETENTION_ENABLED=False, TASKS_RETENTION_AGE=RETENTION_AGE)
+    def test_retention_disabled(self) -> None:
+        """Test that the beat task does nothing while the retention is disabled."""
+        task = self.create_task(timedelta(days=40))
+
+        archive_expired_tasks()
+
+        assert Task.objects.filter(id=task.id).exists()
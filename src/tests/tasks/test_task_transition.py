@@ -0,0 +1,83 @@
+"""
+Tests for conditional task status transitions.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tasks.models import Task
+from tasks.models import TaskStatusEnum
+from tasks.models import TaskTypeEnum
+from tasks.tasks import sum_two_numbers
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+class TestTaskTransition(BaseAPITestCase):
+    """Tests for moving tasks between statuses with conditional updates."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.create_user()
+        self.task = TaskFactory(
+            user=self.user, task_type=TaskTypeEnum.SUM, status=TaskStatusEnum.PENDING, input_data={"num1": 1, "num2": 2}
+        )
+
+    def test_transition_wins(self) -> None:
+        """Test that a transition from the current status writes only the status columns."""
+        with CaptureQueriesContext(connection) as queries:
+            won = Task.objects.transition(
+                self.task.id, TaskStatusEnum.PENDING, TaskStatusEnum.COMPLETED, result={"sum": 3.0}
+            )
+
+        assert won
+        assert len(queries) == 1
+        assert "input_data" not in queries[0]["sql"]
+
+        self.task.refresh_from_db()
+        assert self.task.status == TaskStatusEnum.COMPLETED
+        assert self.task.result == {"sum": 3.0}
+
+    def test_transition_loses(self) -> None:
+        """Test that a transition from another status does not touch the task."""
+        won = Task.objects.transition(
+            self.task.id,
+            [TaskStatusEnum.IN_PROGRESS, TaskStatusEnum.ERROR],
+            TaskStatusEnum.COMPLETED,
+        )
+
+        assert not won
+        self.task.refresh_from_db()
+        assert self.task.status == TaskStatusEnum.PENDING
+
+    def test_sum_handler_queries(self) -> None:
+        """Test that the sum handler reads the task once and then only issues conditional updates."""
+        with self.assertNumQueries(3):
+            sum_two_numbers(self.task.id)
+
+        self.task.refresh_from_db()
+        assert self.task.status == TaskStatusEnum.COMPLETED
+        assert self.task.result == {"sum": 3.0}
+
+    def test_sum_handler_payload_skips_fetch(self) -> None:
+        """Test that a message carrying the payload is handled with the two updates only."""
+        payload = {"user_id": self.user.id, "task_type": TaskTypeEnum.SUM, "input_data": {"num1": 1, "num2": 2}}
+
+        with self.assertNumQueries(2):
+            sum_two_numbers(self.task.id, payload)
+
+        self.task.refresh_from_db()
+        assert self.task.status == TaskStatusEnum.COMPLETED
+        assert self.task.result == {"sum": 3.0}
+
+    def test_sum_handler_ignores_redelivery(self) -> None:
+        """Test that a redelivered message does not process a finished task again."""
+        self.task.status = TaskStatusEnum.ERROR
+        self.task.save()
+
+        with self.assertNumQueries(2):
+            sum_two_numbers(self.task.id)
+
+        self.task.refresh_from_db()
+        assert self.task.status == TaskStatusEnum.ERROR
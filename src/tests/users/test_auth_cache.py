@@ -0,0 +1,91 @@
+"""
+Tests for the cache of users resolved by JWT authentication.
+"""
+
+from typing import Dict
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import redis
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import TaskStatusEnum
+from tests.base import BaseAPITestCase
+from tests.factories import TaskFactory
+
+
+class TestCachedJWTAuthentication(BaseAPITestCase):
+    """Tests for resolving users of JWT requests from the cache."""
+
+    def setUp(self) -> None:
+        """Set up test data for each test."""
+        super().setUp()
+        self.create_user()
+        self.task = TaskFactory(user=self.user, status=TaskStatusEnum.COMPLETED)
+        self.url = reverse("task-detail", kwargs={"pk": self.task.id})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_token()['access']}")
+
+        # Redis stand-in keeping values in a dictionary
+        self.store: Dict[str, bytes] = {}
+        client = MagicMock()
+        client.get.side_effect = self.store.get
+        client.set.side_effect = self.set
+        client.delete.side_effect = lambda key: self.store.pop(key, None)
+        patcher = patch("users.cache.get_redis", return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def set(self, key: str, value: object, nx: bool = False, **kwargs) -> None:
+        """Store a value the way Redis ``SET`` does."""
+        if nx and key in self.store:
+            return
+        self.store[key] = value if isinstance(value, bytes) else str(value).encode()
+
+    @override_settings(USERS_AUTH_CACHE_ENABLED=True)
+    def test_cached_user_skips_database(self) -> None:
+        """Test that a repeated request takes the user from the cache instead of the database."""
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @override_settings(USERS_AUTH_CACHE_ENABLED=True)
+    def test_cached_user_fields(self) -> None:
+        """Test that the cached user is the same user apart from the password hash."""
+        self.client.get(self.url)
+
+        # The validators and the view read the task, the user is not read
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        user = response.wsgi_request.user
+        assert user.pk == self.user.pk
+        assert user.email == self.user.email
+        assert user.created_at == self.user.created_at
+        assert user.get_deferred_fields() == {"password"}
+
+    @override_settings(USERS_AUTH_CACHE_ENABLED=True)
+    def test_deactivation_invalidates_cache(self) -> None:
+        """Test that a deactivated user is rejected right after the change is committed."""
+        assert self.client.get(self.url).status_code == status.HTTP_200_OK
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @override_settings(USERS_AUTH_CACHE_ENABLED=True)
+    def test_redis_unavailable(self) -> None:
+        """Test that users are loaded from the database while Redis is unavailable."""
+        with patch("users.cache.get_redis", side_effect=redis.ConnectionError):
+            response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,72 @@
+"""
+Tests for the orjson renderer and parser of the API.
+"""
+
+import io
+from datetime import datetime
+from datetime import timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from utils.parsers import ORJSONParser
+from utils.renderers import ORJSONRenderer
+
+
+class TestORJSON:
+    """Tests that orjson renders and parses the same data as the DRF defaults."""
+
+    def test_render_matches_json_renderer(self) -> None:
+        """Test that dates, decimals, lazy strings and non-ASCII text are rendered like DRF does."""
+        data = {
+            "id": 1,
+            "created_at": datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            "amount": Decimal("1.50"),
+            "label": gettext_lazy("Выполнено"),
+            "nested": [{"text": "line\u2028separator"}, None, True],
+        }
+
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_render_long_integers(self) -> None:
+        """Test that integers beyond 64 bits are rendered like DRF does, also indented."""
+        data = {
+            "sum": 2**65,
+            "nested": [-(2**63) - 1, "line\u2028separator", datetime(2025, 1, 2, tzinfo=timezone.utc)],
+        }
+        context = {"indent": 2}
+
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+        indented = ORJSONRenderer().render(data, renderer_context=context)
+        assert indented == JSONRenderer().render(data, renderer_context=context)
+
+    def test_render_none(self) -> None:
+        """Test that no data renders an empty body."""
+        assert ORJSONRenderer().render(None) == b""
+
+    def test_parse_matches_json_parser(self) -> None:
+        """Test that a body is parsed like DRF does, also in another charset."""
+        body = '{"task_type": "sum", "input_data": "{\\"num1\\": 1}", "name": "Задача"}'
+
+        expected = JSONParser().parse(io.BytesIO(body.encode()))
+        assert ORJSONParser().parse(io.BytesIO(body.encode())) == expected
+        cp1251 = ORJSONParser().parse(io.BytesIO(body.encode("cp1251")), parser_context={"encoding": "cp1251"})
+        assert cp1251 == expected
+
+    def test_parse_long_integers(self) -> None:
+        """Test that integers beyond 64 bits are parsed exactly instead of as floats."""
+        body = '{"num1": 100000000000000000000, "num2": -9223372036854775809, "name": "Задача"}'
+
+        data = ORJSONParser().parse(io.BytesIO(body.encode()))
+
+        assert data == {"num1": 10**20, "num2": -(2**63) - 1, "name": "Задача"}
+        assert data == JSONParser().parse(io.BytesIO(body.encode()))
+
+    def test_parse_error(self) -> None:
+        """Test that a malformed body fails with a parse error."""
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"task_type": '))
@@ -0,0 +1,57 @@
+from typing import Optional
+from typing import Tuple
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from users.cache import cache_user
+from users.cache import get_cached_user
+from users.cache import get_user_cache_version
+from users.models import User
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving the user from the cache of ``users.cache`` before the database.
+    """
+
+    def get_user(self, validated_token: Token) -> User:
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        # Revocation compares the password hash, which is not cached
+        if user_id is None or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        # The version is read before the row, so a row read before a change is cached under the old version
+        version = get_user_cache_version(user_id)
+        user = get_cached_user(user_id, version)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user, version)
+        elif api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication usable from native async views outside of DRF.
+    """
+
+    async def aauthenticate(self, request: HttpRequest) -> Optional[Tuple[User, Token]]:
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await sync_to_async(self.get_user)(validated_token), validated_token
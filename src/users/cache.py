@@ -0,0 +1,117 @@
+"""
+Cache of the users resolved by JWT authentication.
+
+Every authenticated request loads its user, so the user row is cached in Redis under
+``(user id, version)``. The version of a user is a timestamp bumped after every committed
+change of the row (deactivation, password change and so on), which orphans the entries of
+the previous versions at once in every process. An authentication that read the row before
+the change can only store it under the old version, so a stale user is never served.
+Entries expire after ``USERS_AUTH_CACHE_TTL``.
+
+Queryset ``update()`` bypasses the model signals, such changes of users have to call
+``bump_user_cache_version_on_commit``.
+"""
+
+import time
+from typing import Optional
+
+import redis
+import structlog
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from utils import json_codec
+from utils.redis import get_redis
+
+from .models import User
+
+logger = structlog.get_logger(__name__)
+
+# The password hash is not spread to Redis, a cached user loads it on access
+CACHED_USER_FIELDS = tuple(field for field in User._meta.concrete_fields if field.attname != "password")
+
+
+def get_user_cache_version_key(user_id: int) -> str:
+    return f"{settings.USERS_AUTH_CACHE_KEY_PREFIX}:version:{user_id}"
+
+
+def get_user_cache_key(user_id: int, version: str) -> str:
+    return f"{settings.USERS_AUTH_CACHE_KEY_PREFIX}:{user_id}:{version}"
+
+
+def get_user_cache_version(user_id: int) -> Optional[str]:
+    """
+    Current version of the cached user, ``None`` when the cache is disabled or unavailable.
+    """
+    if not settings.USERS_AUTH_CACHE_ENABLED:
+        return None
+
+    key = get_user_cache_version_key(user_id)
+    try:
+        version = get_redis().get(key)
+        if version is None:
+            # Start versioning a user who has not changed since the version was lost
+            get_redis().set(key, time.time_ns(), nx=True)
+            version = get_redis().get(key)
+    except redis.RedisError:
+        logger.exception("Failed to get user cache version", user_id=user_id)
+        return None
+
+    return version.decode() if version is not None else None
+
+
+def get_cached_user(user_id: int, version: Optional[str]) -> Optional[User]:
+    if version is None:
+        return None
+
+    try:
+        value = get_redis().get(get_user_cache_key(user_id, version))
+    except redis.RedisError:
+        logger.exception("Failed to get cached user", user_id=user_id)
+        return None
+    if value is None:
+        return None
+
+    data = json_codec.loads(value)
+    values = [field.to_python(data[field.attname]) for field in CACHED_USER_FIELDS]
+    return User.from_db("default", [field.attname for field in CACHED_USER_FIELDS], values)
+
+
+def cache_user(user: User, version: Optional[str]) -> None:
+    if version is None:
+        return
+
+    data = {field.attname: field.value_from_object(user) for field in CACHED_USER_FIELDS}
+    try:
+        get_redis().set(get_user_cache_key(user.pk, version), json_codec.dumps(data), ex=settings.USERS_AUTH_CACHE_TTL)
+    except redis.RedisError:
+        logger.exception("Failed to cache user", user_id=user.pk)
+
+
+def bump_user_cache_version(user_id: int) -> None:
+    if not settings.USERS_AUTH_CACHE_ENABLED:
+        return
+
+    try:
+        # A timestamp instead of a counter never repeats a version after Redis loses the key
+        get_redis().set(get_user_cache_version_key(user_id), time.time_ns())
+    except redis.RedisError:
+        # A stale version would keep serving the old user, so drop it
+        logger.exception("Failed to bump user cache version", user_id=user_id)
+        try:
+            get_redis().delete(get_user_cache_version_key(user_id))
+        except redis.RedisError:
+            pass
+
+
+def bump_user_cache_version_on_commit(user_id: int) -> None:
+    transaction.on_commit(lambda: bump_user_cache_version(user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender: type, instance: User, **kwargs) -> None:
+    bump_user_cache_version_on_commit(instance.pk)
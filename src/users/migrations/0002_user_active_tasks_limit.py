@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:32
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="active_tasks_limit",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Если не задан, используется лимит по умолчанию",
+                null=True,
+                verbose_name="Лимит активных задач",
+            ),
+        ),
+    ]
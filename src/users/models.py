@@ -35,6 +35,12 @@ class User(
         null=True,
         verbose_name=_("Email"),
     )
+    active_tasks_limit = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("Лимит активных задач"),
+        help_text=_("Если не задан, используется лимит по умолчанию"),
+    )
 
     REQUIRED_FIELDS = ()
 
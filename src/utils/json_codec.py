@@ -0,0 +1,54 @@
+"""
+JSON codec of the API built on orjson.
+
+Types orjson does not know are encoded by the DRF encoder, so the output matches the one of
+the default DRF renderer: lazy strings, decimals, querysets and dates, the latter with ``Z``
+instead of ``+00:00``. Decoding errors are ``json.JSONDecodeError`` as with the standard library.
+
+orjson handles 64-bit integers only: longer ones are encoded and decoded with the standard
+library instead, so they are kept exact as by the default DRF renderer and parser.
+"""
+
+import json
+import re
+from typing import Any
+from typing import Union
+
+import orjson
+from rest_framework.utils.encoders import JSONEncoder
+
+# Dates are left to the DRF encoder, orjson would keep the ``+00:00`` offset of UTC
+DUMPS_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+# orjson reads integers beyond 64 bits as floats, digits this long may be one of them
+LONG_NUMBER = re.compile(r"\d{19,}")
+LONG_NUMBER_BYTES = re.compile(rb"\d{19,}")
+
+encoder = JSONEncoder()
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    if isinstance(data, str):
+        long_number = LONG_NUMBER.search(data)
+    else:
+        long_number = LONG_NUMBER_BYTES.search(data)
+    if long_number:
+        return json.loads(data if isinstance(data, (str, bytes, bytearray)) else bytes(data))
+    return orjson.loads(data)
+
+
+def dumps(value: Any, indent: bool = False) -> bytes:
+    options = DUMPS_OPTIONS | orjson.OPT_INDENT_2 if indent else DUMPS_OPTIONS
+    try:
+        return orjson.dumps(value, default=encoder.default, option=options)
+    except orjson.JSONEncodeError:
+        # Integers beyond 64 bits, the standard library raises itself for data it cannot encode either
+        text = json.dumps(
+            value,
+            cls=JSONEncoder,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=2 if indent else None,
+            separators=(",", ": ") if indent else (",", ":"),
+        )
+        return text.encode()
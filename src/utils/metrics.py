@@ -0,0 +1,31 @@
+"""
+Prometheus exposition.
+
+Gunicorn and Celery prefork run several processes, each of them counting its own samples.
+With ``PROMETHEUS_MULTIPROC_DIR`` set, prometheus_client keeps the samples in memory mapped
+files of that directory and the exposition aggregates the files of all processes. The
+directory has to be emptied before the processes start.
+"""
+
+import os
+
+from django.http import HttpRequest
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client import REGISTRY
+from prometheus_client import CollectorRegistry
+from prometheus_client import generate_latest
+from prometheus_client import multiprocess
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    return HttpResponse(generate_latest(get_metrics_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,84 @@
+"""
+Per-request SQL query instrumentation.
+
+``QueryCountMiddleware`` counts the queries of every request and their total time, both are
+added to the ``request_finished`` log of django-structlog. A view declares the most queries
+a request may take with ``query_budget``, either a number or a mapping of HTTP methods to
+numbers. A request over the budget is logged, and fails with ``DB_QUERY_BUDGET_RAISE``
+enabled (the test suite does), so N+1 regressions are caught by the existing tests.
+"""
+
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+import structlog
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.dispatch import receiver
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django_structlog.signals import bind_extra_request_finished_metadata
+
+from .queries import QueryCounter
+from .queries import count_queries
+
+logger = structlog.get_logger(__name__)
+
+
+class QueryBudgetError(Exception):
+    pass
+
+
+def get_query_budget(request: HttpRequest) -> Optional[int]:
+    match = request.resolver_match
+    view_class = getattr(match.func, "view_class", None) if match is not None else None
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(request.method)
+    return budget
+
+
+class QueryCountMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with count_queries() as counter:
+            response = self.get_response(request)
+        self.check_budget(request, counter)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        with count_queries() as counter:
+            response = await self.get_response(request)
+        self.check_budget(request, counter)
+        return response
+
+    def check_budget(self, request: HttpRequest, counter: QueryCounter) -> None:
+        request.db_queries = counter
+
+        budget = get_query_budget(request)
+        if budget is None or counter.count <= budget:
+            return
+
+        message = f"{request.method} {request.path} took {counter.count} queries, the budget is {budget}"
+        if settings.DB_QUERY_BUDGET_RAISE:
+            raise QueryBudgetError(message)
+        logger.warning("Query budget exceeded", queries=counter.count, budget=budget, path=request.path)
+
+
+@receiver(bind_extra_request_finished_metadata)
+def bind_query_count(request: HttpRequest, log_kwargs: dict, **kwargs) -> None:
+    counter = getattr(request, "db_queries", None)
+    if counter is not None:
+        log_kwargs.update(db_queries=counter.count, db_time_ms=counter.duration_ms)
@@ -2,6 +2,7 @@ import os
 import uuid
 
 from django.db import models
+from django.utils import timezone
 from django.utils.deconstruct import deconstructible
 
 
@@ -26,6 +27,22 @@ class TimedMixin(models.Model):
         abstract = True
 
 
+class SoftDeleteQuerySet(models.QuerySet):
+    def soft_delete(self) -> int:
+        return self.update(deleted_at=timezone.now())
+
+
+class SoftDeleteManager(models.Manager):
+    """
+    Manager hiding the rows soft deleted with ``deleted_at``.
+
+    Related objects are loaded by the base manager, so a soft deleted row is still reachable from its relations.
+    """
+
+    def get_queryset(self) -> models.QuerySet:
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 @deconstructible
 class RandomFileName:
     def __init__(self, path):
@@ -0,0 +1,28 @@
+from typing import IO
+from typing import Any
+from typing import Optional
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from . import json_codec
+
+
+class ORJSONParser(JSONParser):
+    """
+    ``JSONParser`` decoding with orjson.
+    """
+
+    def parse(self, stream: IO[bytes], media_type: Optional[str] = None, parser_context: Any = None) -> Any:
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        data = stream.read()
+        try:
+            # orjson reads UTF-8 only, other charsets are decoded beforehand
+            if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+                data = data.decode(encoding)
+            return json_codec.loads(data)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
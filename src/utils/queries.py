@@ -0,0 +1,70 @@
+"""
+Counting of SQL queries.
+
+A counter is activated for a block of code, e.g. a request, and every query executed within
+it is added to the counter together with its duration. The active counter is kept in a
+context variable, so queries of ``sync_to_async`` threads started by the block count as well.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        # Seconds spent in the database
+        self.duration = 0.0
+
+    @property
+    def duration_ms(self) -> float:
+        return round(self.duration * 1000, 2)
+
+
+current_counter: ContextVar[Optional[QueryCounter]] = ContextVar("current_counter", default=None)
+
+
+def count_query(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    counter = current_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        counter.count += 1
+        counter.duration += time.perf_counter() - started
+
+
+def install_query_counter(connection: BaseDatabaseWrapper, **kwargs) -> None:
+    # A pooled connection is reported again every time it is taken from the pool
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+connection_created.connect(install_query_counter)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    # Connections opened before this module was imported have missed the signal
+    for connection in connections.all(initialized_only=True):
+        install_query_counter(connection)
+
+    counter = QueryCounter()
+    token = current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        current_counter.reset(token)
@@ -0,0 +1,26 @@
+from functools import cache
+
+import redis
+from django.conf import settings
+from redis import asyncio as aioredis
+
+
+@cache
+def get_redis() -> redis.Redis:
+    # redis-py resets its connection pool after fork, so the client is safe to share with prefork workers
+    return redis.Redis.from_url(settings.REDIS_APP_URL)
+
+
+@cache
+def get_cache_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_CACHE_URL)
+
+
+@cache
+def get_broker_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.CELERY_BROKER_URL)
+
+
+def get_async_redis() -> aioredis.Redis:
+    # Async clients are bound to the event loop they were created in, so they are not shared
+    return aioredis.Redis.from_url(settings.REDIS_APP_URL)
@@ -0,0 +1,21 @@
+from typing import Any
+from typing import Optional
+
+from rest_framework.renderers import JSONRenderer
+
+from . import json_codec
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` encoding with orjson, always compact and UTF-8 unless an indent is requested.
+    """
+
+    def render(self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Any = None) -> bytes:
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        ret = json_codec.dumps(data, indent=bool(indent))
+        # Line separators are valid JSON but not valid JavaScript, escaped as DRF does
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,83 @@
+"""
+Base of native async API views.
+
+DRF views are sync, so under ASGI each of their requests holds a thread for its whole
+duration. ``AsyncAPIView`` is a plain async Django view with the parts of DRF such views
+need: JWT authentication of every request, errors rendered the way the DRF exception handler
+renders them and JSON bodies rendered by the renderer of the API. The async ORM does not remove
+the threads, Django runs each query in one, it only releases them between the queries.
+"""
+
+from datetime import datetime
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.utils.http import quote_etag
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework import status
+
+from users.authentication import AsyncJWTAuthentication
+
+from .renderers import ORJSONRenderer
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAPIView(View):
+    authentication = AsyncJWTAuthentication()
+    renderer = ORJSONRenderer()
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponseBase:
+        try:
+            auth = await self.authentication.aauthenticate(request)
+            if auth is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = auth
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+
+    def handle_exception(self, request: HttpRequest, exc: exceptions.APIException) -> HttpResponse:
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        response = self.render(data, exc.status_code)
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            response["WWW-Authenticate"] = self.authentication.authenticate_header(request)
+        return response
+
+    def render(self, data: Any, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type="application/json")
+
+    async def respond_conditionally(
+        self,
+        request: HttpRequest,
+        respond: Callable[[], Awaitable[HttpResponse]],
+        etag: Optional[str] = None,
+        last_modified: Optional[datetime] = None,
+    ) -> HttpResponse:
+        """
+        Answer ``304`` to a request for an unchanged resource, as the ``condition`` decorator does.
+
+        The validators are computed by the view beforehand, since the decorator calls them synchronously.
+        """
+        etag = quote_etag(etag) if etag is not None else None
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = await respond()
+
+        if request.method in ("GET", "HEAD"):
+            if timestamp and not response.has_header("Last-Modified"):
+                response.headers["Last-Modified"] = http_date(timestamp)
+            if etag:
+                response.headers.setdefault("ETag", etag)
+        return response